@@ -2,17 +2,171 @@
 
 import os
 import json
-import requests
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Iterator, Callable
+from .cache import TargetCache, LLMCache
+from .projects import get_project_index
+from .governor import RateGovernor, estimate_tokens
+from .prompting import PromptBuilder, format_comments
+from . import transport
+
+# Token budget for one issue's part of a diagnosis prompt
+DIAGNOSIS_PROMPT_TOKENS = 1000
+
+
+class AIRequestError(Exception):
+    """The completion API answered with an error status."""
+    
+    def __init__(self, status_code: int, text: str = ''):
+        super().__init__(f"AI request failed: {status_code}" + (f" - {text}" if text else ''))
+        self.status_code = status_code
 
 
 class AIEngine:
     """AI engine for analyzing bugs and generating PRs."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, use_cache: bool = True,
+                 governor: Optional[RateGovernor] = None):
+        """
+        Args:
+            api_key: Groq API key (default: GROQ_API_KEY)
+            use_cache: Reuse earlier answers to identical prompts; False
+                       always asks the model (answers are still stored)
+            governor: Optional RateGovernor that every uncached request
+                      waits on, to stay inside the API's rate limits
+        """
         self.api_key = api_key or os.environ.get('GROQ_API_KEY')
         self.base_url = 'https://api.groq.com/openai/v1/chat/completions'
         self.model = 'llama-3.3-70b-versatile'
+        self.use_cache = use_cache
+        self.governor = governor
+        self._target_cache = None
+        self._llm_cache = None
+        
+    @property
+    def target_cache(self) -> TargetCache:
+        """Persistent query -> targets cache, opened on first use."""
+        if self._target_cache is None:
+            self._target_cache = TargetCache()
+        return self._target_cache
+        
+    @property
+    def llm_cache(self) -> LLMCache:
+        """Persistent completion cache, opened on first use."""
+        if self._llm_cache is None:
+            self._llm_cache = LLMCache()
+        return self._llm_cache
+        
+    def _complete(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+                  json_mode: bool = False, updated_at: Optional[str] = None,
+                  timeout: float = 30, cache: bool = True) -> str:
+        """
+        Run a chat completion, answering repeats from the LLM cache.
+        
+        Args:
+            messages: Chat messages
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            json_mode: Ask for a JSON object response
+            updated_at: Source issue/PR's updated_at; an edit changes the
+                        cache key, so stale answers are never returned
+            timeout: Request timeout in seconds
+            cache: False to neither read nor write the cache
+            
+        Returns:
+            The completion text
+            
+        Raises:
+            AIRequestError: If the API returns an error status
+        """
+        key = LLMCache.key(self.model, messages, temperature, max_tokens,
+                           updated_at=updated_at, json_mode=json_mode)
+        if cache and self.use_cache:
+            cached = self.llm_cache.get(key)
+            if cached:
+                return cached
+                
+        response = self._post(messages, temperature, max_tokens, json_mode=json_mode, timeout=timeout)
+        content = response.json()['choices'][0]['message']['content'] or ''
+        # An empty answer would otherwise be served as a hit until it expires
+        if cache and content.strip():
+            self.llm_cache.set(key, content)
+        return content
+        
+    def _stream(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+                updated_at: Optional[str] = None, timeout: float = 30) -> Iterator[str]:
+        """
+        Like _complete(), but yield the completion in pieces as it is generated.
+        
+        Reads the API's server-sent events. A cached answer is yielded whole;
+        a streamed one is cached only once [DONE] has arrived and it isn't
+        empty, and shares its cache entry with the non-streamed call.
+        
+        Raises:
+            AIRequestError: If the API returns an error status
+        """
+        key = LLMCache.key(self.model, messages, temperature, max_tokens,
+                           updated_at=updated_at, json_mode=False)
+        if self.use_cache:
+            cached = self.llm_cache.get(key)
+            if cached:
+                yield cached
+                return
+                
+        response = self._post(messages, temperature, max_tokens, timeout=timeout, stream=True)
+        parts = []
+        finished = False
+        try:
+            for line in response.iter_lines():
+                # Decode ourselves: text/event-stream would otherwise default to latin-1
+                line = line.decode('utf-8')
+                if not line.startswith('data:'):
+                    continue
+                data = line[5:].strip()
+                if data == '[DONE]':
+                    finished = True
+                    break
+                choices = json.loads(data).get('choices') or [{}]
+                text = (choices[0].get('delta') or {}).get('content')
+                if text:
+                    parts.append(text)
+                    yield text
+        finally:
+            response.close()
+        content = ''.join(parts)
+        # A stream cut off before [DONE] is incomplete; don't keep it
+        if finished and content.strip():
+            self.llm_cache.set(key, content)
+        
+    def _post(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+              json_mode: bool = False, timeout: float = 30, stream: bool = False):
+        """Send a completion request, waiting on the governor first."""
+        payload = {
+            'model': self.model,
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+        }
+        if json_mode:
+            payload['response_format'] = {"type": "json_object"}
+        if stream:
+            payload['stream'] = True
+        if self.governor:
+            prompt_tokens = sum(estimate_tokens(m['content']) for m in messages)
+            self.governor.acquire(prompt_tokens + max_tokens)
+            
+        response = transport.post(
+            self.base_url,
+            headers={
+                'Authorization': f'Bearer {self.api_key}',
+                'Content-Type': 'application/json',
+            },
+            json=payload,
+            timeout=timeout,
+            stream=stream
+        )
+        if response.status_code != 200:
+            raise AIRequestError(response.status_code, response.text)
+        return response
         
     def resolve_target(self, query: str) -> Dict[str, str]:
         """
@@ -24,28 +178,55 @@ class AIEngine:
             return targets[0]
         return {'platform': 'github', 'target': query}
 
-    def resolve_targets(self, query: str) -> list[Dict[str, str]]:
+    def resolve_targets(self, query: str, use_cache: bool = True) -> list[Dict[str, str]]:
         """
         Resolve a query into multiple potential targets across platforms.
         
+        Checked in order: pinned queries, exact names in the offline
+        project index, previously resolved queries, and only then the LLM.
+        Near matches from the index are only hints for the LLM, since a
+        query like "react router" resembles react but is another project;
+        without an API key the closest near match is used as is.
+        
         Args:
             query: User input (e.g. "python", "browsers", "linux")
+            use_cache: Set False to skip cached LLM answers and ask again
+                       (pins and the project index still apply)
             
         Returns:
             List of dicts with 'platform', 'target', 'instance'
         """
+        index = get_project_index()
+        known = self.target_cache.pinned(query) or index.resolve(query)
+        if known:
+            return known
+        if use_cache:
+            cached = self.target_cache.get_targets(query)
+            if cached:
+                return cached
+                
         if not self.api_key:
+            close = index.resolve(query, fuzzy=True)
+            if close:
+                return close
             # Basic heuristic fallback
             return [
                 {'platform': 'github', 'target': query},
                 {'platform': 'gitlab', 'target': query},
             ]
             
+        similar = [project for score, project in index.search(query, limit=3) if score >= 0.6]
+        hints = ''
+        if similar:
+            hints = ("\nKnown projects with similar names (use one only if the query means it, "
+                     "not a related project):\n" + '\n'.join(
+                         f"- {p['name']}: {json.dumps(p['targets'])}" for p in similar))
+            
         prompt = f"""You are a Bug Hunter assistant.
 User Query: "{query}"
 
 Identify up to 3 most relevant repository/project targets across different platforms (GitHub, GitLab, Bugzilla).
-Focus on the official or most popular repositories for this topic.
+Focus on the official or most popular repositories for this topic.{hints}
 
 Return a JSON object with a "targets" array.
 Each target must have: "platform", "target" (repo name or product name), "instance" (optional).
@@ -67,40 +248,69 @@ Example for "linux":
 }}
 """
         try:
-            response = requests.post(
-                self.base_url,
-                headers={
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Content-Type': 'application/json',
-                },
-                json={
-                    'model': self.model,
-                    'messages': [
-                        {'role': 'system', 'content': 'You are a JSON-only API.'},
-                        {'role': 'user', 'content': prompt}
-                    ],
-                    'temperature': 0.1,
-                    'response_format': {"type": "json_object"},
-                    'max_tokens': 300,
-                },
-                timeout=15
+            # Answers are cached per query by target_cache instead
+            content = self._complete(
+                [
+                    {'role': 'system', 'content': 'You are a JSON-only API.'},
+                    {'role': 'user', 'content': prompt}
+                ],
+                temperature=0.1, max_tokens=300, json_mode=True, timeout=15, cache=False
             )
-            
-            if response.status_code == 200:
-                content = response.json()['choices'][0]['message']['content']
-                data = json.loads(content)
-                return data.get('targets', [])
+            data = json.loads(content)
+            targets = data.get('targets', [])
+            if targets:
+                self.target_cache.set_targets(query, targets)
+            return targets
+        except AIRequestError:
             return []
         except Exception as e:
             print(f"AI Target Resolution Error: {e}")
             return [{'platform': 'github', 'target': query}]
 
-    def diagnose_bug(self, issue_data: Dict) -> Optional[str]:
+    @staticmethod
+    def diagnosis_prompt(issue_data: Dict, budget: int = DIAGNOSIS_PROMPT_TOKENS) -> str:
+        """
+        The issue as presented to the model: title, body, comments and labels.
+        
+        The body and any fetched discussion ('comments_data') are stripped
+        of template noise and cut to their most relevant lines so the whole
+        section fits in `budget` tokens.
+        """
+        title = issue_data.get('title', 'Unknown')
+        labels = ', '.join(label['name'] for label in issue_data.get('labels', []))
+        builder = PromptBuilder(budget, query=f"{title} {labels}")
+        builder.add(f"Issue Title: {title}\nIssue Body: ")
+        builder.add_section(issue_data.get('body') or 'No description')
+        builder.add(f"\nComments: {issue_data.get('comments', 0)}\nLabels: {labels}")
+        discussion = format_comments(issue_data.get('comments_data') or [])
+        if discussion:
+            builder.add("\nDiscussion:\n")
+            builder.add_section(discussion)
+        return builder.build()
+
+    def _diagnosis_messages(self, issue_data: Dict) -> List[Dict[str, str]]:
+        """Chat messages asking for a single issue's diagnosis."""
+        prompt = f"""Analyze this GitHub issue and provide a concise diagnosis.
+
+{self.diagnosis_prompt(issue_data)}
+
+Provide:
+1. What's broken (1-2 sentences)
+2. Likely root cause (1 sentence)
+3. Suggested fix approach (2-3 sentences)
+
+Keep it technical and concise. No fluff."""
+        return [{'role': 'user', 'content': prompt}]
+        
+    def diagnose_bug(self, issue_data: Dict,
+                     on_token: Optional[Callable[[str], None]] = None) -> Optional[str]:
         """
         Use AI to diagnose what's wrong with a bug.
         
         Args:
             issue_data: GitHub issue data
+            on_token: Optional callback given each piece of the diagnosis
+                      as it streams in
             
         Returns:
             AI diagnosis text or None if error
@@ -108,48 +318,97 @@ Example for "linux":
         if not self.api_key:
             return None
             
-        prompt = f"""Analyze this GitHub issue and provide a concise diagnosis.
+        try:
+            if on_token:
+                parts = []
+                for text in self.stream_diagnosis(issue_data):
+                    parts.append(text)
+                    on_token(text)
+                return ''.join(parts)
+            return self._complete(self._diagnosis_messages(issue_data),
+                                  temperature=0.3, max_tokens=500,
+                                  updated_at=issue_data.get('updated_at'))
+        except Exception as e:
+            print(f"AI error: {e}")
+            return None
+            
+    def stream_diagnosis(self, issue_data: Dict) -> Iterator[str]:
+        """
+        Diagnose a bug, yielding the text as the model generates it.
+        
+        Args:
+            issue_data: GitHub issue data
+            
+        Yields:
+            Pieces of the diagnosis text (nothing without an API key)
+            
+        Raises:
+            AIRequestError: If the API returns an error status
+        """
+        if not self.api_key:
+            return
+        yield from self._stream(self._diagnosis_messages(issue_data),
+                                temperature=0.3, max_tokens=500,
+                                updated_at=issue_data.get('updated_at'))
+            
+    def diagnose_bugs(self, issues: List[Dict], max_tokens: int = 1500) -> List[Optional[str]]:
+        """
+        Diagnose several short issues in one request.
+        
+        Each issue is numbered in the prompt and the model answers with a
+        JSON list keyed by those numbers, so one issue's text cannot be
+        mistaken for another's. Issues the model skipped or answered
+        malformed come back as None for the caller to retry singly.
+        
+        Args:
+            issues: Issue data dicts, as for diagnose_bug()
+            max_tokens: Completion limit for the whole batch
+            
+        Returns:
+            Diagnoses aligned with `issues`
+        """
+        results = [None] * len(issues)
+        if not self.api_key or not issues:
+            return results
+            
+        sections = "\n\n".join(
+            f"### Issue {n}\n{self.diagnosis_prompt(issue)}" for n, issue in enumerate(issues, 1)
+        )
+        prompt = f"""Analyze each of these GitHub issues independently and provide a concise diagnosis for each.
 
-Issue Title: {issue_data.get('title', 'Unknown')}
-Issue Body: {issue_data.get('body', 'No description')[:1000]}
-Comments: {issue_data.get('comments', 0)}
-Labels: {', '.join(label['name'] for label in issue_data.get('labels', []))}
+{sections}
 
-Provide:
+For every issue provide:
 1. What's broken (1-2 sentences)
 2. Likely root cause (1 sentence)
 3. Suggested fix approach (2-3 sentences)
 
+Return JSON: {{"diagnoses": [{{"id": <issue number>, "diagnosis": "<the three numbered points as text>"}}]}}
 Keep it technical and concise. No fluff."""
 
         try:
-            response = requests.post(
-                self.base_url,
-                headers={
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Content-Type': 'application/json',
-                },
-                json={
-                    'model': self.model,
-                    'messages': [
-                        {'role': 'user', 'content': prompt}
-                    ],
-                    'temperature': 0.3,
-                    'max_tokens': 500,
-                },
-                timeout=30
+            content = self._complete(
+                [
+                    {'role': 'system', 'content': 'You are a JSON-only API.'},
+                    {'role': 'user', 'content': prompt}
+                ],
+                temperature=0.3, max_tokens=max_tokens, json_mode=True,
+                updated_at='|'.join(str(issue.get('updated_at')) for issue in issues)
             )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result['choices'][0]['message']['content']
-            else:
-                print(f"AI request failed: {response.status_code}")
-                return None
-                
+            data = json.loads(content)
         except Exception as e:
             print(f"AI error: {e}")
-            return None
+            return results
+            
+        for item in data.get('diagnoses', []) if isinstance(data, dict) else []:
+            try:
+                index = int(item['id']) - 1
+            except (TypeError, KeyError, ValueError):
+                continue
+            text = item.get('diagnosis')
+            if 0 <= index < len(issues) and isinstance(text, str) and text.strip():
+                results[index] = text.strip()
+        return results
     
     def generate_pr_description(self, bug_data: Dict, fix_description: str) -> Optional[str]:
         """
@@ -180,30 +439,9 @@ Generate a PR description with these sections:
 Use markdown formatting. Be professional and concise. No hype."""
 
         try:
-            response = requests.post(
-                self.base_url,
-                headers={
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Content-Type': 'application/json',
-                },
-                json={
-                    'model': self.model,
-                    'messages': [
-                        {'role': 'user', 'content': prompt}
-                    ],
-                    'temperature': 0.5,
-                    'max_tokens': 800,
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result['choices'][0]['message']['content']
-            else:
-                print(f"AI Request Failed: {response.status_code} - {response.text}")
-                return None
-                
+            return self._complete([{'role': 'user', 'content': prompt}],
+                                  temperature=0.5, max_tokens=800,
+                                  updated_at=bug_data.get('updated_at'))
         except Exception as e:
             print(f"AI error: {e}")
             return None
@@ -241,28 +479,16 @@ Return JSON with these fields:
 """
 
         try:
-            response = requests.post(
-                self.base_url,
-                headers={
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Content-Type': 'application/json',
-                },
-                json={
-                    'model': self.model,
-                    'messages': [
-                        {'role': 'system', 'content': 'You are a supportive engineering mentor. Return JSON only.'},
-                        {'role': 'user', 'content': prompt}
-                    ],
-                    'temperature': 0.4,
-                    'response_format': {"type": "json_object"},
-                    'max_tokens': 500,
-                },
-                timeout=30
+            content = self._complete(
+                [
+                    {'role': 'system', 'content': 'You are a supportive engineering mentor. Return JSON only.'},
+                    {'role': 'user', 'content': prompt}
+                ],
+                temperature=0.4, max_tokens=500, json_mode=True,
+                updated_at=pr_data.get('updated_at')
             )
-
-            if response.status_code == 200:
-                return json.loads(response.json()['choices'][0]['message']['content'])
-            return {'error': f'API Error {response.status_code}'}
-            
+            return json.loads(content)
+        except AIRequestError as e:
+            return {'error': f'API Error {e.status_code}'}
         except Exception as e:
             return {'error': str(e)}
@@ -1,7 +1,35 @@
 """Analytics and insights for bug data."""
 
-from typing import List, Dict, Optional
+import heapq
+from dataclasses import asdict
+from typing import List, Dict, Optional, Iterable, Any
 from collections import defaultdict, Counter
+from .storage import repo_key
+
+
+def bug_repo_key(bug: Dict) -> str:
+    """Repo key for a bug dict, keeping same-named repos on different platforms apart."""
+    if 'platform' in bug:
+        return repo_key(bug['platform'], bug.get('instance', ''), bug['repo'])
+    return bug['repo']
+
+
+# Impact levels in display order, with the lowest score each one covers
+IMPACT_LEVELS = [
+    ('critical (90-100)', 90),
+    ('high (80-89)', 80),
+    ('significant (70-79)', 70),
+    ('moderate (60-69)', 60),
+    ('low (<60)', 0),
+]
+
+
+def impact_level(score: int) -> str:
+    """Name of the impact level a score falls into."""
+    for level, floor in IMPACT_LEVELS:
+        if score >= floor:
+            return level
+    return IMPACT_LEVELS[-1][0]
 
 
 class BugAnalytics:
@@ -20,7 +48,7 @@ class BugAnalytics:
         """Group bugs by repository."""
         grouped = defaultdict(list)
         for bug in self.bugs:
-            grouped[bug['repo']].append(bug)
+            grouped[bug_repo_key(bug)].append(bug)
         return dict(grouped)
         
     def by_severity(self) -> Dict[str, List[Dict]]:
@@ -53,26 +81,10 @@ class BugAnalytics:
         Returns:
             Dictionary with counts for each impact level
         """
-        distribution = {
-            'critical (90-100)': 0,
-            'high (80-89)': 0,
-            'significant (70-79)': 0,
-            'moderate (60-69)': 0,
-            'low (<60)': 0
-        }
+        distribution = {level: 0 for level, _ in IMPACT_LEVELS}
         
         for bug in self.bugs:
-            score = bug['impact_score']
-            if score >= 90:
-                distribution['critical (90-100)'] += 1
-            elif score >= 80:
-                distribution['high (80-89)'] += 1
-            elif score >= 70:
-                distribution['significant (70-79)'] += 1
-            elif score >= 60:
-                distribution['moderate (60-69)'] += 1
-            else:
-                distribution['low (<60)'] += 1
+            distribution[impact_level(bug['impact_score'])] += 1
                 
         return distribution
         
@@ -115,56 +127,281 @@ class BugAnalytics:
         
     def summary(self) -> str:
         """Generate text summary of analytics."""
-        if not self.bugs:
-            return "No bugs to analyze"
+        # One pass instead of one per metric
+        return StreamingAnalytics().consume(self.bugs).summary()
+
+
+def format_summary(impact: Dict[str, int],
+                   distribution: Dict[str, int],
+                   top_repos: List[tuple],
+                   recommended: Optional[Dict]) -> str:
+    """
+    Render the insights report shared by every analytics backend.
+    
+    Args:
+        impact: Output of total_potential_impact()
+        distribution: Output of impact_distribution()
+        top_repos: Output of top_impact_repos()
+        recommended: Output of recommend_next_fix()
+    """
+    summary = []
+    summary.append("Bug Analysis Summary")
+    summary.append("=" * 50)
+    summary.append(f"\nTotal bugs: {impact['total_bugs']}")
+    summary.append(f"Potential users helped: ~{impact['total_users']:,}")
+    summary.append(f"Potential time saved: ~{impact['total_hours_saved']:,} hours")
+    summary.append(f"Average impact score: {impact['avg_impact']}/100")
+    
+    summary.append("\n\nImpact Distribution:")
+    summary.append("-" * 50)
+    for level, count in distribution.items():
+        if count > 0:
+            summary.append(f"{level}: {count} bugs")
             
-        impact = self.total_potential_impact()
-        distribution = self.impact_distribution()
-        top_repos = self.top_impact_repos(5)
-        
-        summary = []
-        summary.append("Bug Analysis Summary")
-        summary.append("=" * 50)
-        summary.append(f"\nTotal bugs: {impact['total_bugs']}")
-        summary.append(f"Potential users helped: ~{impact['total_users']:,}")
-        summary.append(f"Potential time saved: ~{impact['total_hours_saved']:,} hours")
-        summary.append(f"Average impact score: {impact['avg_impact']}/100")
-        
-        summary.append("\n\nImpact Distribution:")
+    summary.append("\n\nTop Repositories by Impact:")
+    summary.append("-" * 50)
+    for i, (repo, users, count) in enumerate(top_repos, 1):
+        summary.append(f"{i}. {repo}")
+        summary.append(f"   Bugs: {count} | Users: ~{users:,}")
+        
+    if recommended:
+        summary.append("\n\nRecommended Next Fix:")
         summary.append("-" * 50)
-        for level, count in distribution.items():
-            if count > 0:
-                summary.append(f"{level}: {count} bugs")
+        summary.append(f"Repository: {bug_repo_key(recommended)}")
+        summary.append(f"Title: {recommended['title']}")
+        summary.append(f"Impact: {recommended['impact_score']}/100")
+        summary.append(f"Users: ~{recommended['affected_users']:,}")
+        summary.append(f"URL: {recommended['url']}")
+        
+    return '\n'.join(summary)
+
+
+class DatabaseAnalytics:
+    """
+    Analytics over the local database without loading bugs into memory.
+    
+    Same interface as BugAnalytics. Unfiltered queries whose min_impact is
+    a multiple of 10 read the trigger-maintained rollup tables; anything
+    else is pushed down to SQL as one aggregate query per metric. Either
+    way memory use stays constant however many bugs are stored.
+    """
+    
+    def __init__(self, db, min_impact: int = 0, **filters):
+        """
+        Initialize analytics over a database.
+        
+        Args:
+            db: BugDatabase instance
+            min_impact: Minimum impact score
+            **filters: platform/repo/severity/label filters, as for get_bugs()
+        """
+        self.db = db
+        self.min_impact = min_impact
+        self.filters = {k: v for k, v in filters.items() if v}
+        self._totals = None
+        
+    @property
+    def uses_rollups(self) -> bool:
+        """Whether this query is answered from the rollup tables."""
+        return self.db.rollups_cover(self.min_impact, **self.filters)
+        
+    def _aggregate(self) -> Dict:
+        """
+        Totals plus per-level counts, fetched once.
+        
+        Returns:
+            Dict with 'total_bugs', 'total_users', 'total_impact' and
+            'distribution' ({level: count})
+        """
+        if self._totals is not None:
+            return self._totals
+            
+        distribution = {level: 0 for level, _ in IMPACT_LEVELS}
+        if self.uses_rollups:
+            totals = self.db.get_rollup_summary(self.min_impact)
+            for bucket, count in totals['buckets'].items():
+                distribution[impact_level(bucket * 10)] += count
+        else:
+            totals = self.db.summarize_bugs(
+                [floor for _, floor in IMPACT_LEVELS],
+                min_impact=self.min_impact, **self.filters
+            )
+            for (level, _), count in zip(IMPACT_LEVELS, totals['levels']):
+                distribution[level] = count
                 
-        summary.append("\n\nTop Repositories by Impact:")
-        summary.append("-" * 50)
-        for i, (repo, users, count) in enumerate(top_repos, 1):
-            summary.append(f"{i}. {repo}")
-            summary.append(f"   Bugs: {count} | Users: ~{users:,}")
+        self._totals = {
+            'total_bugs': totals['total_bugs'],
+            'total_users': totals['total_users'],
+            'total_impact': totals['total_impact'],
+            'distribution': distribution,
+        }
+        return self._totals
+        
+    def total_potential_impact(self) -> Dict[str, int]:
+        """Calculate total potential impact metrics."""
+        totals = self._aggregate()
+        total_bugs = totals['total_bugs']
+        return {
+            'total_bugs': total_bugs,
+            'total_users': totals['total_users'],
+            'total_hours_saved': int(totals['total_users'] * 0.5),  # 30 min per user
+            'avg_impact': totals['total_impact'] // total_bugs if total_bugs else 0
+        }
+        
+    def impact_distribution(self) -> Dict[str, int]:
+        """Get distribution of bugs by impact level."""
+        return dict(self._aggregate()['distribution'])
+        
+    def top_impact_repos(self, n: int = 10) -> List[tuple]:
+        """Get top N repositories by total impact as (repo, total_users, bug_count)."""
+        if self.uses_rollups:
+            rows = self.db.get_rollup_top_repos(n, self.min_impact)
+        else:
+            rows = self.db.top_repos(n, min_impact=self.min_impact, **self.filters)
             
-        recommended = self.recommend_next_fix()
-        if recommended:
-            summary.append("\n\nRecommended Next Fix:")
-            summary.append("-" * 50)
-            summary.append(f"Repository: {recommended['repo']}")
-            summary.append(f"Title: {recommended['title']}")
-            summary.append(f"Impact: {recommended['impact_score']}/100")
-            summary.append(f"Users: ~{recommended['affected_users']:,}")
-            summary.append(f"URL: {recommended['url']}")
+        return [
+            (repo_key(r['platform'], r['instance'], r['repo']), r['total_users'], r['bug_count'])
+            for r in rows
+        ]
+        
+    def recommend_next_fix(self) -> Optional[Dict]:
+        """Highest impact bug, read straight off the impact index."""
+        page = self.db.get_bugs_page(limit=1, min_impact=self.min_impact, **self.filters)
+        return page[0] if page else None
+        
+    def summary(self) -> str:
+        """Generate text summary of analytics."""
+        impact = self.total_potential_impact()
+        if not impact['total_bugs']:
+            return "No bugs to analyze"
             
-        return '\n'.join(summary)
+        return format_summary(
+            impact,
+            self.impact_distribution(),
+            self.top_impact_repos(5),
+            self.recommend_next_fix()
+        )
 
 
-def generate_insights(bugs: List[Dict]) -> str:
+def _bug_dict(bug: Any) -> Dict:
+    """Bug dicts pass through; platform and scanner Bug objects are converted."""
+    if isinstance(bug, dict):
+        return bug
+    if hasattr(bug, 'to_dict'):
+        return bug.to_dict()
+    return asdict(bug)
+
+
+class StreamingAnalytics:
+    """
+    Single-pass analytics accumulator.
+    
+    Consumes bugs one at a time and keeps only running totals: per-repo
+    sums, the impact distribution and a bounded heap of the top bugs. It
+    works over generators (a live scan, BugDatabase.iter_bugs()) without
+    holding the result set. Accepts bug dicts or Bug objects.
+    """
+    
+    def __init__(self, top_n: int = 5):
+        """
+        Initialize an empty accumulator.
+        
+        Args:
+            top_n: How many of the highest impact bugs to keep
+        """
+        self.top_n = top_n
+        self.total_bugs = 0
+        self.total_users = 0
+        self.total_impact = 0
+        self.repos: Dict[str, List[int]] = {}  # repo -> [total_users, bug_count]
+        self.distribution = {level: 0 for level, _ in IMPACT_LEVELS}
+        self._top = []  # min-heap of (impact_score, -sequence, bug)
+        
+    def add(self, bug: Any):
+        """Fold one bug into the running totals."""
+        bug = _bug_dict(bug)
+        score = bug['impact_score']
+        users = bug['affected_users']
+        
+        self.total_bugs += 1
+        self.total_users += users
+        self.total_impact += score
+        self.distribution[impact_level(score)] += 1
+        
+        repo_totals = self.repos.setdefault(bug_repo_key(bug), [0, 0])
+        repo_totals[0] += users
+        repo_totals[1] += 1
+        
+        # Negative sequence keeps the earliest bug on ties, like a stable sort
+        entry = (score, -self.total_bugs, bug)
+        if len(self._top) < self.top_n:
+            heapq.heappush(self._top, entry)
+        elif entry[:2] > self._top[0][:2]:
+            heapq.heapreplace(self._top, entry)
+            
+    def consume(self, bugs: Iterable[Any]) -> 'StreamingAnalytics':
+        """Fold every bug from an iterable; returns self for chaining."""
+        for bug in bugs:
+            self.add(bug)
+        return self
+        
+    @property
+    def mean_impact(self) -> float:
+        """Running mean impact score."""
+        return self.total_impact / self.total_bugs if self.total_bugs else 0.0
+        
+    def total_potential_impact(self) -> Dict[str, int]:
+        """Calculate total potential impact metrics."""
+        return {
+            'total_bugs': self.total_bugs,
+            'total_users': self.total_users,
+            'total_hours_saved': int(self.total_users * 0.5),  # 30 min per user
+            'avg_impact': self.total_impact // self.total_bugs if self.total_bugs else 0
+        }
+        
+    def impact_distribution(self) -> Dict[str, int]:
+        """Get distribution of bugs by impact level."""
+        return dict(self.distribution)
+        
+    def top_impact_repos(self, n: int = 10) -> List[tuple]:
+        """Get top N repositories by total impact as (repo, total_users, bug_count)."""
+        return heapq.nlargest(
+            n,
+            ((repo, users, count) for repo, (users, count) in self.repos.items()),
+            key=lambda x: x[1]
+        )
+        
+    def top_bugs(self) -> List[Dict]:
+        """The top_n highest impact bugs seen so far, best first."""
+        return [bug for _, _, bug in sorted(self._top, key=lambda e: e[:2], reverse=True)]
+        
+    def recommend_next_fix(self) -> Optional[Dict]:
+        """Highest impact bug seen so far."""
+        top = self.top_bugs()
+        return top[0] if top else None
+        
+    def summary(self) -> str:
+        """Generate text summary of analytics."""
+        if not self.total_bugs:
+            return "No bugs to analyze"
+            
+        return format_summary(
+            self.total_potential_impact(),
+            self.impact_distribution(),
+            self.top_impact_repos(5),
+            self.recommend_next_fix()
+        )
+
+
+def generate_insights(bugs: Iterable[Any]) -> str:
     """
     Generate insights from bug data.
     
     Args:
-        bugs: List of bug dictionaries
+        bugs: Bug dictionaries or Bug objects; any iterable, including a
+              generator from a streaming scan, is consumed in one pass
         
     Returns:
         Formatted insights string
     """
-    analytics = BugAnalytics(bugs)
-    return analytics.summary()
-
+    return StreamingAnalytics().consume(bugs).summary()
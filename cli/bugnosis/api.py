@@ -19,14 +19,21 @@ Example:
     >>> pr_desc = api.generate_pr("pytorch/pytorch", 12345, "Fixed memory leak")
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, AsyncIterator, Tuple
+from datetime import datetime
+import json
 import socket
 import logging
 from .scanner import GitHubScanner, Bug
 from .ai import AIEngine
 from .github import GitHubClient
-from .storage import BugDatabase
-from .multi_scan import scan_multiple_repos
+from .storage import BugDatabase, platform_name
+from .platforms.base import Bug as PlatformBug
+from .multi_scan import scan_multiple_repos, print_progress, DEFAULT_MAX_WORKERS
+from .diagnosis import diagnose_saved_bugs
+from .governor import RateGovernor, DEFAULT_RPM, DEFAULT_TPM
+from .streaming import aiter_tokens
+from .analytics import DatabaseAnalytics
 
 logger = logging.getLogger(__name__)
 
@@ -101,34 +108,8 @@ class BugnosisAPI:
             # Offline mode: Search local DB
             logger.info(f"Offline mode: Searching local database for {repo}")
             
-            # Query local database for bugs matching this repo
-            # BugDatabase.get_bugs returns dicts, convert to objects? 
-            # For now, scan_repo expects Bug objects.
-            
-            # We'll implement a search method in DB that mimics scan
             results = self.db.search_bugs(repo_query=repo, min_impact=min_impact)
-            
-            # Convert dicts to Bug objects
-            bugs = []
-            for r in results:
-                # Need to construct Bug object from dict
-                # This assumes Bug class can handle it or we manually map
-                bug = Bug(
-                    repo=r['repo'].split(':')[-1] if ':' in r['repo'] else r['repo'],
-                    issue_number=r['issue_number'],
-                    title=r['title'],
-                    url=r['url'],
-                    impact_score=r['impact_score'],
-                    affected_users=r['affected_users'],
-                    severity=r['severity'],
-                    labels=json.loads(r['labels']) if isinstance(r['labels'], str) else [],
-                    comments_count=r['comments'],
-                    created_at=r['created_at'],
-                    updated_at=r['updated_at'],
-                    platform=r['repo'].split(':')[0] if ':' in r['repo'] else 'github'
-                )
-                bugs.append(bug)
-            return bugs
+            return [self._row_to_bug(r) for r in results]
 
         bugs = self.scanner.scan_repo(repo, min_impact=min_impact)
         
@@ -137,17 +118,44 @@ class BugnosisAPI:
             
         return bugs
         
+    @staticmethod
+    def _row_to_bug(row: Dict) -> PlatformBug:
+        """Build a Bug object from a saved database row."""
+        labels = json.loads(row['labels']) if isinstance(row['labels'], str) else []
+        
+        return PlatformBug(
+            platform=platform_name(row['platform'], row['instance']),
+            repo=row['repo'],
+            issue_number=row['issue_number'],
+            title=row['title'],
+            url=row['url'],
+            description=row.get('description') or '',
+            impact_score=row['impact_score'],
+            affected_users=row['affected_users'],
+            severity=row['severity'],
+            status=row.get('status') or 'discovered',
+            labels=labels,
+            created_at=datetime.fromisoformat(row['created_at']) if row.get('created_at') else None,
+            updated_at=datetime.fromisoformat(row['updated_at']) if row.get('updated_at') else None,
+            comments_count=row.get('comments') or 0,
+        )
+        
     def scan_multiple_repos(self,
                            repos: List[str],
                            min_impact: int = 70,
-                           save: bool = False) -> List[Bug]:
+                           save: bool = False,
+                           max_workers: int = DEFAULT_MAX_WORKERS,
+                           on_progress=print_progress) -> List[Bug]:
         """
-        Scan multiple repositories and aggregate results.
+        Scan multiple repositories concurrently and aggregate results.
         
         Args:
             repos: List of repositories (owner/repo format)
             min_impact: Minimum impact score (0-100)
             save: Save results to local database
+            max_workers: Most repositories scanned at once
+            on_progress: Called with a progress dict as each repository
+                         finishes (None for silence)
             
         Returns:
             Combined list of bugs sorted by impact
@@ -161,7 +169,8 @@ class BugnosisAPI:
              return all_bugs
 
         bugs = scan_multiple_repos(repos, min_impact=min_impact, 
-                                  token=self.scanner.token)
+                                  token=self.scanner.token,
+                                  max_workers=max_workers, on_progress=on_progress)
         
         if save and bugs:
             self.db.save_bugs(bugs)
@@ -170,18 +179,89 @@ class BugnosisAPI:
         
     def get_saved_bugs(self, 
                       min_impact: int = 0,
-                      status: str = None) -> List[Dict]:
+                      status: str = None,
+                      platform: str = None,
+                      repo: str = None,
+                      severity: str = None,
+                      label: str = None) -> List[Dict]:
         """
         Retrieve bugs from local database.
         
         Args:
             min_impact: Minimum impact score filter
             status: Filter by status (e.g., 'discovered', 'fixed')
+            platform: Filter by platform (e.g., 'gitlab', 'bugzilla-mozilla')
+            repo: Filter by exact repository/project name
+            severity: Filter by severity (case-insensitive)
+            label: Filter by label (exact, case-insensitive)
             
         Returns:
             List of bug dictionaries
         """
-        return self.db.get_bugs(min_impact=min_impact, status=status)
+        return self.db.get_bugs(min_impact=min_impact, status=status, platform=platform,
+                                repo=repo, severity=severity, label=label)
+        
+    def iter_saved_bugs(self, min_impact: int = 0, **filters) -> Iterator[Dict]:
+        """
+        Stream saved bugs in impact order without loading them all.
+        
+        Accepts the same filters as get_saved_bugs().
+        """
+        return self.db.iter_bugs(min_impact=min_impact, **filters)
+        
+    def get_saved_bugs_page(self,
+                            after: Optional[Tuple[int, int]] = None,
+                            limit: int = 50,
+                            min_impact: int = 0,
+                            **filters) -> List[Dict]:
+        """
+        Fetch one page of saved bugs.
+        
+        Args:
+            after: (impact_score, id) of the last bug on the previous page
+            limit: Page size
+            min_impact: Minimum impact score filter
+            
+        Returns:
+            List of up to `limit` bug dictionaries
+        """
+        return self.db.get_bugs_page(after=after, limit=limit, min_impact=min_impact, **filters)
+        
+    def count_saved_bugs(self, min_impact: int = 0, **filters) -> int:
+        """Count saved bugs matching the get_saved_bugs() filters."""
+        return self.db.count_bugs(min_impact=min_impact, **filters)
+        
+    def find_bugs(self,
+                  text: str,
+                  min_impact: int = 0,
+                  limit: int = 20) -> List[Dict]:
+        """
+        Full-text search over saved bugs (works offline).
+        
+        Args:
+            text: Words to match in bug titles, descriptions and labels
+            min_impact: Minimum impact score filter
+            limit: Maximum number of results
+            
+        Returns:
+            List of bug dictionaries ranked by relevance and impact
+        """
+        return self.db.find_bugs(text, min_impact=min_impact, limit=limit)
+        
+    def get_trends(self, days: int = 7, limit: int = 10, **filters) -> List[Dict]:
+        """
+        Fastest rising saved bugs, based on score history (works offline).
+        
+        Args:
+            days: Window to measure the rise over
+            limit: Maximum number of results
+            **filters: min_impact, status, platform, repo, severity, label
+            
+        Returns:
+            List of bug dictionaries with 'score_delta', 'comments_delta'
+            and 'reactions_delta', biggest score rise first
+        """
+        return self.db.get_trends(days=days, limit=limit, **filters)
         
     def diagnose_bug(self, repo: str, issue_number: int) -> Optional[str]:
         """
@@ -196,6 +276,72 @@ class BugnosisAPI:
             
         return self.ai.diagnose(issue)
         
+    def stream_diagnosis(self, repo: str, issue_number: int) -> Iterator[str]:
+        """
+        AI diagnosis of a bug, yielded piece by piece as the model writes it.
+        
+        Raises:
+            AIRequestError: If the AI API returns an error status
+        """
+        if not self.online:
+            return
+        issue = self.github.get_issue(repo, issue_number)
+        if issue:
+            if issue.get('comments'):
+                issue = {**issue, 'comments_data': self.github.get_issue_comments(repo, issue_number)}
+            yield from self.ai.stream_diagnosis(issue)
+            
+    async def astream_diagnosis(self, repo: str, issue_number: int) -> AsyncIterator[str]:
+        """
+        Async version of stream_diagnosis(), for event loops such as web servers.
+        
+        Example:
+            >>> async for text in api.astream_diagnosis("pytorch/pytorch", 12345):
+            ...     print(text, end='', flush=True)
+        """
+        def produce(on_token):
+            for text in self.stream_diagnosis(repo, issue_number):
+                on_token(text)
+                
+        async for text in aiter_tokens(produce):
+            yield text
+            
+    def diagnose_saved_bugs(self,
+                            limit: int = 20,
+                            min_impact: int = 70,
+                            redo: bool = False,
+                            rpm: int = DEFAULT_RPM,
+                            tpm: int = DEFAULT_TPM,
+                            pack: bool = True,
+                            **filters) -> Dict:
+        """
+        Diagnose the highest-impact saved bugs and store the results with them.
+        
+        Issues are fetched concurrently and diagnosed within the given
+        request and token budgets; short issues share a request when
+        `pack` is set. Diagnoses land in each bug's 'diagnosis' field.
+        
+        Args:
+            limit: Most bugs to diagnose
+            min_impact: Minimum impact score
+            redo: Include bugs that already have a diagnosis
+            rpm: LLM requests allowed per minute
+            tpm: LLM tokens allowed per minute
+            pack: Let short issues share a request
+            **filters: status, platform, repo, severity, label
+            
+        Returns:
+            Dict with 'total', 'diagnosed' and 'failed' counts
+        """
+        if not self.online:
+            return {'error': 'AI features require an internet connection.'}
+            
+        bugs = self.db.get_bugs_page(limit=limit, min_impact=min_impact,
+                                     diagnosed=None if redo else False, **filters)
+        ai = AIEngine(api_key=self.ai.api_key, use_cache=self.ai.use_cache,
+                      governor=RateGovernor(rpm=rpm, tpm=tpm))
+        return diagnose_saved_bugs(self.db, bugs, ai, self.github, pack=pack)
+        
     def generate_pr(self, 
                    repo: str, 
                    issue_number: int,
@@ -229,6 +375,19 @@ class BugnosisAPI:
         """Get your contribution statistics."""
         return self.db.get_stats()
         
+    def get_insights(self, min_impact: int = 0, **filters) -> str:
+        """
+        Insights report over saved bugs, aggregated inside the database.
+        
+        Args:
+            min_impact: Minimum impact score filter
+            **filters: platform/repo/severity/label filters, as for get_saved_bugs()
+            
+        Returns:
+            Formatted insights text
+        """
+        return DatabaseAnalytics(self.db, min_impact=min_impact, **filters).summary()
+        
     def close(self):
         """Close database connection."""
         self.db.close()
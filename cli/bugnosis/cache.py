@@ -1,9 +1,11 @@
 """Simple caching for API responses."""
 
+import hashlib
 import json
+import re
 import time
 from pathlib import Path
-from typing import Optional, Any
+from typing import Optional, Any, Dict, List
 
 
 class APICache:
@@ -75,5 +77,129 @@ class APICache:
                 pass
 
 
+class TargetCache(APICache):
+    """
+    Long-lived cache of query -> platform targets for AIEngine.resolve_targets().
+    
+    Queries are normalized (case, whitespace, punctuation, common aliases)
+    so "Linux ", "linux" and "the linux kernel" style variants share an
+    entry. Pinned entries live in a separate file under the config
+    directory; they never expire and take precedence over cached answers.
+    """
+    
+    # Unambiguous alternative names -> the name the LLM answers best for.
+    # Short forms like "py", "js" or "kernel" are left alone; they name
+    # other things too, and a rewrite here would stick to every answer.
+    ALIASES = {
+        'k8s': 'kubernetes',
+        'cpython': 'python',
+        'node.js': 'nodejs',
+        'mozilla firefox': 'firefox',
+        'linux kernel': 'linux',
+        'golang': 'go',
+        'vscode': 'vs code',
+    }
+    
+    def __init__(self, cache_dir: Optional[str] = None, ttl: int = 30 * 24 * 3600,
+                 pins_path: Optional[str] = None):
+        """
+        Initialize target cache.
+        
+        Args:
+            cache_dir: Cache directory (default: ~/.cache/bugnosis/targets)
+            ttl: Time to live in seconds (default: 30 days)
+            pins_path: Pinned entries file (default: ~/.config/bugnosis/pinned_targets.json)
+        """
+        if cache_dir is None:
+            cache_dir = Path.home() / '.cache' / 'bugnosis' / 'targets'
+        super().__init__(cache_dir=cache_dir, ttl=ttl)
+        
+        if pins_path is None:
+            config_dir = Path.home() / '.config' / 'bugnosis'
+            config_dir.mkdir(parents=True, exist_ok=True)
+            pins_path = config_dir / 'pinned_targets.json'
+        self.pins_path = Path(pins_path)
+        
+    @classmethod
+    def normalize(cls, query: str) -> str:
+        """Canonical form of a query: lowercased, punctuation and articles dropped, aliases applied."""
+        words = re.sub(r"[^\w.+#/-]+", ' ', query.lower()).split()
+        normalized = ' '.join(w for w in words if w not in ('the', 'a', 'an'))
+        return cls.ALIASES.get(normalized, normalized)
+        
+    def get_targets(self, query: str) -> Optional[List[Dict[str, str]]]:
+        """Pinned or cached targets for a query, or None on a miss."""
+        return self.pinned(query) or self.get(f"targets:{self.normalize(query)}")
+        
+    def pinned(self, query: str) -> Optional[List[Dict[str, str]]]:
+        """Pinned targets for a query, or None."""
+        return self.pins().get(self.normalize(query))
+        
+    def set_targets(self, query: str, targets: List[Dict[str, str]]):
+        """Cache resolved targets for a query."""
+        self.set(f"targets:{self.normalize(query)}", targets)
+        
+    def pins(self) -> Dict[str, List[Dict[str, str]]]:
+        """All pinned entries, keyed by normalized query."""
+        try:
+            with open(self.pins_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+            
+    def pin(self, query: str, targets: List[Dict[str, str]]):
+        """Always resolve `query` to `targets`, overriding cached and AI answers."""
+        pins = self.pins()
+        pins[self.normalize(query)] = targets
+        self._save_pins(pins)
+        
+    def unpin(self, query: str) -> bool:
+        """Remove a pinned entry. Returns False if there was none."""
+        pins = self.pins()
+        if pins.pop(self.normalize(query), None) is None:
+            return False
+        self._save_pins(pins)
+        return True
+        
+    def _save_pins(self, pins: Dict[str, List[Dict[str, str]]]):
+        """Write the pins file."""
+        with open(self.pins_path, 'w') as f:
+            json.dump(pins, f, indent=2, sort_keys=True)
 
 
+class LLMCache(APICache):
+    """
+    Content-addressed cache of LLM completions.
+    
+    Entries are keyed by a hash of everything that shapes the answer: the
+    model, messages, temperature and max_tokens (plus any extra options),
+    and the source issue's updated_at. Asking the same thing about an
+    unchanged issue is answered from disk; an edited issue hashes to a
+    new key, so nothing needs invalidating.
+    """
+    
+    def __init__(self, cache_dir: Optional[str] = None, ttl: int = 30 * 24 * 3600):
+        """
+        Initialize completion cache.
+        
+        Args:
+            cache_dir: Cache directory (default: ~/.cache/bugnosis/llm)
+            ttl: Time to live in seconds (default: 30 days)
+        """
+        if cache_dir is None:
+            cache_dir = Path.home() / '.cache' / 'bugnosis' / 'llm'
+        super().__init__(cache_dir=cache_dir, ttl=ttl)
+        
+    @staticmethod
+    def key(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+            updated_at: Optional[str] = None, **options) -> str:
+        """Cache key for a completion request."""
+        payload = json.dumps({
+            'model': model,
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'updated_at': updated_at,
+            'options': options,
+        }, sort_keys=True)
+        return 'llm:' + hashlib.sha256(payload.encode()).hexdigest()
@@ -6,19 +6,26 @@ from typing import Optional
 from .scanner import GitHubScanner
 from .ai import AIEngine
 from .github import GitHubClient
-from .storage import BugDatabase
-from .multi_scan import scan_multiple_repos
-from .cache import APICache
+from .storage import BugDatabase, repo_key, open_profile, parse_repo_key
+from .writer import AsyncBugWriter
+from .jobs import SQLiteJobQueue, ScanWorker, enqueue_repo_scans, DEFAULT_VISIBILITY_TIMEOUT
+from .multi_scan import (scan_multiple_repos, iter_multiple_repos, iter_repo_results, print_progress,
+                         ProgressBar, DEFAULT_MAX_WORKERS)
+from .cache import APICache, TargetCache, LLMCache
 from .export import (export_bugs_json, export_bugs_csv, export_bugs_markdown,
                      export_stats_json, export_leaderboard)
 from .config import BugnosisConfig
-from .analytics import generate_insights
+from .analytics import DatabaseAnalytics, generate_insights
 from .copilot import BugFixCopilot
+from .diagnosis import diagnose_saved_bugs
+from .governor import RateGovernor
 from .platforms import get_platform, list_platforms
 from .plugins import PluginManager
 from .auth import set_token, get_token, delete_token
 import json
 import getpass
+import hashlib
+import shlex
 
 
 def print_bugs(bugs, show_details=False):
@@ -50,48 +57,201 @@ def print_bugs(bugs, show_details=False):
         print()
 
 
+def parse_filter_option(args, i, filters):
+    """
+    Parse a --platform/--repo/--severity/--label option at args[i].
+    
+    Stores the value in `filters` and returns the index of the next
+    argument, or None if args[i] isn't a filter option.
+    """
+    names = {'--platform': 'platform', '--repo': 'repo',
+             '--severity': 'severity', '--label': 'label'}
+    if args[i] in names and i + 1 < len(args):
+        filters[names[args[i]]] = args[i + 1]
+        return i + 2
+    return None
+
+
 def cmd_diagnose(args):
     """AI diagnosis of a bug."""
+    # --fresh re-fetches the issue and re-asks the model instead of using cached answers
+    fresh = '--fresh' in args
+    args = [a for a in args if a != '--fresh']
+    if '--batch' in args:
+        cmd_diagnose_batch([a for a in args if a != '--batch'], fresh)
+        return
     if len(args) < 2:
         print("Error: Repository and issue number required")
-        print("Usage: bugnosis diagnose owner/repo issue-number")
+        print("Usage: bugnosis diagnose owner/repo issue-number [--fresh] [--stream]")
+        print("       bugnosis diagnose --batch [--limit N] [--min-impact N] [filters]")
+        print("                         [--redo] [--no-pack] [--rpm N] [--tpm N] [--fresh]")
         sys.exit(1)
         
     repo = args[0]
     issue_num = int(args[1])
     token = os.environ.get('GITHUB_TOKEN') or get_token('github')
     
+    if '--stream' in args:
+        stream_diagnosis(repo, issue_num, token, fresh)
+        return
+        
     print(f"Fetching issue #{issue_num} from {repo}...")
     
-    client = GitHubClient(token=token)
+    client = GitHubClient(token=token, use_cache=not fresh)
     issue = client.get_issue(repo, issue_num)
     
     if not issue:
         print("Error: Could not fetch issue")
         sys.exit(1)
+    if issue.get('comments'):
+        # The discussion often pins down the cause; the prompt builder keeps the relevant parts.
+        # Copied: get_issue() may return a response shared with concurrent callers
+        issue = {**issue, 'comments_data': client.get_issue_comments(repo, issue_num)}
         
     print(f"\nIssue: {issue['title']}")
     print(f"URL: {issue['html_url']}")
     print(f"Comments: {issue.get('comments', 0)}")
     print("\nRunning AI diagnosis...\n")
     
-    ai = AIEngine()
-    diagnosis = ai.diagnose_bug(issue)
-    
-    if diagnosis:
-        print("AI Diagnosis:")
-        print("-" * 60)
-        print(diagnosis)
-        print("-" * 60)
-    else:
+    ai = AIEngine(use_cache=not fresh)
+    if not ai.api_key:
         print("AI diagnosis failed. Set GROQ_API_KEY environment variable.")
+        return
+        
+    print("AI Diagnosis:")
+    print("-" * 60)
+    # Printed as it streams, so the first words show up within a second
+    diagnosis = ai.diagnose_bug(issue, on_token=print_token)
+    print()
+    print("-" * 60)
+    if not diagnosis:
+        print("AI diagnosis failed.")
         
 
+def print_token(text: str):
+    """on_token callback that writes streamed AI output straight to the terminal."""
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+def stream_diagnosis(repo: str, issue_num: int, token: Optional[str], fresh: bool = False):
+    """
+    Write a diagnosis as NDJSON events, for the GUI and scripts.
+    
+    One {"type": "issue"} line, then a {"type": "token"} line per streamed
+    piece, ending with {"type": "done"} carrying the full text, or
+    {"type": "error"}.
+    """
+    def emit(event):
+        print(json.dumps(event), flush=True)
+        
+    client = GitHubClient(token=token, use_cache=not fresh)
+    issue = client.get_issue(repo, issue_num)
+    if not issue:
+        emit({'type': 'error', 'error': 'Could not fetch issue'})
+        return
+    if issue.get('comments'):
+        issue = {**issue, 'comments_data': client.get_issue_comments(repo, issue_num)}
+    emit({'type': 'issue', 'title': issue['title'], 'url': issue['html_url'],
+          'comments': issue.get('comments', 0)})
+    
+    ai = AIEngine(use_cache=not fresh)
+    if not ai.api_key:
+        emit({'type': 'error', 'error': 'GROQ_API_KEY is not set'})
+        return
+    parts = []
+    try:
+        for text in ai.stream_diagnosis(issue):
+            parts.append(text)
+            emit({'type': 'token', 'text': text})
+    except Exception as e:
+        emit({'type': 'error', 'error': str(e)})
+        return
+    emit({'type': 'done', 'diagnosis': ''.join(parts)})
+
+
+def cmd_diagnose_batch(args, fresh: bool = False):
+    """AI diagnosis of the top saved bugs, stored alongside them."""
+    config = BugnosisConfig()
+    limit = 20
+    filters = {'min_impact': config.get('min_impact', 70), 'diagnosed': False}
+    rpm = config.get('ai.rpm', 30)
+    tpm = config.get('ai.tpm', 12000)
+    pack = True
+    
+    i = 0
+    while i < len(args):
+        next_i = parse_filter_option(args, i, filters)
+        if next_i is not None:
+            i = next_i
+        elif args[i] == '--limit' and i + 1 < len(args):
+            limit = int(args[i + 1])
+            i += 2
+        elif args[i] == '--min-impact' and i + 1 < len(args):
+            filters['min_impact'] = int(args[i + 1])
+            i += 2
+        elif args[i] == '--rpm' and i + 1 < len(args):
+            rpm = int(args[i + 1])
+            i += 2
+        elif args[i] == '--tpm' and i + 1 < len(args):
+            tpm = int(args[i + 1])
+            i += 2
+        elif args[i] == '--redo':
+            # Include bugs that already have a diagnosis
+            filters['diagnosed'] = None
+            i += 1
+        elif args[i] == '--no-pack':
+            pack = False
+            i += 1
+        else:
+            i += 1
+            
+    if rpm < 1 or tpm < 1:
+        print("Error: --rpm and --tpm (config ai.rpm, ai.tpm) must be at least 1")
+        sys.exit(1)
+        
+    ai = AIEngine(use_cache=not fresh, governor=RateGovernor(rpm=rpm, tpm=tpm))
+    if not ai.api_key:
+        print("Error: Set GROQ_API_KEY environment variable.")
+        sys.exit(1)
+        
+    db = BugDatabase()
+    bugs = db.get_bugs_page(limit=limit, **filters)
+    if not bugs:
+        print("No saved bugs to diagnose. Run a scan with --save first.")
+        db.close()
+        return
+        
+    print(f"Diagnosing {len(bugs)} bugs (limits: {rpm} requests, {tpm} tokens per minute)...\n")
+    token = os.environ.get('GITHUB_TOKEN') or get_token('github')
+    client = GitHubClient(token=token, use_cache=not fresh)
+    
+    def report(bug, diagnosis):
+        status = "done" if diagnosis else "failed"
+        print(f"  {bug['repo']}#{bug['issue_number']}: {status}")
+        
+    try:
+        result = diagnose_saved_bugs(db, bugs, ai, client, on_result=report, pack=pack)
+    except KeyboardInterrupt:
+        print("\nInterrupted; diagnoses so far are saved.")
+        return
+    finally:
+        db.close()
+        
+    print(f"\nDiagnosed {result['diagnosed']} of {result['total']} bugs "
+          f"({ai.governor.requests} requests, {ai.governor.waited:.0f}s waiting on rate limits)")
+    if result['failed']:
+        print(f"{result['failed']} failed; run the same command again to retry them.")
+    print("View with: bugnosis list --diagnosed")
+
+
 def cmd_generate_pr(args):
     """Generate PR description with AI."""
+    fresh = '--fresh' in args
+    args = [a for a in args if a != '--fresh']
     if len(args) < 3:
         print("Error: Repository, issue number, and fix description required")
-        print('Usage: bugnosis generate-pr owner/repo issue-number "what you fixed"')
+        print('Usage: bugnosis generate-pr owner/repo issue-number "what you fixed" [--fresh]')
         sys.exit(1)
         
     repo = args[0]
@@ -106,14 +266,14 @@ def cmd_generate_pr(args):
     
     print(f"Generating PR description for issue #{issue_num}...")
     
-    client = GitHubClient(token=token)
+    client = GitHubClient(token=token, use_cache=not fresh)
     issue = client.get_issue(repo, issue_num)
     
     if not issue:
         print("Error: Could not fetch issue")
         sys.exit(1)
         
-    ai = AIEngine(api_key=groq_key)
+    ai = AIEngine(api_key=groq_key, use_cache=not fresh)
     pr_description = ai.generate_pr_description(issue, fix_desc)
     
     if pr_description:
@@ -127,6 +287,62 @@ def cmd_generate_pr(args):
         print("PR generation failed. Set GROQ_API_KEY environment variable.")
 
 
+def scan_progress():
+    """Progress bar on a terminal, one line per repo otherwise."""
+    return ProgressBar() if sys.stderr.isatty() else print_progress
+
+
+def run_checkpointed_scan(kind: str, key: str, repos: list, min_impact: int, token: Optional[str],
+                          resume: bool = False, workers: int = DEFAULT_MAX_WORKERS) -> list:
+    """
+    Scan repos as a resumable job, saving and checkpointing each repo as it finishes.
+    
+    Args:
+        kind: Job kind ('watch' or 'multi')
+        key: Identifies the repo list for --resume
+        repos: Repos to scan
+        min_impact: Minimum impact score
+        token: GitHub token
+        resume: Continue the last unfinished job for kind/key if there is one
+        workers: Most repos scanned at once
+        
+    Returns:
+        Bugs found by this run (repos finished in an earlier run are not rescanned)
+    """
+    db = BugDatabase()
+    job = db.find_unfinished_scan_job(kind, key) if resume else None
+    if job:
+        job_id = job['id']
+        min_impact = job['params'].get('min_impact', min_impact)
+        pending = [t['target'] for t in db.pending_scan_targets(job_id)]
+        print(f"Resuming scan #{job_id}: {job['done']}/{job['total']} repos already done, "
+              f"{len(pending)} to go\n")
+    else:
+        if resume:
+            print("No unfinished scan of these repos to resume; starting a new one\n")
+        job_id = db.start_scan_job(kind, key, repos, params={'min_impact': min_impact})
+        pending = list(dict.fromkeys(repos))
+    db.close()
+    
+    bugs = []
+    with AsyncBugWriter() as writer:
+        try:
+            for repo, repo_bugs, error in iter_repo_results(pending, min_impact=min_impact, token=token,
+                                                            max_workers=workers, on_progress=scan_progress()):
+                writer.call(lambda db, repo=repo, repo_bugs=repo_bugs, error=error:
+                            db.finish_scan_target(job_id, repo, repo_bugs, error=error))
+                bugs.extend(repo_bugs)
+        except KeyboardInterrupt:
+            print("\nInterrupted. Finished repos are saved; run again with --resume to continue.")
+            return bugs
+        complete = writer.call(lambda db: db.finish_scan_job(job_id))
+        
+    if not complete.result():
+        print("\nSome repos failed; run again with --resume to retry just those.")
+    bugs.sort(key=lambda b: b.impact_score, reverse=True)
+    return bugs
+
+
 def cmd_scan_multi(args):
     """Scan multiple repositories."""
     if len(args) < 2:
@@ -138,6 +354,9 @@ def cmd_scan_multi(args):
     repos = []
     min_impact = 70
     save_results = False
+    insights_only = False
+    resume = False
+    workers = DEFAULT_MAX_WORKERS
     token = os.environ.get('GITHUB_TOKEN') or get_token('github')
     
     i = 0
@@ -149,6 +368,15 @@ def cmd_scan_multi(args):
             elif args[i] == '--save':
                 save_results = True
                 i += 1
+            elif args[i] == '--insights':
+                insights_only = True
+                i += 1
+            elif args[i] == '--resume':
+                resume = True
+                i += 1
+            elif args[i] == '--workers' and i + 1 < len(args):
+                workers = max(1, int(args[i + 1]))
+                i += 2
             elif args[i] == '--token' and i + 1 < len(args):
                 token = args[i + 1]
                 i += 2
@@ -165,13 +393,21 @@ def cmd_scan_multi(args):
     print(f"Scanning {len(repos)} repositories...")
     print(f"Minimum impact: {min_impact}\n")
     
-    bugs = scan_multiple_repos(repos, min_impact=min_impact, token=token)
+    progress = scan_progress()
+    if insights_only:
+        # Aggregate as results arrive instead of collecting the whole scan
+        print(generate_insights(iter_multiple_repos(repos, min_impact=min_impact, token=token,
+                                                    max_workers=workers, on_progress=progress)))
+        return
     
-    if save_results:
-        db = BugDatabase()
-        db.save_bugs(bugs)
-        db.close()
+    if save_results or resume:
+        # Saved repo by repo, so an interrupted scan can pick up with --resume
+        bugs = run_checkpointed_scan('multi', ','.join(sorted(set(repos))), repos, min_impact,
+                                     token, resume=resume, workers=workers)
         print(f"\nSaved {len(bugs)} bugs to local database")
+    else:
+        bugs = scan_multiple_repos(repos, min_impact=min_impact, token=token,
+                                   max_workers=workers, on_progress=progress)
         
     print_bugs(bugs[:10])  # Show top 10
     
@@ -187,27 +423,62 @@ def cmd_list(args):
     """List saved bugs from database."""
     min_impact = 70
     output_json = False
+    limit = None
+    after = None
+    filters = {}
     
     i = 0
     while i < len(args):
-        if args[i] == '--min-impact' and i + 1 < len(args):
+        next_i = parse_filter_option(args, i, filters)
+        if next_i is not None:
+            i = next_i
+        elif args[i] == '--min-impact' and i + 1 < len(args):
             min_impact = int(args[i + 1])
             i += 2
+        elif args[i] == '--diagnosed':
+            # Only bugs with a stored AI diagnosis, shown with it
+            filters['diagnosed'] = True
+            i += 1
         elif args[i] == '--json':
             output_json = True
             i += 1
+        elif args[i] == '--limit' and i + 1 < len(args):
+            limit = int(args[i + 1])
+            i += 2
+        elif args[i] == '--after' and i + 1 < len(args):
+            # Keyset cursor from a previous page: "<impact_score>:<id>"
+            score, bug_id = args[i + 1].split(':')
+            after = (int(score), int(bug_id))
+            i += 2
         else:
             i += 1
             
     db = BugDatabase()
-    bugs_data = db.get_bugs(min_impact=min_impact)
-    db.close()
     
     if output_json:
-        # Convert rows to dicts if they aren't already
-        json_bugs = [dict(b) for b in bugs_data]
-        print(json.dumps(json_bugs))
+        if limit is not None:
+            print(json.dumps(db.get_bugs_page(after=after, limit=limit,
+                                              min_impact=min_impact, **filters)))
+        else:
+            # Stream page by page so large databases never sit in memory
+            sys.stdout.write('[')
+            first = True
+            while True:
+                page = db.get_bugs_page(after=after, limit=500, min_impact=min_impact, **filters)
+                for bug in page:
+                    sys.stdout.write(('' if first else ',') + json.dumps(bug))
+                    first = False
+                if len(page) < 500:
+                    break
+                after = (page[-1]['impact_score'], page[-1]['id'])
+            sys.stdout.write(']\n')
+        db.close()
         return
+        
+    shown = limit or 20
+    bugs_data = db.get_bugs_page(after=after, limit=shown, min_impact=min_impact, **filters)
+    total = db.count_bugs(min_impact=min_impact, **filters)
+    db.close()
 
     if not bugs_data:
         print(f"No saved bugs with impact >= {min_impact}")
@@ -216,25 +487,146 @@ def cmd_list(args):
         
     print(f"\nSaved bugs (impact >= {min_impact}):\n")
     
-    for i, bug in enumerate(bugs_data[:20], 1):
+    for i, bug in enumerate(bugs_data, 1):
         indicator = "🔥" if bug['impact_score'] >= 90 else "⭐" if bug['impact_score'] >= 80 else "✨"
-        print(f"{i}. [{bug['impact_score']}/100] {indicator} {bug['repo']}")
+        print(f"{i}. [{bug['impact_score']}/100] {indicator} {repo_key(bug['platform'], bug['instance'], bug['repo'])}")
         print(f"   {bug['title']}")
         print(f"   Users: ~{bug['affected_users']:,} | Severity: {bug['severity']}")
         print(f"   {bug['url']}")
+        if filters.get('diagnosed') and bug['diagnosis']:
+            print("   " + bug['diagnosis'].replace('\n', '\n   '))
         print()
         
-    if len(bugs_data) > 20:
-        print(f"... and {len(bugs_data) - 20} more")
+    if total > len(bugs_data) and after is None:
+        last = bugs_data[-1]
+        print(f"... and {total - len(bugs_data)} more")
+        # The cursor only makes sense for the same query, so repeat every filter
+        hint = ['bugnosis', 'list', '--min-impact', str(min_impact)]
+        for name in ('platform', 'repo', 'severity', 'label'):
+            if filters.get(name):
+                hint += [f'--{name}', filters[name]]
+        if filters.get('diagnosed'):
+            hint.append('--diagnosed')
+        if limit is not None:
+            hint += ['--limit', str(limit)]
+        hint += ['--after', f"{last['impact_score']}:{last['id']}"]
+        print("Next page: " + ' '.join(shlex.quote(arg) for arg in hint))
+        
+    print(f"Total: {total} bugs")
+
+
+def cmd_find(args):
+    """Full-text search over saved bugs."""
+    if len(args) < 1:
+        print("Error: Search text required")
+        print('Usage: bugnosis find "text" [--min-impact N] [--limit N] [--json]')
+        sys.exit(1)
         
-    print(f"Total: {len(bugs_data)} bugs")
+    text = args[0]
+    min_impact = 0
+    limit = 20
+    output_json = False
+    
+    i = 1
+    while i < len(args):
+        if args[i] == '--min-impact' and i + 1 < len(args):
+            min_impact = int(args[i + 1])
+            i += 2
+        elif args[i] == '--limit' and i + 1 < len(args):
+            limit = int(args[i + 1])
+            i += 2
+        elif args[i] == '--json':
+            output_json = True
+            i += 1
+        else:
+            i += 1
+            
+    db = BugDatabase()
+    bugs_data = db.find_bugs(text, min_impact=min_impact, limit=limit)
+    db.close()
+    
+    if output_json:
+        print(json.dumps(bugs_data))
+        return
+        
+    if not bugs_data:
+        print(f"No saved bugs match '{text}'")
+        print("Run 'bugnosis scan <repo> --save' to save bugs")
+        return
+        
+    print(f"\nSaved bugs matching '{text}':\n")
+    
+    for i, bug in enumerate(bugs_data, 1):
+        indicator = "🔥" if bug['impact_score'] >= 90 else "⭐" if bug['impact_score'] >= 80 else "✨"
+        print(f"{i}. [{bug['impact_score']}/100] {indicator} {repo_key(bug['platform'], bug['instance'], bug['repo'])}")
+        print(f"   {bug['title']}")
+        print(f"   Users: ~{bug['affected_users']:,} | Severity: {bug['severity']}")
+        print(f"   {bug['url']}")
+        print()
+
+
+def cmd_trends(args):
+    """Fastest rising saved bugs, from the score history rollups."""
+    days = 7
+    limit = 10
+    output_json = False
+    compact = False
+    filters = {}
+    
+    i = 0
+    while i < len(args):
+        next_i = parse_filter_option(args, i, filters)
+        if next_i is not None:
+            i = next_i
+        elif args[i] == '--days' and i + 1 < len(args):
+            days = int(args[i + 1])
+            i += 2
+        elif args[i] == '--limit' and i + 1 < len(args):
+            limit = int(args[i + 1])
+            i += 2
+        elif args[i] == '--json':
+            output_json = True
+            i += 1
+        elif args[i] == '--compact':
+            compact = True
+            i += 1
+        else:
+            i += 1
+            
+    db = BugDatabase()
+    if compact:
+        removed = db.compact_history()
+        if not output_json:
+            print(f"Compacted score history: {sum(removed.values())} rows removed")
+    bugs_data = db.get_trends(days=days, limit=limit, **filters)
+    db.close()
+    
+    if output_json:
+        print(json.dumps(bugs_data))
+        return
+        
+    if not bugs_data:
+        print(f"No rising bugs in the last {days} days")
+        print("Rescan saved repos with --save to build up score history")
+        return
+        
+    print(f"\nFastest rising bugs (last {days} days):\n")
+    
+    for i, bug in enumerate(bugs_data, 1):
+        print(f"{i}. [{bug['open_score']} -> {bug['close_score']}] "
+              f"{repo_key(bug['platform'], bug['instance'], bug['repo'])}#{bug['issue_number']}")
+        print(f"   {bug['title']}")
+        print(f"   Score: {bug['score_delta']:+d} | Comments: {bug['comments_delta']:+d} | "
+              f"Reactions: {bug['reactions_delta']:+d}")
+        print(f"   {bug['url']}")
+        print()
 
 
 def cmd_stats(args):
     """Show contribution statistics."""
     db = BugDatabase()
     stats = db.get_stats()
-    bugs_count = len(db.get_bugs())
+    bugs_count = db.count_bugs()
     db.close()
     
     print("\nYour Bugnosis Stats:\n")
@@ -254,24 +646,29 @@ def cmd_clear_cache(args):
     """Clear API cache."""
     cache = APICache()
     cache.clear()
-    print("API cache cleared!")
+    LLMCache().clear()
+    print("API and AI response caches cleared!")
 
 
 def cmd_export(args):
     """Export bugs to file."""
     if len(args) < 2:
         print("Error: Format and output file required")
-        print("Usage: bugnosis export <json|csv|markdown> <output-file> [--min-impact N]")
+        print("Usage: bugnosis export <json|csv|markdown> <output-file> [--min-impact N] [--platform P] [--repo R] [--severity S] [--label L]")
         sys.exit(1)
         
     format_type = args[0].lower()
     output_file = args[1]
     min_impact = 0
+    filters = {}
     
     # Parse options
     i = 2
     while i < len(args):
-        if args[i] == '--min-impact' and i + 1 < len(args):
+        next_i = parse_filter_option(args, i, filters)
+        if next_i is not None:
+            i = next_i
+        elif args[i] == '--min-impact' and i + 1 < len(args):
             min_impact = int(args[i + 1])
             i += 2
         else:
@@ -279,7 +676,7 @@ def cmd_export(args):
     
     # Get bugs from database
     db = BugDatabase()
-    bugs = db.get_bugs(min_impact=min_impact)
+    bugs = db.get_bugs(min_impact=min_impact, **filters)
     db.close()
     
     if not bugs:
@@ -336,26 +733,31 @@ def cmd_leaderboard(args):
 def cmd_insights(args):
     """Generate insights from saved bugs."""
     min_impact = 0
+    filters = {}
     
     # Parse options
     i = 0
     while i < len(args):
-        if args[i] == '--min-impact' and i + 1 < len(args):
+        next_i = parse_filter_option(args, i, filters)
+        if next_i is not None:
+            i = next_i
+        elif args[i] == '--min-impact' and i + 1 < len(args):
             min_impact = int(args[i + 1])
             i += 2
         else:
             i += 1
             
     db = BugDatabase()
-    bugs = db.get_bugs(min_impact=min_impact)
-    db.close()
+    analytics = DatabaseAnalytics(db, min_impact=min_impact, **filters)
     
-    if not bugs:
+    if not analytics.total_potential_impact()['total_bugs']:
+        db.close()
         print(f"No bugs found with impact >= {min_impact}")
         print("Run 'bugnosis scan <repo> --save' first")
         return
         
-    print(generate_insights(bugs))
+    print(analytics.summary())
+    db.close()
 
 
 def cmd_watch(args):
@@ -408,12 +810,11 @@ def cmd_watch(args):
         min_impact = config.get('min_impact', 70)
         print(f"Scanning {len(repos)} watched repositories...\n")
         
-        bugs = scan_multiple_repos(repos, min_impact=min_impact, 
-                                  token=config.get_github_token())
-        
-        db = BugDatabase()
-        db.save_bugs(bugs)
-        db.close()
+        # Each repo is saved and checkpointed while the others are still being fetched.
+        # Keyed by the repo set, so --resume after editing the watch list starts afresh.
+        key = 'watch:' + hashlib.sha1('\n'.join(sorted(set(repos))).encode()).hexdigest()
+        bugs = run_checkpointed_scan('watch', key, repos, min_impact, config.get_github_token(),
+                                     resume='--resume' in args[1:])
         
         print(f"\nFound {len(bugs)} high-impact bugs")
         print(f"Total potential impact: ~{sum(b.affected_users for b in bugs):,} users")
@@ -424,6 +825,93 @@ def cmd_watch(args):
         print("Available: add, remove, list, scan")
 
 
+def cmd_enqueue(args):
+    """Queue repo scans for `bugnosis worker` processes."""
+    queue_path = None
+    config = BugnosisConfig()
+    min_impact = config.get('min_impact', 70)
+    repos = []
+    
+    i = 0
+    while i < len(args):
+        if args[i] == '--queue' and i + 1 < len(args):
+            queue_path = args[i + 1]
+            i += 2
+        elif args[i] == '--min-impact' and i + 1 < len(args):
+            min_impact = int(args[i + 1])
+            i += 2
+        elif args[i].startswith('--'):
+            i += 1
+        else:
+            repos.append(args[i])
+            i += 1
+            
+    if not repos:
+        # Default: fan out the whole watch list
+        repos = config.get_watched_repos()
+    if not repos:
+        print("No repositories to queue")
+        print("Usage: bugnosis enqueue [repo...] [--queue FILE] [--min-impact N]")
+        print("       (defaults to the watch list)")
+        return
+        
+    job_queue = SQLiteJobQueue(queue_path)
+    added = enqueue_repo_scans(job_queue, repos, min_impact=min_impact)
+    stats = job_queue.stats()
+    job_queue.close()
+    
+    print(f"Queued {added} scan jobs ({len(repos) - added} already waiting)")
+    print(f"Queue: {stats['queued']} queued, {stats['leased']} running, "
+          f"{stats['done']} done, {stats['dead']} failed")
+    print("Start workers with: bugnosis worker" + (f" --queue {queue_path}" if queue_path else ""))
+
+
+def cmd_worker(args):
+    """Process queued scan jobs until stopped."""
+    queue_path = None
+    db_path = None
+    drain = False
+    poll = 2.0
+    visibility = DEFAULT_VISIBILITY_TIMEOUT
+    
+    i = 0
+    while i < len(args):
+        if args[i] == '--queue' and i + 1 < len(args):
+            queue_path = args[i + 1]
+            i += 2
+        elif args[i] == '--db' and i + 1 < len(args):
+            db_path = args[i + 1]
+            i += 2
+        elif args[i] == '--drain':
+            drain = True
+            i += 1
+        elif args[i] == '--poll' and i + 1 < len(args):
+            poll = float(args[i + 1])
+            i += 2
+        elif args[i] == '--visibility-timeout' and i + 1 < len(args):
+            visibility = float(args[i + 1])
+            i += 2
+        else:
+            i += 1
+            
+    token = os.environ.get('GITHUB_TOKEN') or get_token('github')
+    job_queue = SQLiteJobQueue(queue_path)
+    worker = ScanWorker(job_queue, db_path=db_path, token=token, visibility_timeout=visibility)
+    print(f"Worker {worker.worker_id} waiting for jobs" + (" (exits when no jobs are queued, retrying or leased)" if drain else ""))
+    
+    try:
+        worker.run(poll_interval=poll, drain=drain)
+    except KeyboardInterrupt:
+        print("\nStopping; the current job was handed back to the queue.")
+    finally:
+        worker.close()
+        job_queue.close()
+        
+    print(f"Processed {worker.processed} jobs ({worker.failed} failed), saved {worker.saved} bugs")
+    if worker.lost:
+        print(f"{worker.lost} jobs outlived their lease and were left to other workers")
+
+
 def cmd_config(args):
     """Manage configuration."""
     if len(args) < 1:
@@ -469,9 +957,11 @@ def cmd_config(args):
 
 def cmd_copilot(args):
     """AI Co-Pilot for guided bug fixing."""
+    fresh = '--fresh' in args
+    args = [a for a in args if a != '--fresh']
     if len(args) < 2:
         print("Error: Repository and issue number required")
-        print("Usage: bugnosis copilot owner/repo issue-number")
+        print("Usage: bugnosis copilot owner/repo issue-number [--fresh]")
         sys.exit(1)
         
     repo = args[0]
@@ -491,15 +981,17 @@ def cmd_copilot(args):
     print(f"\n🤖 Starting AI Co-Pilot for {repo}#{issue_num}...\n")
     
     # Fetch issue
-    client = GitHubClient(token=token)
+    client = GitHubClient(token=token, use_cache=not fresh)
     issue = client.get_issue(repo, issue_num)
     
     if not issue:
         print(f"Error: Could not fetch issue #{issue_num}")
         sys.exit(1)
+    if issue.get('comments'):
+        issue = {**issue, 'comments_data': client.get_issue_comments(repo, issue_num)}
     
     # Initialize Co-Pilot
-    copilot = BugFixCopilot(api_key=groq_key)
+    copilot = BugFixCopilot(api_key=groq_key, use_cache=not fresh)
     
     print("="*70)
     print(f"Issue: {issue['title']}")
@@ -510,11 +1002,10 @@ def cmd_copilot(args):
     # Step 1: Analyze
     print("📊 Step 1: Deep Analysis")
     print("-" * 70)
-    analysis = copilot.analyze_bug(issue)
+    analysis = copilot.analyze_bug(issue, on_token=print_token)
     
     if analysis.get('success'):
-        print(analysis['analysis'])
-        print()
+        print("\n")
     else:
         print(f"Error: {analysis.get('error')}")
         sys.exit(1)
@@ -552,9 +1043,11 @@ def cmd_copilot(args):
 
 def cmd_difficulty(args):
     """Estimate bug difficulty."""
+    fresh = '--fresh' in args
+    args = [a for a in args if a != '--fresh']
     if len(args) < 2:
         print("Error: Repository and issue number required")
-        print("Usage: bugnosis difficulty owner/repo issue-number")
+        print("Usage: bugnosis difficulty owner/repo issue-number [--fresh]")
         sys.exit(1)
         
     repo = args[0]
@@ -567,7 +1060,7 @@ def cmd_difficulty(args):
         sys.exit(1)
     
     # Fetch issue
-    client = GitHubClient(token=token)
+    client = GitHubClient(token=token, use_cache=not fresh)
     issue = client.get_issue(repo, issue_num)
     
     if not issue:
@@ -576,7 +1069,7 @@ def cmd_difficulty(args):
     
     print(f"\nEstimating difficulty for: {issue['title']}\n")
     
-    copilot = BugFixCopilot(api_key=groq_key)
+    copilot = BugFixCopilot(api_key=groq_key, use_cache=not fresh)
     result = copilot.estimate_difficulty(issue)
     
     if result.get('success'):
@@ -672,20 +1165,7 @@ def cmd_scan_platform(args):
         # Save if requested
         if save_results:
             db = BugDatabase()
-            for bug in bugs:
-                db.save_bug(
-                    repo=f"{bug.platform}:{bug.repo}",
-                    issue_number=bug.issue_number,
-                    title=bug.title,
-                    url=bug.url,
-                    impact_score=bug.impact_score,
-                    affected_users=bug.affected_users,
-                    severity=bug.severity,
-                    labels=bug.labels,
-                    comments=bug.comments_count,
-                    created_at=bug.created_at.isoformat() if bug.created_at else None,
-                    updated_at=bug.updated_at.isoformat() if bug.updated_at else None
-                )
+            db.save_bugs(bugs)
             db.close()
             print(f"✅ Saved {len(bugs)} bugs to database")
         
@@ -787,16 +1267,96 @@ def cmd_smart_scan(args):
     cmd_scan_platform(scan_args)
 
 
+def format_target(target):
+    """Render a resolved target as 'platform[-instance]:target'."""
+    platform = target.get('platform', 'github')
+    if target.get('instance'):
+        platform = f"{platform}-{target['instance']}"
+    return f"{platform}:{target.get('target')}"
+
+
+def cmd_targets(args):
+    """Inspect and pin how queries resolve to platform targets."""
+    if len(args) < 1:
+        print("Error: Subcommand required")
+        print("Usage: bugnosis targets <list|resolve|match|pin|unpin> [args]")
+        sys.exit(1)
+        
+    subcommand = args[0]
+    cache = TargetCache()
+    
+    if subcommand == 'list':
+        pins = cache.pins()
+        if not pins:
+            print("No pinned queries")
+            print('Pin with: bugnosis targets pin "query" github:owner/repo [bugzilla-mozilla:Product ...]')
+            return
+        print(f"Pinned queries ({len(pins)}):\n")
+        for query, targets in sorted(pins.items()):
+            print(f"  {query} -> {', '.join(format_target(t) for t in targets)}")
+            
+    elif subcommand == 'resolve':
+        if len(args) < 2:
+            print("Usage: bugnosis targets resolve \"query\" [--fresh]")
+            sys.exit(1)
+        targets = AIEngine().resolve_targets(args[1], use_cache='--fresh' not in args)
+        for target in targets:
+            print(format_target(target))
+            
+    elif subcommand == 'match':
+        if len(args) < 2:
+            print("Usage: bugnosis targets match \"query\"")
+            sys.exit(1)
+        from .projects import get_project_index
+        matches = get_project_index().search(args[1])
+        if not matches:
+            print(f"No known projects resemble '{args[1]}'")
+            return
+        for score, project in matches:
+            print(f"  {score:.2f}  {project['name']} -> "
+                  f"{', '.join(format_target(t) for t in project['targets'])}")
+            
+    elif subcommand == 'pin':
+        if len(args) < 3:
+            print("Usage: bugnosis targets pin \"query\" platform[-instance]:target [...]")
+            sys.exit(1)
+        targets = []
+        for spec in args[2:]:
+            platform, instance, target = parse_repo_key(spec)
+            entry = {'platform': platform, 'target': target}
+            if instance:
+                entry['instance'] = instance
+            targets.append(entry)
+        cache.pin(args[1], targets)
+        print(f"Pinned '{TargetCache.normalize(args[1])}' -> {', '.join(format_target(t) for t in targets)}")
+        
+    elif subcommand == 'unpin':
+        if len(args) < 2:
+            print("Usage: bugnosis targets unpin \"query\"")
+            sys.exit(1)
+        if cache.unpin(args[1]):
+            print(f"Unpinned '{TargetCache.normalize(args[1])}'")
+        else:
+            print(f"'{args[1]}' is not pinned")
+            
+    else:
+        print(f"Unknown subcommand: {subcommand}")
+        print("Available: list, resolve, match, pin, unpin")
+
+
 def cmd_search(args):
     """Federated search across multiple platforms."""
     if len(args) < 1:
         print("Error: Query required")
-        print("Usage: bugnosis search \"query\" [options]")
+        print("Usage: bugnosis search \"query\" [--min-impact N] [--save] [--stream] [--deadline SECONDS]")
         sys.exit(1)
         
     query = args[0]
     min_impact = 70
     save_results = False
+    stream = False
+    config = BugnosisConfig()
+    deadline = config.get('search.deadline', 20)
     
     i = 1
     while i < len(args):
@@ -806,22 +1366,74 @@ def cmd_search(args):
         elif args[i] == '--save':
             save_results = True
             i += 1
+        elif args[i] == '--stream':
+            stream = True
+            i += 1
+        elif args[i] == '--deadline' and i + 1 < len(args):
+            deadline = float(args[i + 1])
+            i += 2
         else:
             i += 1
             
+    from .federated import FederatedSearch, configure_search_pool
+    
+    configure_search_pool(max_workers=config.get('search.max_workers', 8),
+                          platform_limits=config.get('search.platform_limits'))
+    
+    # Saving happens on a writer thread while the remaining targets are fetched
+    writer = AsyncBugWriter() if save_results else None
+    engine = FederatedSearch(min_impact=min_impact, writer=writer, deadline=deadline,
+                             target_timeout=config.get('search.target_timeout', 15))
+    
+    if stream:
+        # NDJSON: one line per target as it completes, for the GUI and scripts
+        try:
+            for update in engine.iter_search(query):
+                print(json.dumps({
+                    'target': update['target'],
+                    'bugs': [bug.to_dict() for bug in update['bugs']],
+                    'status': update['status'],
+                    'latency_ms': update['latency_ms'],
+                    'error': update['error'],
+                    'completed': update['completed'],
+                    'total_targets': update['total_targets'],
+                }), flush=True)
+        finally:
+            if writer:
+                writer.close()
+        return
+        
     print(f"🔎 Searching bug ecosystem for: '{query}'")
     print(f"   Minimum impact: {min_impact}")
     print()
     
-    from .federated import FederatedSearch
-    
-    engine = FederatedSearch(min_impact=min_impact)
-    results = engine.search(query)
+    def show_progress(update):
+        """Report each target as it finishes instead of waiting for the slowest."""
+        if update['error']:
+            return
+        target = update['target']
+        best = update['bugs'][0] if update['bugs'] else None
+        print(f"   [{update['completed']}/{update['total_targets']}] "
+              f"{target['platform'].upper()}: {target['target']} - {len(update['bugs'])} bugs"
+              + (f" (top: {best.impact_score}/100)" if best else "")
+              + f" in {update['latency_ms'] / 1000:.1f}s", flush=True)
+        
+    try:
+        results = engine.search(query, on_partial=show_progress)
+    finally:
+        if writer:
+            writer.close()
+    print()
     
     bugs = results.get('results', [])
     stats = results.get('stats', {})
     targets = results.get('targets_scanned', [])
     
+    if results.get('partial'):
+        missed = [t for t in results['target_status'] if t['status'] != 'ok']
+        print(f"⚠️  Partial results: {len(missed)} of {len(targets)} targets did not answer in time or failed")
+        print()
+    
     # Show targets scanned
     print("Targets identified:")
     for t in targets:
@@ -864,23 +1476,7 @@ def cmd_search(args):
     print("="*60)
     
     if save_results:
-        db = BugDatabase()
-        for bug in bugs:
-            db.save_bug(
-                repo=f"{bug.platform}:{bug.repo}",
-                issue_number=bug.issue_number,
-                title=bug.title,
-                url=bug.url,
-                impact_score=bug.impact_score,
-                affected_users=bug.affected_users,
-                severity=bug.severity,
-                labels=bug.labels,
-                comments=bug.comments_count,
-                created_at=bug.created_at.isoformat() if bug.created_at else None,
-                updated_at=bug.updated_at.isoformat() if bug.updated_at else None
-            )
-        db.close()
-        print(f"\n✅ Saved {len(bugs)} bugs to database")
+        print(f"\n✅ Saved {writer.saved} bugs to database")
 
 
 def cmd_plugins(args):
@@ -908,9 +1504,11 @@ def cmd_plugins(args):
 
 def cmd_coach(args):
     """AI Rejection Coaching (Post-Mortem)."""
+    fresh = '--fresh' in args
+    args = [a for a in args if a != '--fresh']
     if len(args) < 2:
         print("Error: Repository and PR number required")
-        print("Usage: bugnosis coach owner/repo pr-number")
+        print("Usage: bugnosis coach owner/repo pr-number [--fresh]")
         sys.exit(1)
         
     repo = args[0]
@@ -924,19 +1522,19 @@ def cmd_coach(args):
 
     print(f"\n🎓 Analyzing Rejected PR #{pr_num} for coaching...\n")
 
-    client = GitHubClient(token=token)
+    client = GitHubClient(token=token, use_cache=not fresh)
     
     # We need PR details and review comments
     # GitHubClient needs to be extended or we use raw requests here for speed
     # For now, let's assume we can get basic PR data
     # Implementing a quick fetch here to avoid huge refactor of GitHubClient right now
     
-    import requests
-    headers = {'Authorization': f'token {token}'} if token else {}
+    from . import transport
+    headers = client.headers
     
     try:
         # Get PR
-        pr_resp = requests.get(f"https://api.github.com/repos/{repo}/pulls/{pr_num}", headers=headers)
+        pr_resp = transport.get(f"https://api.github.com/repos/{repo}/pulls/{pr_num}", headers=headers)
         if pr_resp.status_code != 200:
             print(f"Error fetching PR: {pr_resp.status_code}")
             return
@@ -952,17 +1550,17 @@ def cmd_coach(args):
             return
 
         # Get Reviews/Comments
-        comments_resp = requests.get(f"https://api.github.com/repos/{repo}/pulls/{pr_num}/reviews", headers=headers)
+        comments_resp = transport.get(f"https://api.github.com/repos/{repo}/pulls/{pr_num}/reviews", headers=headers)
         reviews = comments_resp.json() if comments_resp.status_code == 200 else []
         
         # Also get issue comments
-        issue_comments_resp = requests.get(f"https://api.github.com/repos/{repo}/issues/{pr_num}/comments", headers=headers)
+        issue_comments_resp = transport.get(f"https://api.github.com/repos/{repo}/issues/{pr_num}/comments", headers=headers)
         issue_comments = issue_comments_resp.json() if issue_comments_resp.status_code == 200 else []
 
         all_comments = reviews + issue_comments
 
         # Analyze
-        ai = AIEngine(api_key=groq_key)
+        ai = AIEngine(api_key=groq_key, use_cache=not fresh)
         coaching = ai.analyze_rejection(pr_data, all_comments)
 
         if 'error' in coaching:
@@ -1194,14 +1792,42 @@ def cmd_doctor(args):
         print("✨ System ready for high-impact engineering.")
 
 
+def sync_file(action, path):
+    """Stream the profile to or from a local NDJSON file (gzip if it ends in .gz)."""
+    db = BugDatabase()
+    try:
+        if action == 'backup':
+            with open_profile(path, 'w') as f:
+                counts = db.export_profile_ndjson(f)
+            print(f"✅ Backed up {counts['bugs']} bugs and {counts['contributions']} contributions to {path}")
+        else:
+            with open_profile(path) as f:
+                counts = db.import_profile_ndjson(f)
+            print(f"✅ Restored {counts['bugs']} bugs and {counts['contributions']} contributions from {path}")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ {action.capitalize()} failed: {e!r}")
+    finally:
+        db.close()
+
+
 def cmd_sync(args):
     """Cloud Sync: Backup/Restore your Hero Profile."""
     if len(args) < 1:
         print("Error: Action required")
         print("Usage: bugnosis sync <push|pull> [gist-id]")
+        print("       bugnosis sync <backup|restore> <file.ndjson[.gz]>")
         sys.exit(1)
         
     action = args[0]
+    
+    if action in ('backup', 'restore'):
+        # Local file backups don't need GitHub
+        if len(args) < 2:
+            print(f"Usage: bugnosis sync {action} <file.ndjson[.gz]>")
+            sys.exit(1)
+        sync_file(action, args[1])
+        return
+        
     gist_id = args[1] if len(args) > 1 else None
     
     # Get config to see if we have a saved gist_id
@@ -1279,6 +1905,9 @@ Core Workflow:
     bugnosis smart-scan "query"     Find bugs across all platforms (AI)
     bugnosis search "query"         Federated search (GitHub + GitLab + Bugzilla)
     bugnosis list                   View saved opportunities
+                                    (--platform, --repo, --severity, --label, --diagnosed)
+    bugnosis find "text"            Full-text search over saved bugs
+    bugnosis trends                 Fastest rising saved bugs (--days N)
     bugnosis stats                  View your impact dashboard
 
 Developer Tools:
@@ -1287,13 +1916,19 @@ Developer Tools:
     bugnosis sandbox <repo>         Launch Podman test environment
     bugnosis generate-pr            Draft a PR description
     bugnosis diagnose               AI root cause analysis
+                                    (--batch diagnoses saved bugs within API rate limits)
 
 Configuration:
     bugnosis auth <login|status>    Manage API tokens securely
     bugnosis sync <push|pull>       Backup profile to GitHub Gist
+                                    (backup|restore <file> for local NDJSON)
     bugnosis watch <add|scan>       Monitor repositories
+                                    (scan --resume continues an interrupted scan)
+    bugnosis enqueue [repo...]      Queue scans (default: watch list) for workers
+    bugnosis worker [--drain]       Run queued scans; start several to share the load
     bugnosis plugins                Manage external modules
     bugnosis config <get|set>       Tweaks (min_impact, theme)
+    bugnosis targets <list|pin>     Pin how search queries resolve
     bugnosis doctor                 Check system health & dependencies
 
 API Power Users:
@@ -1318,6 +1953,21 @@ Run 'bugnosis help' for detailed options.
     elif command == 'list':
         cmd_list(args[1:])
         return
+    elif command == 'find':
+        cmd_find(args[1:])
+        return
+    elif command == 'trends':
+        cmd_trends(args[1:])
+        return
+    elif command == 'enqueue':
+        cmd_enqueue(args[1:])
+        return
+    elif command == 'worker':
+        cmd_worker(args[1:])
+        return
+    elif command == 'targets':
+        cmd_targets(args[1:])
+        return
     elif command == 'stats':
         cmd_stats(args[1:])
         return
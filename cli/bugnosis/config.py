@@ -16,6 +16,16 @@ class BugnosisConfig:
         'watched_repos': [],
         'export_dir': './exports',
         'cache_ttl': 3600,
+        'search': {
+            'deadline': 20,
+            'target_timeout': 15,
+            'max_workers': 8,
+            'platform_limits': {}
+        },
+        'ai': {
+            'rpm': 30,
+            'tpm': 12000
+        },
         'notifications': {
             'enabled': False,
             'threshold': 85
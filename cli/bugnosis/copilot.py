@@ -9,21 +9,33 @@ The Co-Pilot helps you fix bugs faster while YOU stay in control:
 """
 
 import os
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Callable
 from groq import Groq
+from .cache import LLMCache
+from .prompting import PromptBuilder, format_comments
+
+# Prompt token budgets; completions get their own max_tokens on top
+ANALYSIS_PROMPT_TOKENS = 3000
+FIX_PROMPT_TOKENS = 3500
+DIFFICULTY_PROMPT_TOKENS = 1000
 
 
 class BugFixCopilot:
     """AI Co-Pilot for guided bug fixing."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, use_cache: bool = True):
         """
         Initialize Co-Pilot.
         
         Args:
             api_key: Groq API key (optional, will check env)
+            use_cache: Reuse earlier analyses of unchanged issues; False
+                       always asks the model (answers are still stored)
         """
         self.api_key = api_key or os.getenv("GROQ_API_KEY")
+        self.model = "llama-3.3-70b-versatile"
+        self.use_cache = use_cache
+        self.cache = LLMCache()
         self.client = None
         if self.api_key:
             self.client = Groq(api_key=self.api_key)
@@ -31,13 +43,72 @@ class BugFixCopilot:
         # Conversation history for context
         self.conversation = []
         
-    def analyze_bug(self, issue: Dict, code_context: Optional[str] = None) -> Dict[str, str]:
+    def _complete(self, prompt: str, temperature: float, max_tokens: int,
+                  updated_at: Optional[str] = None,
+                  on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Single-prompt completion, answered from the LLM cache when possible.
+        
+        Shares its cache with AIEngine, keyed on model, prompt, sampling
+        settings and the issue's updated_at. Only identical requests hit:
+        estimate_difficulty() answers are shared between `bugnosis copilot`
+        and `bugnosis difficulty`, but analyze_bug() and
+        estimate_difficulty() build different prompts and never share an
+        entry. With `on_token`, the completion
+        is streamed and each piece handed to it as it arrives (a cached
+        answer arrives as one piece).
+        """
+        messages = [{"role": "user", "content": prompt}]
+        key = LLMCache.key(self.model, messages, temperature, max_tokens, updated_at=updated_at)
+        if self.use_cache:
+            cached = self.cache.get(key)
+            if cached:
+                if on_token:
+                    on_token(cached)
+                return cached
+                
+        finished = True
+        if on_token:
+            parts = []
+            finished = False
+            for chunk in self.client.chat.completions.create(
+                messages=messages,
+                model=self.model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+            ):
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    parts.append(text)
+                    on_token(text)
+                # The last chunk carries a finish_reason; without it the stream was cut short
+                finished = finished or chunk.choices[0].finish_reason is not None
+            content = ''.join(parts)
+        else:
+            response = self.client.chat.completions.create(
+                messages=messages,
+                model=self.model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+            content = response.choices[0].message.content or ''
+        # Empty or cut-off answers are not cached, so a retry asks again
+        if finished and content.strip():
+            self.cache.set(key, content)
+        return content
+        
+    def analyze_bug(self, issue: Dict, code_context: Optional[str] = None,
+                    on_token: Optional[Callable[[str], None]] = None) -> Dict[str, str]:
         """
         Deeply analyze a bug with code context.
         
         Args:
             issue: GitHub issue dict with title, body, etc.
             code_context: Optional code snippets from the repo
+            on_token: Optional callback given the analysis as it streams in
             
         Returns:
             Dictionary with analysis, root_cause, fix_strategy
@@ -45,16 +116,23 @@ class BugFixCopilot:
         if not self.client:
             return {"error": "AI Co-Pilot requires GROQ_API_KEY"}
         
-        context_str = f"Code Context:\n{code_context}" if code_context else ""
-        
-        prompt = f"""You are an expert software engineer helping fix a bug.
+        title = issue.get('title', 'N/A')
+        builder = PromptBuilder(ANALYSIS_PROMPT_TOKENS, query=title)
+        builder.add(f"""You are an expert software engineer helping fix a bug.
 
-Issue: {issue.get('title', 'N/A')}
+Issue: {title}
 
 Description:
-{issue.get('body', 'N/A')}
-
-{context_str}
+""")
+        builder.add_section(issue.get('body') or 'N/A')
+        discussion = format_comments(issue.get('comments_data') or [])
+        if discussion:
+            builder.add("\n\nDiscussion:\n")
+            builder.add_section(discussion)
+        if code_context:
+            builder.add("\n\nCode Context:\n")
+            builder.add_section(code_context, clean=False)
+        builder.add("""
 
 Provide a detailed analysis:
 1. What is the bug?
@@ -63,17 +141,12 @@ Provide a detailed analysis:
 4. What files likely need changes?
 5. Are there any edge cases to consider?
 
-Be specific and technical."""
+Be specific and technical.""")
+        prompt = builder.build()
 
         try:
-            response = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama-3.3-70b-versatile",
-                temperature=0.3,
-                max_tokens=2048,
-            )
-            
-            analysis = response.choices[0].message.content
+            analysis = self._complete(prompt, temperature=0.3, max_tokens=2048,
+                                      updated_at=issue.get('updated_at'), on_token=on_token)
             self.conversation.append({
                 "role": "assistant",
                 "content": analysis,
@@ -91,7 +164,8 @@ Be specific and technical."""
                     issue: Dict,
                     file_path: str,
                     file_content: str,
-                    analysis: Optional[str] = None) -> Dict[str, str]:
+                    analysis: Optional[str] = None,
+                    on_token: Optional[Callable[[str], None]] = None) -> Dict[str, str]:
         """
         Generate code fix for a specific file.
         
@@ -100,6 +174,7 @@ Be specific and technical."""
             file_path: Path to file that needs fixing
             file_content: Current content of the file
             analysis: Previous analysis (optional)
+            on_token: Optional callback given the fix as it streams in
             
         Returns:
             Dictionary with original_code, fixed_code, explanation
@@ -107,20 +182,25 @@ Be specific and technical."""
         if not self.client:
             return {"error": "AI Co-Pilot requires GROQ_API_KEY"}
         
-        context = ""
-        if analysis:
-            context = f"\n\nPrevious Analysis:\n{analysis}\n"
-        
-        prompt = f"""You are helping fix this bug:
+        title = issue.get('title', 'N/A')
+        builder = PromptBuilder(FIX_PROMPT_TOKENS, query=f"{title} {analysis or ''}")
+        builder.add(f"""You are helping fix this bug:
 
-Issue: {issue.get('title', 'N/A')}
-{context}
+Issue: {title}
+""")
+        if analysis:
+            builder.add("\n\nPrevious Analysis:\n")
+            builder.add_section(analysis)
+        builder.add(f"""
 
 File: {file_path}
 
 Current Code:
 ```
-{file_content[:3000]}  # Truncate if very long
+""")
+        # Irrelevant stretches of the file are elided rather than cutting off its end
+        builder.add_section(file_content, clean=False)
+        builder.add("""
 ```
 
 Generate a fix:
@@ -142,17 +222,13 @@ Format your response as:
 
 ## Testing Strategy
 [how to verify the fix works]
-"""
+""")
+        prompt = builder.build()
 
         try:
-            response = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama-3.3-70b-versatile",
-                temperature=0.2,  # Lower temp for code generation
-                max_tokens=3000,
-            )
-            
-            fix = response.choices[0].message.content
+            # Lower temp for code generation
+            fix = self._complete(prompt, temperature=0.2, max_tokens=3000,
+                                 updated_at=issue.get('updated_at'), on_token=on_token)
             self.conversation.append({
                 "role": "assistant",
                 "content": fix,
@@ -437,14 +513,20 @@ Rate the fix: APPROVE / NEEDS_WORK / REJECT
         if not self.client:
             return {"error": "AI Co-Pilot requires GROQ_API_KEY"}
         
-        prompt = f"""Estimate the difficulty of fixing this bug:
+        title = issue.get('title', 'N/A')
+        labels = ', '.join(label['name'] if isinstance(label, dict) else label
+                           for label in issue.get('labels', []))
+        builder = PromptBuilder(DIFFICULTY_PROMPT_TOKENS, query=title)
+        builder.add(f"""Estimate the difficulty of fixing this bug:
 
-Issue: {issue.get('title', 'N/A')}
+Issue: {title}
 
 Description:
-{issue.get('body', 'N/A')[:1000]}
+""")
+        builder.add_section(issue.get('body') or 'N/A')
+        builder.add(f"""
 
-Labels: {', '.join(issue.get('labels', []))}
+Labels: {labels}
 
 Provide:
 1. Difficulty: EASY / MEDIUM / HARD / EXPERT
@@ -453,17 +535,12 @@ Provide:
 4. Prerequisites: What knowledge needed?
 5. Similar fixes: Have you seen this before?
 
-Be realistic and helpful."""
+Be realistic and helpful.""")
+        prompt = builder.build()
 
         try:
-            response = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama-3.3-70b-versatile",
-                temperature=0.3,
-                max_tokens=1000,
-            )
-            
-            estimate = response.choices[0].message.content
+            estimate = self._complete(prompt, temperature=0.3, max_tokens=1000,
+                                      updated_at=issue.get('updated_at'))
             
             # Extract difficulty level
             estimate_lower = estimate.lower()
@@ -0,0 +1,166 @@
+"""Batch AI diagnosis of saved bugs."""
+
+import concurrent.futures
+import json
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .ai import AIEngine
+from .github import GitHubClient
+from .governor import estimate_tokens
+from .storage import BugDatabase
+
+DEFAULT_FETCH_WORKERS = 8
+# Requests in flight to the LLM; the governor decides how fast they start
+DEFAULT_AI_WORKERS = 4
+# Issues whose prompt section fits in PACK_TOKENS are diagnosed PACK_SIZE at
+# a time. Longer ones get a request of their own so no answer is squeezed.
+PACK_TOKENS = 150
+PACK_SIZE = 4
+PACK_MAX_TOKENS = 350  # completion tokens allowed per packed issue
+
+
+def issue_from_bug(bug: Dict) -> Dict:
+    """Issue data for the diagnosis prompt, built from a saved bug row."""
+    try:
+        labels = json.loads(bug.get('labels') or '[]')
+    except (TypeError, ValueError):
+        labels = []
+    return {
+        'title': bug.get('title'),
+        'body': bug.get('description') or '',
+        'comments': bug.get('comments') or 0,
+        'labels': [label if isinstance(label, dict) else {'name': str(label)} for label in labels],
+        'updated_at': bug.get('updated_at'),
+    }
+
+
+def fetch_issues(bugs: List[Dict], client: Optional[GitHubClient] = None,
+                 max_workers: int = DEFAULT_FETCH_WORKERS) -> List[Dict]:
+    """
+    Fetch the current issue text for saved bugs concurrently.
+    
+    GitHub issues are fetched through the client (and its cache); bugs from
+    other platforms, and GitHub issues that fail to load, fall back to the
+    title and description stored at scan time.
+    
+    Args:
+        bugs: Bug rows from BugDatabase
+        client: GitHubClient, or None to use the stored text only
+        max_workers: Most issues fetched at once
+        
+    Returns:
+        Issue data dicts aligned with `bugs`
+    """
+    def fetch(bug: Dict) -> Dict:
+        if client and bug.get('platform', 'github') == 'github':
+            try:
+                issue = client.get_issue(bug['repo'], bug['issue_number'])
+            except Exception:
+                issue = None
+            if issue:
+                return issue
+        return issue_from_bug(bug)
+        
+    if not bugs:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(bugs))), thread_name_prefix='bugnosis-fetch'
+    ) as executor:
+        return list(executor.map(fetch, bugs))
+
+
+def plan_requests(issues: List[Dict], pack: bool = True) -> List[List[int]]:
+    """
+    Group issues into LLM requests.
+    
+    Returns:
+        Lists of indexes into `issues`; short issues share a request when
+        `pack` is set, everything else is alone
+    """
+    groups, short = [], []
+    for index, issue in enumerate(issues):
+        if pack and estimate_tokens(AIEngine.diagnosis_prompt(issue)) <= PACK_TOKENS:
+            short.append(index)
+        else:
+            groups.append([index])
+    groups.extend(short[i:i + PACK_SIZE] for i in range(0, len(short), PACK_SIZE))
+    return groups
+
+
+def iter_diagnoses(bugs: List[Dict], ai: AIEngine, client: Optional[GitHubClient] = None,
+                   fetch_workers: int = DEFAULT_FETCH_WORKERS,
+                   ai_workers: int = DEFAULT_AI_WORKERS,
+                   pack: bool = True) -> Iterator[Tuple[Dict, Optional[str]]]:
+    """
+    Diagnose bugs concurrently, yielding each as its request finishes.
+    
+    Requests go through the engine's RateGovernor, if it has one, so a
+    large batch runs at the API's rate limit instead of into 429s. Issues
+    a packed answer missed are retried in requests of their own.
+    
+    Args:
+        bugs: Bug rows from BugDatabase
+        ai: Engine used for the diagnoses
+        client: GitHubClient for fetching current issue text
+        fetch_workers: Most issues fetched at once
+        ai_workers: Most LLM requests in flight
+        pack: Let short issues share a request
+        
+    Yields:
+        (bug row, diagnosis text or None), in completion order
+    """
+    issues = fetch_issues(bugs, client, fetch_workers)
+    
+    def diagnose(group: List[int]) -> List[Optional[str]]:
+        if len(group) == 1:
+            return [ai.diagnose_bug(issues[group[0]])]
+        results = ai.diagnose_bugs([issues[i] for i in group],
+                                   max_tokens=PACK_MAX_TOKENS * len(group))
+        return [text if text else ai.diagnose_bug(issues[i]) for i, text in zip(group, results)]
+        
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(1, ai_workers), thread_name_prefix='bugnosis-diagnose'
+    )
+    futures = {executor.submit(diagnose, group): group for group in plan_requests(issues, pack)}
+    try:
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"AI error: {e}")
+                results = [None] * len(futures[future])
+            for index, text in zip(futures[future], results):
+                yield bugs[index], text
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def diagnose_saved_bugs(db: BugDatabase, bugs: List[Dict], ai: AIEngine,
+                        client: Optional[GitHubClient] = None,
+                        on_result: Optional[Callable[[Dict, Optional[str]], None]] = None,
+                        **options) -> Dict[str, Any]:
+    """
+    Diagnose saved bugs and store each diagnosis on its bug as it arrives.
+    
+    Args:
+        db: Database the bugs came from
+        bugs: Bug rows to diagnose
+        ai: Engine used for the diagnoses
+        client: GitHubClient for fetching current issue text
+        on_result: Called with (bug row, diagnosis or None) for every bug
+        **options: fetch_workers, ai_workers and pack, as for iter_diagnoses()
+        
+    Returns:
+        Dict with 'total', 'diagnosed' and 'failed' counts
+    """
+    diagnosed = failed = 0
+    for bug, text in iter_diagnoses(bugs, ai, client, **options):
+        if text:
+            diagnosed += db.save_diagnoses([(bug['id'], text)])
+        else:
+            failed += 1
+        if on_result:
+            on_result(bug, text)
+    return {'total': len(bugs), 'diagnosed': diagnosed, 'failed': failed}
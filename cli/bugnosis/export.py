@@ -36,7 +36,7 @@ def export_bugs_csv(bugs: List[Dict], output_file: str):
     if not bugs:
         return
         
-    fieldnames = ['repo', 'issue_number', 'title', 'url', 
+    fieldnames = ['platform', 'instance', 'repo', 'issue_number', 'title', 'url', 
                   'impact_score', 'affected_users', 'severity', 
                   'discovered_at', 'status']
     
@@ -1,29 +1,194 @@
 """Federated search across multiple bug tracking platforms."""
 
 import concurrent.futures
-from typing import List, Dict, Any
-from .platforms import get_platform
+import heapq
+import queue
+import threading
+import time
+from typing import List, Dict, Any, Callable, Iterator, Optional
+from .platforms import get_shared_platform
 from .ai import AIEngine
+from . import transport
+
+# Worker threads shared by every FederatedSearch in the process. Per-host
+# parallelism is found by the transport's adaptive limiter; fixed caps per
+# platform are only applied when configured.
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_PLATFORM_LIMITS = {}
+
+_executor = None
+_platform_slots = {}
+_pool_lock = threading.Lock()
+
+
+class _DaemonPool:
+    """
+    Fixed set of daemon worker threads running submitted calls as futures.
+    
+    Used instead of ThreadPoolExecutor, whose workers the interpreter joins
+    at exit: a target abandoned at the search deadline must not keep the
+    CLI (and the GUI waiting on it) alive after the results are out.
+    """
+    
+    def __init__(self, max_workers: int, thread_name_prefix: str):
+        self._queue = queue.SimpleQueue()
+        self._threads = [
+            threading.Thread(target=self._work, name=f'{thread_name_prefix}_{i}', daemon=True)
+            for i in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+            
+    def submit(self, fn: Callable, *args) -> concurrent.futures.Future:
+        """Queue fn(*args) and return its future."""
+        future = concurrent.futures.Future()
+        self._queue.put((future, fn, args))
+        return future
+        
+    def shutdown(self, wait: bool = True):
+        """Let the workers exit once the calls already queued are done."""
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+                
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+
+def configure_search_pool(max_workers: int = DEFAULT_MAX_WORKERS,
+                          platform_limits: Optional[Dict[str, int]] = None):
+    """
+    Size the shared search executor and per-platform concurrency caps.
+    
+    Takes effect for searches started afterwards; work already running on
+    a previous executor finishes there.
+    
+    Args:
+        max_workers: Total worker threads for all searches
+        platform_limits: Optional hard cap on concurrent targets per
+                         platform name; platforms not listed are left to
+                         the transport's adaptive per-host limit
+    """
+    global _executor, _platform_slots
+    with _pool_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = _DaemonPool(max_workers, thread_name_prefix='bugnosis-search')
+        limits = DEFAULT_PLATFORM_LIMITS if platform_limits is None else platform_limits
+        _platform_slots = {name: threading.BoundedSemaphore(n) for name, n in limits.items()}
+        # Any worker may be talking to the same host, so keep that many connections warm
+        transport.configure_pools(max_workers)
+
+
+def _shared_pool():
+    """The shared executor and platform semaphores, created on first use."""
+    if _executor is None:
+        configure_search_pool()
+    return _executor, _platform_slots
+
 
 class FederatedSearch:
     """Search engine that queries multiple platforms."""
     
-    def __init__(self, min_impact: int = 70):
+    def __init__(self, min_impact: int = 70, writer=None,
+                 deadline: Optional[float] = None, target_timeout: Optional[float] = None):
+        """
+        Args:
+            min_impact: Minimum impact score for results
+            writer: Optional AsyncBugWriter; each target's bugs are queued
+                    for saving as soon as that target finishes
+            deadline: Seconds after which the whole search returns with
+                      whatever has arrived (None waits for every target)
+            target_timeout: Seconds a single target may run before it is
+                            given up on; also caps its HTTP timeouts
+        """
         self.min_impact = min_impact
+        self.writer = writer
+        self.deadline = deadline
+        self.target_timeout = target_timeout
+        self.ai = AIEngine()
         
-    def search(self, query: str) -> Dict[str, Any]:
+    def search(self, query: str,
+               on_partial: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
         """
         Search for bugs across all platforms based on a query.
         
         Args:
             query: Search term
+            on_partial: Optional callback, called with each update from
+                        iter_search() as targets complete
             
         Returns:
-            Dict with 'results', 'stats', 'targets'
+            Dict with 'results', 'stats', 'targets', 'partial' (True if
+            any target failed or timed out) and 'target_status' (status,
+            latency and result count per target)
+        """
+        update = None
+        target_status = []
+        for update in self.iter_search(query):
+            target = update['target']
+            if update.get('error'):
+                print(f"Error searching {target['platform']}/{target['target']}: {update['error']}")
+            target_status.append({
+                'platform': target['platform'],
+                'target': target['target'],
+                'status': update['status'],
+                'latency_ms': update['latency_ms'],
+                'count': len(update['bugs']),
+                'error': update['error'],
+            })
+            if on_partial:
+                on_partial(update)
+                
+        return {
+            'results': update['results'],
+            'stats': update['stats'],
+            'total': len(update['results']),
+            'targets_scanned': update['targets_scanned'],
+            'partial': update['partial'],
+            'target_status': target_status
+        }
+        
+    def iter_search(self, query: str) -> Iterator[Dict[str, Any]]:
+        """
+        Search all platforms, yielding merged results as each target completes.
+        
+        The first update arrives as soon as the fastest platform answers.
+        Each one carries the full ranking so far, so consumers can simply
+        redraw from the latest update. Targets that overrun `target_timeout`
+        or are still running at the search `deadline` are reported with a
+        'timeout' status (or 'cancelled' if they never started) and their
+        late results are discarded.
+        
+        Args:
+            query: Search term
+            
+        Yields:
+            Dict with 'target' (the target that just completed), 'bugs' (its
+            results), 'status' ('ok', 'error', 'timeout' or 'cancelled'),
+            'latency_ms', 'error' (message or None), 'results' (all results
+            so far, highest impact first), 'stats', 'partial', 'completed',
+            'total_targets' and 'targets_scanned'
         """
+        search_start = time.monotonic()
+        deadline = search_start + self.deadline if self.deadline else None
+        
         # 1. Resolve targets using AI
-        ai = AIEngine()
-        targets = ai.resolve_targets(query)
+        targets = self.ai.resolve_targets(query)
         
         if not targets:
             # Fallback to searching just github with the query as repo
@@ -31,40 +196,128 @@ class FederatedSearch:
             
         results = []
         stats = {}
+        partial = False
+        completed = 0
+        started = {}
+        finished = {}
         
-        # 2. Execute searches in parallel
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_target = {
-                executor.submit(self._search_target, t): t for t in targets
-            }
-            
-            for future in concurrent.futures.as_completed(future_to_target):
-                target = future_to_target[future]
-                platform_name = target['platform']
+        executor, slots = _shared_pool()
+        
+        def run(index: int) -> List[Any]:
+            """Search one target, recording when it actually started and finished."""
+            slot = slots.get(targets[index]['platform'].lower())
+            if slot:
+                slot.acquire()
+            try:
+                started[index] = time.monotonic()
+                budgets = [self.target_timeout] if self.target_timeout else []
+                if deadline:
+                    budgets.append(deadline - started[index])
+                return self._search_target(targets[index], min(budgets) if budgets else None)
+            finally:
+                finished[index] = time.monotonic()
+                if slot:
+                    slot.release()
+                    
+        # 2. Execute searches in parallel on the shared executor. Nothing here
+        # waits for stuck targets; their requests stop when the target's
+        # budget runs out, and the daemon workers never hold up exit.
+        future_to_index = {executor.submit(run, i): i for i in range(len(targets))}
+        pending = set(future_to_index)
+        
+        try:
+            while pending:
+                done, pending = concurrent.futures.wait(
+                    pending, timeout=self._next_expiry(pending, future_to_index, started, deadline),
+                    return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                now = time.monotonic()
+                outcomes = [(future, None) for future in done]
                 
-                try:
-                    bugs = future.result()
-                    results.extend(bugs)
+                for future in list(pending):
+                    index = future_to_index[future]
+                    if deadline and now >= deadline:
+                        status = 'timeout' if index in started else 'cancelled'
+                    elif self.target_timeout and index in started and \
+                            now >= started[index] + self.target_timeout:
+                        status = 'timeout'
+                    else:
+                        continue
+                    future.cancel()
+                    pending.discard(future)
+                    outcomes.append((future, status))
                     
-                    # Update stats
-                    count = len(bugs)
-                    stats[platform_name] = stats.get(platform_name, 0) + count
+                for future, status in outcomes:
+                    index = future_to_index[future]
+                    target = targets[index]
+                    platform_name = target['platform']
+                    bugs = []
+                    error = None
                     
-                except Exception as e:
-                    print(f"Error searching {platform_name}/{target['target']}: {e}")
+                    if status == 'timeout':
+                        error = f"timed out after {now - started[index]:.1f}s"
+                    elif status == 'cancelled':
+                        error = "not started before the search deadline"
+                    else:
+                        try:
+                            bugs = sorted(future.result(), key=_impact, reverse=True)
+                            status = 'ok'
+                            # 3. Merge into the ranking so far (both lists are sorted)
+                            results = list(heapq.merge(results, bugs, key=_impact, reverse=True))
+                            if self.writer:
+                                self.writer.put_many(bugs)
+                                
+                            # Update stats
+                            count = len(bugs)
+                            stats[platform_name] = stats.get(platform_name, 0) + count
+                            
+                        except Exception as e:
+                            status = 'error'
+                            error = str(e)
+                            
+                    end = finished.get(index, now)
+                    partial = partial or status != 'ok'
+                    completed += 1
+                    yield {
+                        'target': target,
+                        'bugs': bugs,
+                        'status': status,
+                        'latency_ms': int((end - started.get(index, end)) * 1000),
+                        'error': error,
+                        'results': results,
+                        'stats': dict(stats),
+                        'partial': partial,
+                        'completed': completed,
+                        'total_targets': len(targets),
+                        'targets_scanned': targets
+                    }
+        finally:
+            for future in pending:
+                future.cancel()
+            
+    def _next_expiry(self, pending, future_to_index, started, deadline) -> Optional[float]:
+        """Seconds until the search deadline or the next target budget runs out."""
+        expiries = [deadline] if deadline else []
+        if self.target_timeout:
+            now = time.monotonic()
+            for future in pending:
+                index = future_to_index[future]
+                # Targets still queued are checked again once their budget could have run
+                expiries.append(started[index] + self.target_timeout if index in started
+                                else now + self.target_timeout)
+        if not expiries:
+            return None
+        return max(0, min(expiries) - time.monotonic())
         
-        # 3. Sort merged results
-        results.sort(key=lambda x: x.impact_score, reverse=True)
+    def _search_target(self, target: Dict[str, str], budget: Optional[float] = None) -> List[Any]:
+        """
+        Helper to search a single target.
         
-        return {
-            'results': results,
-            'stats': stats,
-            'total': len(results),
-            'targets_scanned': targets
-        }
-    
-    def _search_target(self, target: Dict[str, str]) -> List[Any]:
-        """Helper to search a single target."""
+        Args:
+            target: Target from resolve_targets()
+            budget: Seconds the target may take in all, retries and
+                    backoff included (None for no limit)
+        """
         platform_name = target['platform']
         project = target['target']
         instance = target.get('instance')
@@ -73,9 +326,12 @@ class FederatedSearch:
         if instance:
             kwargs['instance'] = instance
             
-        try:
-            platform = get_platform(platform_name, **kwargs)
+        # Abandoned targets then finish on their own instead of hanging
+        platform = get_shared_platform(platform_name, timeout=self.target_timeout, **kwargs)
+        with transport.time_budget(budget):
             return platform.search_bugs(project, min_impact=self.min_impact)
-        except Exception as e:
-            print(f"Platform init error ({platform_name}): {e}")
-            return []
+
+
+def _impact(bug: Any) -> int:
+    """Sort key for ranking results."""
+    return bug.impact_score
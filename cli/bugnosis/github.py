@@ -1,19 +1,20 @@
 """GitHub API helpers."""
 
-import requests
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from .cache import APICache
+from . import transport
 
 
 class GitHubClient:
     """Simplified GitHub API client with caching."""
     
-    def __init__(self, token: Optional[str] = None, use_cache: bool = True):
+    def __init__(self, token: Optional[str] = None, use_cache: bool = True, timeout: float = 30):
         self.token = token
-        self.session = requests.Session()
+        self.timeout = timeout
+        # Sent per request; connections come from the shared transport pool
+        self.headers = {'Accept': 'application/vnd.github.v3+json'}
         if token:
-            self.session.headers['Authorization'] = f'token {token}'
-        self.session.headers['Accept'] = 'application/vnd.github.v3+json'
+            self.headers['Authorization'] = f'token {token}'
         self.cache = APICache(ttl=3600) if use_cache else None  # 1 hour cache
         
     def get_issue(self, repo: str, issue_number: int) -> Optional[Dict]:
@@ -27,7 +28,7 @@ class GitHubClient:
                 return cached
         
         url = f'https://api.github.com/repos/{repo}/issues/{issue_number}'
-        response = self.session.get(url)
+        response = transport.get(url, headers=self.headers, timeout=self.timeout)
         
         if response.status_code == 200:
             data = response.json()
@@ -36,12 +37,30 @@ class GitHubClient:
                 self.cache.set(cache_key, data)
             return data
         return None
+        
+    def get_issue_comments(self, repo: str, issue_number: int, limit: int = 30) -> List[Dict]:
+        """Fetch an issue's first `limit` comments (at most 100), with caching."""
+        cache_key = f"issue_comments:{repo}:{issue_number}:{limit}"
+        if self.cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+                
+        url = f'https://api.github.com/repos/{repo}/issues/{issue_number}/comments'
+        response = transport.get(url, params={'per_page': min(limit, 100)},
+                                 headers=self.headers, timeout=self.timeout)
+        if response.status_code != 200:
+            return []
+        comments = response.json()[:limit]
+        if self.cache:
+            self.cache.set(cache_key, comments)
+        return comments
 
     def get_user(self) -> Optional[Dict]:
         """Get current authenticated user."""
         if not self.token:
             return None
-        resp = self.session.get('https://api.github.com/user')
+        resp = transport.get('https://api.github.com/user', headers=self.headers, timeout=self.timeout)
         return resp.json() if resp.status_code == 200 else None
 
     def create_gist(self, files: Dict[str, Dict[str, str]], description: str, public: bool = False) -> Optional[Dict]:
@@ -55,7 +74,7 @@ class GitHubClient:
             'public': public,
             'files': files
         }
-        resp = self.session.post(url, json=payload)
+        resp = transport.post(url, headers=self.headers, json=payload, timeout=self.timeout)
         return resp.json() if resp.status_code == 201 else None
 
     def update_gist(self, gist_id: str, files: Dict[str, Dict[str, str]]) -> Optional[Dict]:
@@ -64,7 +83,8 @@ class GitHubClient:
             raise ValueError("Token required to update gist")
             
         url = f'https://api.github.com/gists/{gist_id}'
-        resp = self.session.patch(url, json={'files': files})
+        resp = transport.request('PATCH', url, headers=self.headers, json={'files': files},
+                                 timeout=self.timeout)
         return resp.json() if resp.status_code == 200 else None
 
     def get_gist(self, gist_id: str) -> Optional[Dict]:
@@ -73,6 +93,6 @@ class GitHubClient:
             raise ValueError("Token required to fetch gist")
             
         url = f'https://api.github.com/gists/{gist_id}'
-        resp = self.session.get(url)
+        resp = transport.get(url, headers=self.headers, timeout=self.timeout)
         return resp.json() if resp.status_code == 200 else None
 
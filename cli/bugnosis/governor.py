@@ -0,0 +1,73 @@
+"""Request and token budgets for LLM APIs."""
+
+import threading
+import time
+from collections import deque
+
+# Groq's published limits for llama-3.3-70b-versatile on the free tier
+DEFAULT_RPM = 30
+DEFAULT_TPM = 12000
+
+WINDOW = 60.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English and code)."""
+    return len(text) // 4 + 1
+
+
+class RateGovernor:
+    """
+    Keeps LLM calls within requests-per-minute and tokens-per-minute limits.
+    
+    Callers reserve a request and its estimated tokens (prompt plus the
+    completion limit) before sending. When either budget for the last
+    sixty seconds is spent, acquire() waits until enough of the window has
+    rolled off, so bursts are spread out instead of being answered with
+    429s. Safe to share between threads.
+    """
+    
+    def __init__(self, rpm: int = DEFAULT_RPM, tpm: int = DEFAULT_TPM):
+        """
+        Args:
+            rpm: Requests allowed per minute (at least 1)
+            tpm: Tokens allowed per minute (at least 1)
+            
+        Raises:
+            ValueError: If either limit is below 1
+        """
+        if rpm < 1 or tpm < 1:
+            raise ValueError(f"Rate limits must be at least 1 (rpm={rpm}, tpm={tpm})")
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = 0
+        self.tokens = 0
+        self.waited = 0.0
+        self._window = deque()
+        self._used = 0
+        self._cond = threading.Condition()
+        
+    def acquire(self, tokens: int):
+        """
+        Wait until a request of `tokens` fits in both budgets, then reserve it.
+        
+        Args:
+            tokens: Estimated prompt plus completion tokens
+        """
+        # A single call bigger than the whole budget is let through alone
+        tokens = min(tokens, self.tpm)
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._window and self._window[0][0] <= now - WINDOW:
+                    self._used -= self._window.popleft()[1]
+                if len(self._window) < self.rpm and self._used + tokens <= self.tpm:
+                    break
+                self._cond.wait(self._window[0][0] + WINDOW - now)
+                
+            self._window.append((now, tokens))
+            self._used += tokens
+            self.requests += 1
+            self.tokens += tokens
+            self.waited += now - started
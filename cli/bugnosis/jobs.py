@@ -0,0 +1,377 @@
+"""Job queue for spreading scans across worker processes on one machine."""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .scanner import GitHubScanner
+from .storage import BugDatabase
+
+# Seconds a leased job stays invisible to other workers before it is
+# assumed lost and handed out again
+DEFAULT_VISIBILITY_TIMEOUT = 300
+DEFAULT_MAX_ATTEMPTS = 3
+# Failed jobs wait RETRY_BASE * 2**(attempts - 1) seconds before a retry
+RETRY_BASE = 30
+
+
+@dataclass
+class Job:
+    """A leased unit of work."""
+    id: int
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int
+    lease_token: str = ''
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+
+
+class JobQueue(ABC):
+    """
+    Interface for scan job queues.
+    
+    A job is leased by one worker at a time. If the worker neither
+    completes nor fails it before the visibility timeout, the lease lapses
+    and another worker may take it, so work survives crashed workers.
+    Every lease counts as an attempt; a job that runs out of attempts is
+    marked dead instead of being retried forever.
+    """
+    
+    @abstractmethod
+    def enqueue(self, kind: str, payload: Dict[str, Any], key: Optional[str] = None,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> Optional[int]:
+        """
+        Add a job.
+        
+        Args:
+            kind: Job type, used to pick a handler
+            payload: JSON-serializable job arguments
+            key: Deduplication key; skipped while an unfinished job has it
+            max_attempts: Leases allowed before the job is marked dead
+            
+        Returns:
+            The job id, or None if an identical job is already waiting
+        """
+        pass
+        
+    @abstractmethod
+    def lease(self, worker_id: str,
+              visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> Optional[Job]:
+        """Take the next available job, or None if there is none."""
+        pass
+        
+    @abstractmethod
+    def extend(self, job: Job, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> bool:
+        """Push back a lease's expiry; False if the lease was lost."""
+        pass
+        
+    @abstractmethod
+    def complete(self, job: Job) -> bool:
+        """Mark a job done; False if the lease was lost to another worker."""
+        pass
+        
+    @abstractmethod
+    def fail(self, job: Job, error: str) -> bool:
+        """Record a failure, scheduling a retry if attempts remain."""
+        pass
+        
+    @abstractmethod
+    def release(self, job: Job) -> bool:
+        """Hand a job back untouched (e.g. on shutdown) without using an attempt."""
+        pass
+        
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Job counts by status."""
+        pass
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    JobQueue in an SQLite file that several processes can share.
+    
+    The file is opened in WAL mode (like the bug database it lives in by
+    default), which needs shared memory between the processes: every
+    worker must run on the same host, with the file on a local disk. WAL
+    does not work over network filesystems.
+    
+    Leases are taken inside BEGIN IMMEDIATE transactions, so two workers
+    never get the same job, and each lease carries a token so a worker
+    whose lease lapsed cannot complete a job someone else now holds.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Queue database file (default: the bugnosis database)
+        """
+        if path is None:
+            config_dir = Path.home() / '.config' / 'bugnosis'
+            config_dir.mkdir(parents=True, exist_ok=True)
+            path = str(config_dir / 'bugnosis.db')
+            
+        self.path = path
+        # Autocommit, so transactions are exactly the BEGINs issued below. Shared
+        # with a worker's lease heartbeat thread, hence the lock.
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None,
+                                    check_same_thread=False)
+        self._lock = threading.RLock()
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS job_queue (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                key TEXT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                leased_by TEXT,
+                lease_token TEXT,
+                lease_expires REAL,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            
+            CREATE INDEX IF NOT EXISTS idx_job_queue_ready ON job_queue(status, available_at);
+            CREATE INDEX IF NOT EXISTS idx_job_queue_key ON job_queue(key, status);
+        ''')
+        
+    def _transaction(self, fn: Callable[[], Any]) -> Any:
+        """Run fn inside BEGIN IMMEDIATE, so competing workers serialize."""
+        with self._lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = fn()
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+            return result
+        
+    def enqueue(self, kind: str, payload: Dict[str, Any], key: Optional[str] = None,
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> Optional[int]:
+        def insert():
+            if key is not None and self.conn.execute(
+                "SELECT 1 FROM job_queue WHERE key = ? AND status IN ('queued', 'leased')", (key,)
+            ).fetchone():
+                return None
+            now = time.time()
+            return self.conn.execute(
+                'INSERT INTO job_queue (kind, key, payload, max_attempts, available_at, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (kind, key, json.dumps(payload), max_attempts, now, now, now)
+            ).lastrowid
+        return self._transaction(insert)
+        
+    def lease(self, worker_id: str,
+              visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> Optional[Job]:
+        def take():
+            now = time.time()
+            while True:
+                row = self.conn.execute('''
+                    SELECT * FROM job_queue
+                    WHERE (status = 'queued' AND available_at <= ?)
+                       OR (status = 'leased' AND lease_expires <= ?)
+                    ORDER BY available_at, id LIMIT 1
+                ''', (now, now)).fetchone()
+                if row is None:
+                    return None
+                if row['attempts'] >= row['max_attempts']:
+                    # Its last lease lapsed without an answer
+                    self.conn.execute(
+                        "UPDATE job_queue SET status = 'dead', error = COALESCE(error, ?), "
+                        "updated_at = ? WHERE id = ?",
+                        ('lease expired', now, row['id'])
+                    )
+                    continue
+                token = uuid.uuid4().hex
+                self.conn.execute(
+                    "UPDATE job_queue SET status = 'leased', attempts = attempts + 1, leased_by = ?, "
+                    "lease_token = ?, lease_expires = ?, updated_at = ? WHERE id = ?",
+                    (worker_id, token, now + visibility_timeout, now, row['id'])
+                )
+                return Job(id=row['id'], kind=row['kind'], payload=json.loads(row['payload']),
+                           attempts=row['attempts'] + 1, lease_token=token,
+                           max_attempts=row['max_attempts'])
+        return self._transaction(take)
+        
+    def _update_lease(self, job: Job, sql: str, params: tuple) -> bool:
+        """Apply an update only while this worker still holds the job's lease."""
+        return self._transaction(lambda: self.conn.execute(
+            f"UPDATE job_queue SET {sql}, updated_at = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_token = ?",
+            params + (time.time(), job.id, job.lease_token)
+        ).rowcount == 1)
+        
+    def extend(self, job: Job, visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT) -> bool:
+        return self._update_lease(job, 'lease_expires = ?', (time.time() + visibility_timeout,))
+        
+    def complete(self, job: Job) -> bool:
+        return self._update_lease(job, "status = 'done', lease_token = NULL, error = NULL", ())
+        
+    def fail(self, job: Job, error: str) -> bool:
+        if job.attempts >= job.max_attempts:
+            return self._update_lease(job, "status = 'dead', lease_token = NULL, error = ?", (error,))
+        retry_at = time.time() + RETRY_BASE * 2 ** (job.attempts - 1)
+        return self._update_lease(
+            job, "status = 'queued', lease_token = NULL, error = ?, available_at = ?", (error, retry_at)
+        )
+        
+    def release(self, job: Job) -> bool:
+        return self._update_lease(
+            job, "status = 'queued', lease_token = NULL, attempts = attempts - 1, available_at = ?",
+            (time.time(),)
+        )
+        
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = dict(self.conn.execute(
+                'SELECT status, COUNT(*) FROM job_queue GROUP BY status'
+            ).fetchall())
+        return {status: counts.get(status, 0) for status in ('queued', 'leased', 'done', 'dead')}
+        
+    def close(self):
+        """Close the queue connection."""
+        self.conn.close()
+
+
+def enqueue_repo_scans(job_queue: JobQueue, repos, min_impact: int = 70) -> int:
+    """
+    Queue one scan job per repo, skipping repos that already have one waiting.
+    
+    Returns:
+        Number of jobs added
+    """
+    added = 0
+    for repo in repos:
+        if job_queue.enqueue('scan_repo', {'repo': repo, 'min_impact': min_impact},
+                             key=f'scan_repo:{repo}') is not None:
+            added += 1
+    return added
+
+
+class ScanWorker:
+    """
+    Leases scan jobs from a queue and saves their results.
+    
+    Run several processes on one host (see SQLiteJobQueue) to split a
+    watch list; each job is one repo, so throughput grows with the number
+    of workers until GitHub's rate limit is reached.
+    """
+    
+    def __init__(self, job_queue: JobQueue, db_path: Optional[str] = None,
+                 token: Optional[str] = None,
+                 visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+                 worker_id: Optional[str] = None):
+        self.queue = job_queue
+        self.db = BugDatabase(db_path)
+        self.scanner = GitHubScanner(token=token, timeout=min(30, visibility_timeout / 4))
+        self.visibility_timeout = visibility_timeout
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.processed = 0
+        self.failed = 0
+        self.lost = 0
+        self.saved = 0
+        
+    def run_once(self) -> bool:
+        """
+        Lease and run one job.
+        
+        Returns:
+            False if no job was available
+        """
+        job = self.queue.lease(self.worker_id, self.visibility_timeout)
+        if job is None:
+            return False
+            
+        # Keep the lease alive while the scan runs, so a slow repo isn't
+        # handed to a second worker halfway through
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, stop),
+                                     name=f'bugnosis-lease-{job.id}', daemon=True)
+        heartbeat.start()
+        try:
+            self._handle(job)
+        except KeyboardInterrupt:
+            stop.set()
+            heartbeat.join()
+            self.queue.release(job)
+            raise
+        except Exception as e:
+            stop.set()
+            heartbeat.join()
+            if self.queue.fail(job, str(e)):
+                self.failed += 1
+                print(f"Job {job.id} failed (attempt {job.attempts}/{job.max_attempts}): {e}")
+            else:
+                self._lease_lost(job)
+        else:
+            stop.set()
+            heartbeat.join()
+            if self.queue.complete(job):
+                self.processed += 1
+            else:
+                self._lease_lost(job)
+        return True
+        
+    def _heartbeat(self, job: Job, stop: threading.Event):
+        """Extend a job's lease every third of the visibility timeout until stopped."""
+        while not stop.wait(self.visibility_timeout / 3):
+            try:
+                if not self.queue.extend(job, self.visibility_timeout):
+                    return
+            except sqlite3.Error as e:
+                # Try again next beat; the lease only lapses after a full timeout
+                print(f"Job {job.id}: could not extend lease: {e}")
+                
+    def _lease_lost(self, job: Job):
+        """Count a job whose lease lapsed and went to another worker before it finished."""
+        self.lost += 1
+        print(f"Job {job.id}: lease lost to another worker; result not recorded")
+        
+    def run(self, poll_interval: float = 2.0, drain: bool = False,
+            max_jobs: Optional[int] = None):
+        """
+        Process jobs until interrupted.
+        
+        Args:
+            poll_interval: Seconds to wait when no job is available
+            drain: Stop once no job is queued or leased, including
+                   failed jobs waiting out their retry backoff
+            max_jobs: Stop after this many jobs
+        """
+        handled = 0
+        while max_jobs is None or handled < max_jobs:
+            if self.run_once():
+                handled += 1
+                continue
+            if drain:
+                stats = self.queue.stats()
+                if not stats['queued'] and not stats['leased']:
+                    break
+            time.sleep(poll_interval)
+                
+    def _handle(self, job: Job):
+        if job.kind != 'scan_repo':
+            raise ValueError(f"Unknown job kind: {job.kind}")
+        repo = job.payload['repo']
+        bugs = self.scanner.scan_repo(repo, min_impact=job.payload.get('min_impact', 70),
+                                      raise_errors=True)
+        self.saved += self.db.save_bugs(bugs)
+        print(f"  {repo}: {len(bugs)} bugs")
+        
+    def close(self):
+        """Close the worker's database connection."""
+        self.db.close()
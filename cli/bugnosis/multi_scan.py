@@ -1,36 +1,151 @@
 """Multi-repository scanning."""
 
-from typing import List
+import concurrent.futures
+import sys
+import time
+from typing import List, Iterator, Callable, Dict, Any, Optional, Tuple
 from .scanner import GitHubScanner, Bug
 
+# Repos scanned at once. Requests to api.github.com are further paced by the
+# transport's adaptive per-host limit, so this only bounds threads.
+DEFAULT_MAX_WORKERS = 8
 
-def scan_multiple_repos(repos: List[str], min_impact: int = 70, 
-                       token: str = None) -> List[Bug]:
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+def print_progress(event: Dict[str, Any]):
+    """Default progress callback: one line per finished repo."""
+    prefix = f"  [{event['completed']}/{event['total']}] {event['repo']}"
+    if event['status'] == 'error':
+        print(f"{prefix}: failed ({event['error']})")
+    else:
+        print(f"{prefix}: {event['bugs']} bugs in {event['elapsed_ms'] / 1000:.1f}s")
+
+
+class ProgressBar:
+    """Single-line progress bar, usable as an on_progress callback."""
+    
+    def __init__(self, stream=None, width: int = 30):
+        self.stream = stream or sys.stderr
+        self.width = width
+        self.found = 0
+        
+    def __call__(self, event: Dict[str, Any]):
+        done, total = event['completed'], event['total']
+        self.found += event['bugs']
+        if event['status'] == 'error':
+            # Keep failures visible after the bar redraws
+            self.stream.write(f"\r\033[K  {event['repo']}: failed ({event['error']})\n")
+        filled = self.width * done // total if total else self.width
+        bar = '#' * filled + '-' * (self.width - filled)
+        self.stream.write(f"\r\033[K[{bar}] {done}/{total} repos, {self.found} bugs")
+        if done == total:
+            self.stream.write('\n')
+        self.stream.flush()
+
+
+def iter_repo_results(repos: List[str], min_impact: int = 70,
+                      token: str = None, max_workers: int = DEFAULT_MAX_WORKERS,
+                      on_progress: Optional[ProgressCallback] = print_progress
+                      ) -> Iterator[Tuple[str, List[Bug], Optional[str]]]:
     """
-    Scan multiple repositories and aggregate results.
+    Scan repositories concurrently, yielding each repo's outcome as it finishes.
+    
+    A repo that fails (including GitHub error responses) is reported
+    through on_progress and yielded with its error; the others carry on.
+    Progress callbacks run in the consuming thread, between yields, so
+    they need no locking.
     
     Args:
         repos: List of repo names (owner/repo format)
         min_impact: Minimum impact score
         token: GitHub token
+        max_workers: Most repos scanned at once
+        on_progress: Called once per finished repo with a dict holding
+                     'repo', 'status' ('ok' or 'error'), 'bugs' (count),
+                     'error', 'elapsed_ms', 'completed' and 'total';
+                     None for silence
+                     
+    Yields:
+        (repo, bugs in impact order, error message or None), in completion order
+    """
+    scanner = GitHubScanner(token=token)
+    
+    def scan(repo: str):
+        started = time.monotonic()
+        bugs = scanner.scan_repo(repo, min_impact=min_impact, raise_errors=True)
+        return bugs, time.monotonic() - started
+        
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(repos) or 1)),
+        thread_name_prefix='bugnosis-scan'
+    )
+    futures = {executor.submit(scan, repo): repo for repo in repos}
+    try:
+        for completed, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            repo = futures[future]
+            bugs, error, elapsed = [], None, 0.0
+            try:
+                bugs, elapsed = future.result()
+            except Exception as e:
+                error = str(e)
+            if on_progress:
+                on_progress({
+                    'repo': repo,
+                    'status': 'error' if error else 'ok',
+                    'bugs': len(bugs),
+                    'error': error,
+                    'elapsed_ms': int(elapsed * 1000),
+                    'completed': completed,
+                    'total': len(repos),
+                })
+            yield repo, bugs, error
+    finally:
+        # Consumer stopped early: drop repos that have not started
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def iter_multiple_repos(repos: List[str], min_impact: int = 70,
+                        token: str = None, max_workers: int = DEFAULT_MAX_WORKERS,
+                        on_progress: Optional[ProgressCallback] = print_progress) -> Iterator[Bug]:
+    """
+    Scan repositories concurrently, yielding bugs as each repo finishes.
+    
+    Lets consumers such as generate_insights() work on a scan without
+    holding every result in memory. Failed repos are skipped; see
+    iter_repo_results() for the arguments.
+    
+    Yields:
+        Bug objects, repo by repo in completion order, each repo's in
+        impact order
+    """
+    for _, bugs, _ in iter_repo_results(repos, min_impact=min_impact, token=token,
+                                        max_workers=max_workers, on_progress=on_progress):
+        yield from bugs
+
+
+def scan_multiple_repos(repos: List[str], min_impact: int = 70,
+                       token: str = None, max_workers: int = DEFAULT_MAX_WORKERS,
+                       on_progress: Optional[ProgressCallback] = print_progress) -> List[Bug]:
+    """
+    Scan multiple repositories concurrently and aggregate results.
+    
+    Args:
+        repos: List of repo names (owner/repo format)
+        min_impact: Minimum impact score
+        token: GitHub token
+        max_workers: Most repos scanned at once
+        on_progress: Per-repo progress callback; see iter_multiple_repos()
         
     Returns:
         Combined list of bugs sorted by impact
     """
-    scanner = GitHubScanner(token=token)
-    all_bugs = []
+    all_bugs = list(iter_multiple_repos(repos, min_impact=min_impact, token=token,
+                                        max_workers=max_workers, on_progress=on_progress))
     
-    for repo in repos:
-        print(f"Scanning {repo}...")
-        bugs = scanner.scan_repo(repo, min_impact=min_impact)
-        all_bugs.extend(bugs)
-        print(f"  Found {len(bugs)} bugs\n")
-        
     # Sort by impact
     all_bugs.sort(key=lambda b: b.impact_score, reverse=True)
     
     return all_bugs
-
-
-
-
@@ -1,5 +1,6 @@
 """Multi-platform bug tracking integrations."""
 
+import threading
 from .github_platform import GitHubPlatform
 from .gitlab_platform import GitLabPlatform
 from .bugzilla_platform import BugzillaPlatform
@@ -12,6 +13,8 @@ __all__ = [
     'GitLabPlatform',
     'BugzillaPlatform',
     'get_platform',
+    'get_shared_platform',
+    'clear_platform_pool',
     'list_platforms',
 ]
 
@@ -31,6 +34,41 @@ def get_platform(name: str, **kwargs):
     return platform_class(**kwargs)
 
 
+# Long-lived instances handed out by get_shared_platform()
+_pool = {}
+_pool_lock = threading.Lock()
+
+
+def get_shared_platform(name: str, timeout: float = None, **kwargs):
+    """
+    Get a pooled platform instance, creating it on first use.
+    
+    One instance is kept per (platform, arguments, timeout), so repeated
+    searches reuse its HTTP session and cache instead of opening new
+    connections. Instances must not be mutated by callers.
+    
+    Args:
+        name: Platform name
+        timeout: Per-request timeout for this instance (platform default if None)
+        **kwargs: Arguments for the platform class, e.g. api_token or instance
+    """
+    key = (name.lower(), timeout, tuple(sorted(kwargs.items())))
+    with _pool_lock:
+        platform = _pool.get(key)
+        if platform is None:
+            platform = get_platform(name, **kwargs)
+            if timeout is not None:
+                platform.timeout = timeout
+            _pool[key] = platform
+        return platform
+
+
+def clear_platform_pool():
+    """Drop pooled platform instances (e.g. after tokens change)."""
+    with _pool_lock:
+        _pool.clear()
+
+
 def list_platforms():
     """List all available platforms."""
     return list(PLATFORMS.keys())
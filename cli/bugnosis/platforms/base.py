@@ -51,6 +51,9 @@ class Bug:
 class BugPlatform(ABC):
     """Abstract base class for bug tracking platforms."""
     
+    # Seconds to wait on each HTTP request
+    timeout = 30
+    
     def __init__(self, api_token: Optional[str] = None):
         """Initialize platform with optional API token."""
         self.api_token = api_token
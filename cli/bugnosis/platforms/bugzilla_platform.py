@@ -1,11 +1,11 @@
 """Bugzilla platform integration."""
 
 import os
-import requests
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 from .base import BugPlatform, Bug
+from .. import transport
 
 
 class BugzillaPlatform(BugPlatform):
@@ -41,6 +41,11 @@ class BugzillaPlatform(BugPlatform):
             raise ValueError(f"Unknown Bugzilla instance: {instance}")
         
         self.api_base = f"{self.instance_url}/rest"
+        
+        # Sent per request; connections come from the shared transport pool
+        self.headers = {}
+        if self.api_token:
+            self.headers['X-BUGZILLA-API-KEY'] = self.api_token
     
     @property
     def name(self) -> str:
@@ -68,12 +73,8 @@ class BugzillaPlatform(BugPlatform):
         if severity:
             params['severity'] = severity
         
-        headers = {}
-        if self.api_token:
-            headers['X-BUGZILLA-API-KEY'] = self.api_token
-        
         try:
-            response = requests.get(url, params=params, headers=headers, timeout=30)
+            response = transport.get(url, params=params, headers=self.headers, timeout=self.timeout)
             response.raise_for_status()
             data = response.json()
             bugs_data = data.get('bugs', [])
@@ -115,12 +116,8 @@ class BugzillaPlatform(BugPlatform):
         """Get a specific Bugzilla bug."""
         url = f"{self.api_base}/bug/{bug_id}"
         
-        headers = {}
-        if self.api_token:
-            headers['X-BUGZILLA-API-KEY'] = self.api_token
-        
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            response = transport.get(url, headers=self.headers, timeout=self.timeout)
             response.raise_for_status()
             data = response.json()
             bug_data = data['bugs'][0]
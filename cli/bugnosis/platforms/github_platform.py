@@ -6,6 +6,7 @@ from datetime import datetime
 
 from .base import BugPlatform, Bug
 from ..github import GitHubClient
+from .. import transport
 
 
 class GitHubPlatform(BugPlatform):
@@ -31,7 +32,7 @@ class GitHubPlatform(BugPlatform):
         
         # Get repo stats
         repo_url = f'https://api.github.com/repos/{project}'
-        repo_resp = self.client.session.get(repo_url)
+        repo_resp = transport.get(repo_url, headers=self.client.headers, timeout=self.timeout)
         if repo_resp.status_code != 200:
             print(f"Error fetching repo {project}: {repo_resp.status_code}")
             return []
@@ -58,7 +59,8 @@ class GitHubPlatform(BugPlatform):
             # A better approach would be to try a few calls or use search API
             # But for now, 'good first issue' is the gold standard.
         
-        resp = self.client.session.get(issues_url, params=params)
+        resp = transport.get(issues_url, params=params, headers=self.client.headers,
+                             timeout=self.timeout)
         if resp.status_code != 200:
             print(f"Error fetching issues: {resp.status_code}")
             return []
@@ -105,7 +107,7 @@ class GitHubPlatform(BugPlatform):
             
         # Need repo stats for accurate impact
         repo_url = f'https://api.github.com/repos/{project}'
-        repo_resp = self.client.session.get(repo_url)
+        repo_resp = transport.get(repo_url, headers=self.client.headers, timeout=self.timeout)
         repo_stats = repo_resp.json() if repo_resp.status_code == 200 else {}
         
         impact = ImpactScorer.calculate(issue, repo_stats)
@@ -1,11 +1,11 @@
 """GitLab platform integration."""
 
 import os
-import requests
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 from .base import BugPlatform, Bug
+from .. import transport
 
 
 class GitLabPlatform(BugPlatform):
@@ -22,6 +22,11 @@ class GitLabPlatform(BugPlatform):
         super().__init__(api_token or os.getenv('GITLAB_TOKEN'))
         self.instance_url = instance_url.rstrip('/')
         self.api_base = f"{self.instance_url}/api/v4"
+        
+        # Sent per request; connections come from the shared transport pool
+        self.headers = {}
+        if self.api_token:
+            self.headers['PRIVATE-TOKEN'] = self.api_token
     
     @property
     def name(self) -> str:
@@ -38,9 +43,6 @@ class GitLabPlatform(BugPlatform):
         
         # Build API request
         url = f"{self.api_base}/projects/{project_encoded}/issues"
-        headers = {}
-        if self.api_token:
-            headers['PRIVATE-TOKEN'] = self.api_token
         
         params = {
             'state': 'opened',
@@ -53,7 +55,7 @@ class GitLabPlatform(BugPlatform):
             params['labels'] = ','.join(labels)
         
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = transport.get(url, params=params, headers=self.headers, timeout=self.timeout)
             response.raise_for_status()
             issues = response.json()
         except Exception as e:
@@ -95,12 +97,8 @@ class GitLabPlatform(BugPlatform):
         project_encoded = project.replace('/', '%2F')
         url = f"{self.api_base}/projects/{project_encoded}/issues/{bug_id}"
         
-        headers = {}
-        if self.api_token:
-            headers['PRIVATE-TOKEN'] = self.api_token
-        
         try:
-            response = requests.get(url, headers=headers, timeout=30)
+            response = transport.get(url, headers=self.headers, timeout=self.timeout)
             response.raise_for_status()
             issue = response.json()
         except Exception as e:
@@ -0,0 +1,299 @@
+"""Offline index of well-known projects for resolving search queries."""
+
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .cache import TargetCache
+
+
+# Bundled entries. Users can add or override entries (matched by name) in
+# ~/.config/bugnosis/projects.json, a JSON list in the same shape.
+KNOWN_PROJECTS = [
+    # Bugzilla-hosted products (see BugzillaPlatform.INSTANCES)
+    {'name': 'firefox', 'aliases': ['mozilla firefox', 'gecko'],
+     'targets': [{'platform': 'bugzilla', 'target': 'Firefox', 'instance': 'mozilla'},
+                 {'platform': 'bugzilla', 'target': 'Core', 'instance': 'mozilla'}]},
+    {'name': 'thunderbird', 'aliases': ['mozilla thunderbird'],
+     'targets': [{'platform': 'bugzilla', 'target': 'Thunderbird', 'instance': 'mozilla'}]},
+    {'name': 'linux', 'aliases': ['linux kernel'],
+     'targets': [{'platform': 'github', 'target': 'torvalds/linux'},
+                 {'platform': 'bugzilla', 'target': 'Drivers', 'instance': 'kernel'}]},
+    {'name': 'fedora', 'aliases': [],
+     'targets': [{'platform': 'bugzilla', 'target': 'Fedora', 'instance': 'redhat'}]},
+    {'name': 'rhel', 'aliases': ['red hat enterprise linux', 'red hat'],
+     'targets': [{'platform': 'bugzilla', 'target': 'Red Hat Enterprise Linux 9', 'instance': 'redhat'}]},
+    {'name': 'kde plasma', 'aliases': ['plasma', 'plasmashell', 'kde'],
+     'targets': [{'platform': 'bugzilla', 'target': 'plasmashell', 'instance': 'kde'}]},
+    {'name': 'kwin', 'aliases': [],
+     'targets': [{'platform': 'bugzilla', 'target': 'kwin', 'instance': 'kde'}]},
+    {'name': 'dolphin', 'aliases': ['kde dolphin'],
+     'targets': [{'platform': 'bugzilla', 'target': 'dolphin', 'instance': 'kde'}]},
+    {'name': 'konsole', 'aliases': [],
+     'targets': [{'platform': 'bugzilla', 'target': 'konsole', 'instance': 'kde'}]},
+    {'name': 'kdenlive', 'aliases': [],
+     'targets': [{'platform': 'bugzilla', 'target': 'kdenlive', 'instance': 'kde'}]},
+    {'name': 'krita', 'aliases': [],
+     'targets': [{'platform': 'bugzilla', 'target': 'krita', 'instance': 'kde'}]},
+    
+    # GitLab-hosted projects
+    {'name': 'gitlab', 'aliases': [],
+     'targets': [{'platform': 'gitlab', 'target': 'gitlab-org/gitlab'}]},
+    {'name': 'inkscape', 'aliases': [],
+     'targets': [{'platform': 'gitlab', 'target': 'inkscape/inkscape'}]},
+    {'name': 'wireshark', 'aliases': [],
+     'targets': [{'platform': 'gitlab', 'target': 'wireshark/wireshark'}]},
+    {'name': 'f-droid', 'aliases': ['fdroid'],
+     'targets': [{'platform': 'gitlab', 'target': 'fdroid/fdroidclient'}]},
+    
+    # Languages and runtimes
+    {'name': 'python', 'aliases': ['cpython'],
+     'targets': [{'platform': 'github', 'target': 'python/cpython'}]},
+    {'name': 'rust', 'aliases': ['rustc', 'rust lang'],
+     'targets': [{'platform': 'github', 'target': 'rust-lang/rust'}]},
+    {'name': 'go', 'aliases': ['golang'],
+     'targets': [{'platform': 'github', 'target': 'golang/go'}]},
+    {'name': 'nodejs', 'aliases': ['node'],
+     'targets': [{'platform': 'github', 'target': 'nodejs/node'}]},
+    {'name': 'deno', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'denoland/deno'}]},
+    {'name': 'bun', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'oven-sh/bun'}]},
+    {'name': 'typescript', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'microsoft/TypeScript'}]},
+    {'name': 'php', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'php/php-src'}]},
+    {'name': 'swift', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'swiftlang/swift'}]},
+    {'name': 'zig', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'ziglang/zig'}]},
+    {'name': 'llvm', 'aliases': ['clang'],
+     'targets': [{'platform': 'github', 'target': 'llvm/llvm-project'}]},
+    {'name': 'flutter', 'aliases': ['dart flutter'],
+     'targets': [{'platform': 'github', 'target': 'flutter/flutter'}]},
+    
+    # Web frameworks and tooling
+    {'name': 'react', 'aliases': ['reactjs'],
+     'targets': [{'platform': 'github', 'target': 'facebook/react'}]},
+    {'name': 'react native', 'aliases': ['react-native'],
+     'targets': [{'platform': 'github', 'target': 'facebook/react-native'}]},
+    {'name': 'vue', 'aliases': ['vuejs', 'vue.js'],
+     'targets': [{'platform': 'github', 'target': 'vuejs/core'}]},
+    {'name': 'angular', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'angular/angular'}]},
+    {'name': 'svelte', 'aliases': ['sveltekit'],
+     'targets': [{'platform': 'github', 'target': 'sveltejs/svelte'}]},
+    {'name': 'next.js', 'aliases': ['nextjs', 'next'],
+     'targets': [{'platform': 'github', 'target': 'vercel/next.js'}]},
+    {'name': 'vite', 'aliases': ['vitejs'],
+     'targets': [{'platform': 'github', 'target': 'vitejs/vite'}]},
+    {'name': 'webpack', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'webpack/webpack'}]},
+    {'name': 'tailwind css', 'aliases': ['tailwind', 'tailwindcss'],
+     'targets': [{'platform': 'github', 'target': 'tailwindlabs/tailwindcss'}]},
+    {'name': 'electron', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'electron/electron'}]},
+    {'name': 'django', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'django/django'}]},
+    {'name': 'flask', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'pallets/flask'}]},
+    {'name': 'fastapi', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'fastapi/fastapi'}]},
+    {'name': 'rails', 'aliases': ['ruby on rails'],
+     'targets': [{'platform': 'github', 'target': 'rails/rails'}]},
+    {'name': 'python requests', 'aliases': ['requests'],
+     'targets': [{'platform': 'github', 'target': 'psf/requests'}]},
+    
+    # Data and ML
+    {'name': 'pytorch', 'aliases': ['torch'],
+     'targets': [{'platform': 'github', 'target': 'pytorch/pytorch'}]},
+    {'name': 'tensorflow', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'tensorflow/tensorflow'}]},
+    {'name': 'transformers', 'aliases': ['hugging face', 'huggingface'],
+     'targets': [{'platform': 'github', 'target': 'huggingface/transformers'}]},
+    {'name': 'numpy', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'numpy/numpy'}]},
+    {'name': 'pandas', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'pandas-dev/pandas'}]},
+    {'name': 'scikit-learn', 'aliases': ['sklearn'],
+     'targets': [{'platform': 'github', 'target': 'scikit-learn/scikit-learn'}]},
+    {'name': 'matplotlib', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'matplotlib/matplotlib'}]},
+    {'name': 'jupyter', 'aliases': ['jupyter notebook'],
+     'targets': [{'platform': 'github', 'target': 'jupyter/notebook'}]},
+    {'name': 'ollama', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'ollama/ollama'}]},
+    {'name': 'langchain', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'langchain-ai/langchain'}]},
+    
+    # Infrastructure
+    {'name': 'kubernetes', 'aliases': ['k8s'],
+     'targets': [{'platform': 'github', 'target': 'kubernetes/kubernetes'}]},
+    {'name': 'docker', 'aliases': ['moby'],
+     'targets': [{'platform': 'github', 'target': 'moby/moby'}]},
+    {'name': 'podman', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'containers/podman'}]},
+    {'name': 'terraform', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'hashicorp/terraform'}]},
+    {'name': 'ansible', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'ansible/ansible'}]},
+    {'name': 'systemd', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'systemd/systemd'}]},
+    {'name': 'grafana', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'grafana/grafana'}]},
+    {'name': 'prometheus', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'prometheus/prometheus'}]},
+    {'name': 'redis', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'redis/redis'}]},
+    {'name': 'elasticsearch', 'aliases': ['elastic'],
+     'targets': [{'platform': 'github', 'target': 'elastic/elasticsearch'}]},
+    {'name': 'airflow', 'aliases': ['apache airflow'],
+     'targets': [{'platform': 'github', 'target': 'apache/airflow'}]},
+    {'name': 'home assistant', 'aliases': ['homeassistant'],
+     'targets': [{'platform': 'github', 'target': 'home-assistant/core'}]},
+    
+    # Desktop apps and editors
+    {'name': 'vs code', 'aliases': ['vscode', 'visual studio code'],
+     'targets': [{'platform': 'github', 'target': 'microsoft/vscode'}]},
+    {'name': 'neovim', 'aliases': ['nvim'],
+     'targets': [{'platform': 'github', 'target': 'neovim/neovim'}]},
+    {'name': 'vim', 'aliases': [],
+     'targets': [{'platform': 'github', 'target': 'vim/vim'}]},
+    {'name': 'godot', 'aliases': ['godot engine'],
+     'targets': [{'platform': 'github', 'target': 'godotengine/godot'}]},
+    {'name': 'obs studio', 'aliases': ['obs'],
+     'targets': [{'platform': 'github', 'target': 'obsproject/obs-studio'}]},
+]
+
+
+def _trigrams(text: str) -> set:
+    """Character trigrams of a padded string, so short words still match."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _dice(a: set, b: set) -> float:
+    """Dice coefficient of two trigram sets."""
+    return 2 * len(a & b) / (len(a) + len(b)) if a or b else 0.0
+
+
+def _words(text: str) -> List[str]:
+    """Words of a normalized name, split on spaces and joining punctuation."""
+    return [w for w in re.split(r'[\s._/-]+', text) if w]
+
+
+class ProjectIndex:
+    """Trigram index over project names and aliases."""
+    
+    def __init__(self, projects: List[Dict]):
+        self.projects = projects
+        self._names = []                 # (normalized name, project index)
+        self._grams = []                 # trigram set per entry in _names
+        self._postings = {}              # trigram -> entry positions
+        
+        for index, project in enumerate(projects):
+            for name in [project['name'], *project.get('aliases', [])]:
+                position = len(self._names)
+                grams = _trigrams(TargetCache.normalize(name))
+                self._names.append((TargetCache.normalize(name), index))
+                self._grams.append(grams)
+                for gram in grams:
+                    self._postings.setdefault(gram, []).append(position)
+                    
+    @classmethod
+    def load(cls, user_path: Optional[str] = None) -> 'ProjectIndex':
+        """
+        Build the index from KNOWN_PROJECTS plus the user's projects file.
+        
+        User entries replace bundled entries with the same name.
+        
+        Args:
+            user_path: Projects file (default: ~/.config/bugnosis/projects.json)
+        """
+        if user_path is None:
+            user_path = Path.home() / '.config' / 'bugnosis' / 'projects.json'
+            
+        projects = {p['name']: p for p in KNOWN_PROJECTS}
+        try:
+            with open(user_path, 'r') as f:
+                for project in json.load(f):
+                    projects[project['name']] = project
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+            pass
+        return cls(list(projects.values()))
+        
+    def search(self, query: str, limit: int = 5) -> List[Tuple[float, Dict]]:
+        """
+        Projects most similar to a query.
+        
+        Similarity is the Dice coefficient of character trigrams between the
+        normalized query and a project's best-matching name or alias.
+        
+        Returns:
+            List of (score, project), best first; scores are 0-1
+        """
+        normalized = TargetCache.normalize(query)
+        grams = _trigrams(normalized)
+        
+        shared = Counter()
+        for gram in grams:
+            for position in self._postings.get(gram, ()):
+                shared[position] += 1
+                
+        best = {}
+        for position, count in shared.items():
+            name, index = self._names[position]
+            score = 1.0 if name == normalized else \
+                2 * count / (len(grams) + len(self._grams[position]))
+            best[index] = max(score, best.get(index, 0))
+            
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(score, self.projects[index]) for index, score in ranked]
+        
+    def resolve(self, query: str, fuzzy: bool = False,
+                threshold: float = 0.6) -> Optional[List[Dict[str, str]]]:
+        """
+        Targets of the project a query names, or None.
+        
+        By default only an exact name or alias (after normalizing) counts:
+        "react router" and "redis-py" are other projects, not misspellings
+        of react and redis. With `fuzzy`, the best match is also accepted
+        when it scores at least `threshold` and every word of the query
+        resembles a word of the matched name, which still catches typos
+        such as "pytorh".
+        """
+        normalized = TargetCache.normalize(query)
+        for name, index in self._names:
+            if name == normalized:
+                return self.projects[index]['targets']
+        if not fuzzy:
+            return None
+            
+        matches = self.search(query, limit=1)
+        if matches and matches[0][0] >= threshold and self._covers(normalized, matches[0][1]):
+            return matches[0][1]['targets']
+        return None
+        
+    @staticmethod
+    def _covers(normalized: str, project: Dict, threshold: float = 0.6) -> bool:
+        """Whether some name of `project` has a similar word for every query word."""
+        query_grams = [_trigrams(word) for word in _words(normalized)]
+        for name in [project['name'], *project.get('aliases', [])]:
+            name_grams = [_trigrams(word) for word in _words(TargetCache.normalize(name))]
+            if all(any(_dice(grams, other) >= threshold for other in name_grams)
+                   for grams in query_grams):
+                return True
+        return False
+
+
+_index = None
+
+
+def get_project_index() -> ProjectIndex:
+    """The process-wide ProjectIndex, built on first use."""
+    global _index
+    if _index is None:
+        _index = ProjectIndex.load()
+    return _index
@@ -0,0 +1,237 @@
+"""Token-budgeted prompt construction."""
+
+import re
+from typing import Dict, List
+
+from .governor import estimate_tokens
+
+# Fenced blocks longer than LOG_BLOCK_LINES are cut to their first
+# LOG_HEAD_LINES and last LOG_TAIL_LINES; the error is usually at the end.
+LOG_BLOCK_LINES = 40
+LOG_HEAD_LINES = 8
+LOG_TAIL_LINES = 20
+MAX_LINE_CHARS = 500
+# Longest run of lines checked for back-to-back repeats (recursive frames)
+MAX_REPEAT_PERIOD = 4
+
+_HTML_COMMENT = re.compile(r'<!--.*?-->', re.DOTALL)
+_TASK_ITEM = re.compile(r'^\s*[-*]\s+\[[ xX]\]\s')
+_NO_RESPONSE = re.compile(r'^\s*_?No response_?\s*$', re.IGNORECASE)
+_HEADING = re.compile(r'^\s*#{1,6}\s')
+_FENCE = re.compile(r'^\s*(```|~~~)')
+_SIGNAL = re.compile(
+    r'error|exception|traceback|fail|crash|panic|segfault|assert|expected|actual|'
+    r'regression|reproduce|version|warning|line \d+',
+    re.IGNORECASE
+)
+_WORD = re.compile(r'[A-Za-z_][A-Za-z0-9_]{2,}')
+
+
+def strip_noise(text: str) -> str:
+    """
+    Remove text that costs tokens without telling the model anything.
+    
+    Drops HTML comments (where issue templates keep their instructions),
+    checklist items and empty template headings, cuts long fenced logs to
+    their head and tail, collapses repeated lines and stack frames, and
+    squeezes blank runs.
+    """
+    lines = _HTML_COMMENT.sub('', text).split('\n')
+    lines = [line for line in lines
+             if not _TASK_ITEM.match(line) and not _NO_RESPONSE.match(line)]
+    lines = _trim_logs(_collapse_repeats(lines))
+    
+    kept = []
+    for i, line in enumerate(lines):
+        if _HEADING.match(line):
+            following = next((l for l in lines[i + 1:] if l.strip()), None)
+            if following is None or _HEADING.match(following):
+                continue
+        if len(line) > MAX_LINE_CHARS:
+            line = line[:MAX_LINE_CHARS] + ' [...]'
+        if not line.strip() and (not kept or not kept[-1].strip()):
+            continue
+        kept.append(line.rstrip())
+    return '\n'.join(kept).strip()
+
+
+def _trim_logs(lines: List[str]) -> List[str]:
+    """Cut fenced blocks longer than LOG_BLOCK_LINES to their head and tail."""
+    out, block = [], None
+    for line in lines:
+        if block is None:
+            out.append(line)
+            if _FENCE.match(line):
+                block = []
+        elif _FENCE.match(line):
+            if len(block) > LOG_BLOCK_LINES:
+                omitted = len(block) - LOG_HEAD_LINES - LOG_TAIL_LINES
+                block = (block[:LOG_HEAD_LINES] + [f'[... {omitted} lines omitted ...]']
+                         + block[-LOG_TAIL_LINES:])
+            out.extend(block)
+            out.append(line)
+            block = None
+        else:
+            block.append(line)
+    if block is not None:
+        # Unclosed fence: keep it as is
+        out.extend(block)
+    return out
+
+
+def _collapse_repeats(lines: List[str]) -> List[str]:
+    """Keep one copy of lines or short runs of lines repeated back to back."""
+    out, i = [], 0
+    while i < len(lines):
+        for period in range(1, MAX_REPEAT_PERIOD + 1):
+            run = lines[i:i + period]
+            if len(run) < period or not any(l.strip() for l in run):
+                continue
+            repeats = 1
+            while lines[i + repeats * period:i + (repeats + 1) * period] == run:
+                repeats += 1
+            if repeats > 2 or (repeats == 2 and period > 1):
+                out.extend(run)
+                out.append(f'[... previous {period} line(s) repeated {repeats - 1} more times]')
+                i += repeats * period
+                break
+        else:
+            out.append(lines[i])
+            i += 1
+    return out
+
+
+def format_comments(comments: List[Dict]) -> str:
+    """GitHub issue comments as 'login: text' paragraphs, in thread order."""
+    return '\n\n'.join(
+        f"{(comment.get('user') or {}).get('login', 'unknown')}: {comment['body']}"
+        for comment in comments if comment.get('body')
+    )
+
+
+def select_lines(text: str, budget: int, query: str = '') -> str:
+    """
+    Keep the most relevant lines of `text` that fit in `budget` tokens.
+    
+    Lines are ranked by the words they share with `query` and by looking
+    like errors, versions or reproduction steps; the opening lines get a
+    bonus for context. The chosen lines stay in their original order,
+    with a marker wherever lines were dropped.
+    
+    Args:
+        text: Text to compact
+        budget: Token budget for the result
+        query: Words to rank lines by, e.g. the issue title
+        
+    Returns:
+        `text` itself if it already fits, otherwise the selection
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    if budget <= 0:
+        return ''
+        
+    terms = {w.lower() for w in _WORD.findall(query)}
+    lines = text.split('\n')
+    
+    def score(index: int) -> float:
+        line = lines[index]
+        if not line.strip():
+            return 0
+        words = {w.lower() for w in _WORD.findall(line)}
+        value = 2 * len(words & terms) + (3 if _SIGNAL.search(line) else 0)
+        if index < 3:
+            value += 2
+        # Ties go to earlier lines
+        return value - index / (len(lines) + 1)
+        
+    kept, used = set(), 0
+    for index in sorted(range(len(lines)), key=score, reverse=True):
+        cost = estimate_tokens(lines[index])
+        if used + cost + 2 > budget:
+            continue
+        kept.add(index)
+        used += cost + 2
+        
+    if not kept:
+        return text[:budget * 4] + ' [...]'
+    out, previous = [], -1
+    for index in sorted(kept):
+        if index != previous + 1:
+            out.append('[...]')
+        out.append(lines[index])
+        previous = index
+    if previous != len(lines) - 1:
+        out.append('[...]')
+    return '\n'.join(out)
+
+
+class PromptBuilder:
+    """
+    Builds a prompt from fixed text and compactable sections within a token budget.
+    
+    Fixed text (instructions, titles) is always kept. Sections (issue
+    bodies, comments, code) are cleaned with strip_noise() and, when
+    they don't all fit in what the fixed text leaves, each gets a share
+    of the remainder and keeps its most relevant lines:
+    
+        prompt = (PromptBuilder(1200, query=issue['title'])
+                  .add(f"Issue Title: {issue['title']}\\nIssue Body: ")
+                  .add_section(issue['body'])
+                  .build())
+    """
+    
+    def __init__(self, budget: int, query: str = ''):
+        """
+        Args:
+            budget: Token budget for the whole prompt
+            query: Words used to rank section lines, e.g. the issue title
+        """
+        self.budget = budget
+        self.query = query
+        self._parts = []
+        
+    def add(self, text: str) -> 'PromptBuilder':
+        """Append text that is always included as is."""
+        self._parts.append((text, False))
+        return self
+        
+    def add_section(self, text: str, clean: bool = True) -> 'PromptBuilder':
+        """
+        Append text that may be compacted to fit the budget.
+        
+        Args:
+            text: Section text
+            clean: Run strip_noise() first; turn off for source code
+        """
+        self._parts.append((strip_noise(text) if clean else text, True))
+        return self
+        
+    def build(self) -> str:
+        """The prompt, with every section fitted into its share of the budget."""
+        fixed = sum(estimate_tokens(text) for text, section in self._parts if not section)
+        sections = [text for text, section in self._parts if section]
+        shares = iter(self._allocate([estimate_tokens(text) for text in sections],
+                                     self.budget - fixed))
+        return ''.join(
+            select_lines(text, next(shares), self.query) if section else text
+            for text, section in self._parts
+        )
+        
+    @staticmethod
+    def _allocate(sizes: List[int], available: int) -> List[int]:
+        """
+        Split `available` tokens between sections of the given sizes.
+        
+        Small sections get all they need; what they leave over is shared
+        evenly by the larger ones.
+        """
+        shares = [0] * len(sizes)
+        remaining = max(0, available)
+        pending = sorted(range(len(sizes)), key=lambda i: sizes[i])
+        while pending:
+            fair = remaining // len(pending)
+            index = pending.pop(0)
+            shares[index] = min(sizes[index], fair)
+            remaining -= shares[index]
+        return shares
@@ -1,8 +1,8 @@
 """Bug scanner - finds high-impact bugs on GitHub."""
 
-import requests
 from typing import List, Dict, Optional
 from dataclasses import dataclass
+from . import transport
 
 
 @dataclass
@@ -105,20 +105,23 @@ class ImpactScorer:
 class GitHubScanner:
     """Scans GitHub for high-impact bugs."""
     
-    def __init__(self, token: Optional[str] = None):
+    def __init__(self, token: Optional[str] = None, timeout: float = 30):
         self.token = token
-        self.session = requests.Session()
+        self.timeout = timeout
+        # Sent per request; connections come from the shared transport pool
+        self.headers = {'Accept': 'application/vnd.github.v3+json'}
         if token:
-            self.session.headers['Authorization'] = f'token {token}'
-        self.session.headers['Accept'] = 'application/vnd.github.v3+json'
+            self.headers['Authorization'] = f'token {token}'
         
-    def scan_repo(self, repo: str, min_impact: int = 70) -> List[Bug]:
+    def scan_repo(self, repo: str, min_impact: int = 70, raise_errors: bool = False) -> List[Bug]:
         """
         Scan a repository for high-impact bugs.
         
         Args:
             repo: Repository in format "owner/name"
             min_impact: Minimum impact score to include
+            raise_errors: Raise requests.HTTPError when GitHub answers with
+                          an error, instead of printing it and returning []
             
         Returns:
             List of Bug objects sorted by impact score
@@ -127,8 +130,10 @@ class GitHubScanner:
         
         # Get repo stats
         repo_url = f'https://api.github.com/repos/{repo}'
-        repo_response = self.session.get(repo_url)
+        repo_response = transport.get(repo_url, headers=self.headers, timeout=self.timeout)
         if repo_response.status_code != 200:
+            if raise_errors:
+                repo_response.raise_for_status()
             print(f"Error: Could not fetch repo {repo}")
             return []
             
@@ -144,8 +149,11 @@ class GitHubScanner:
             'per_page': 30
         }
         
-        response = self.session.get(issues_url, params=params)
+        response = transport.get(issues_url, params=params, headers=self.headers,
+                                 timeout=self.timeout)
         if response.status_code != 200:
+            if raise_errors:
+                response.raise_for_status()
             print(f"Error fetching issues: {response.status_code}")
             return []
             
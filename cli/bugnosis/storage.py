@@ -1,13 +1,106 @@
 """Local storage for bugs and contributions."""
 
+import gzip
 import json
 import sqlite3
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterator, Iterable, Tuple, TextIO
 from .scanner import Bug
 
 
+# Bumped whenever _migrate() learns a new step
+SCHEMA_VERSION = 4
+
+# Score history rollup periods (seconds) -> days compact_history() keeps
+# them for. Raw snapshots age out first, then hourly and daily rollups;
+# weekly rollups are kept indefinitely.
+RAW_HISTORY_DAYS = 7
+TREND_PERIODS = {3600: 30, 86400: 365, 604800: None}
+
+# Format version written in the header line of NDJSON profile backups
+PROFILE_NDJSON_VERSION = 1
+
+SAVE_BUG_SQL = '''
+    INSERT INTO bugs 
+    (platform, instance, repo, issue_number, title, url, impact_score, affected_users, severity, labels, comments, reactions, created_at, updated_at, description)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (platform, instance, repo, issue_number) DO UPDATE SET
+        title = excluded.title,
+        url = excluded.url,
+        impact_score = excluded.impact_score,
+        affected_users = excluded.affected_users,
+        severity = excluded.severity,
+        labels = excluded.labels,
+        comments = excluded.comments,
+        reactions = excluded.reactions,
+        created_at = excluded.created_at,
+        updated_at = excluded.updated_at,
+        description = excluded.description
+'''
+
+IMPORT_BUG_SQL = '''
+    INSERT OR IGNORE INTO bugs 
+    (platform, instance, repo, issue_number, title, url, impact_score, affected_users, severity, labels, comments, reactions, created_at, updated_at, status, description)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+IMPORT_CONTRIBUTION_SQL = '''
+    INSERT OR IGNORE INTO contributions
+    (repo, issue_number, pr_number, pr_url, impact_score, affected_users, submitted_at, merged_at, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+BUG_COLUMNS = ('id', 'platform', 'instance', 'repo', 'issue_number', 'title', 'url',
+               'impact_score', 'affected_users', 'severity', 'labels', 'comments',
+               'reactions', 'created_at', 'updated_at', 'description', 'discovered_at', 'status')
+
+
+def parse_platform(name: str) -> tuple:
+    """
+    Split a platform name into (platform, instance).
+    
+    Bugzilla platforms name themselves after their instance, e.g.
+    'bugzilla-mozilla' -> ('bugzilla', 'mozilla'); 'github' -> ('github', '').
+    """
+    platform, _, instance = (name or 'github').partition('-')
+    return platform.lower(), instance
+
+
+def parse_repo_key(key: str) -> tuple:
+    """
+    Split a legacy 'platform:repo' key into (platform, instance, repo).
+    
+    Keys without a prefix are GitHub repositories.
+    """
+    if ':' not in key:
+        return 'github', '', key
+    prefix, repo = key.split(':', 1)
+    platform, instance = parse_platform(prefix)
+    return platform, instance, repo
+
+
+def platform_name(platform: str, instance: str = '') -> str:
+    """Inverse of parse_platform(): ('bugzilla', 'mozilla') -> 'bugzilla-mozilla'."""
+    platform = platform or 'github'
+    return f"{platform}-{instance}" if instance else platform
+
+
+def repo_key(platform: str, instance: str, repo: str) -> str:
+    """Build the display key for a repo, e.g. 'gitlab:owner/repo' or 'bugzilla-mozilla:Firefox'."""
+    if not platform or platform == 'github':
+        return repo
+    return f"{platform_name(platform, instance)}:{repo}"
+
+
+def open_profile(path: str, mode: str = 'r') -> TextIO:
+    """Open an NDJSON profile backup as text, gzip-compressed if it ends in '.gz'."""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
 class BugDatabase:
     """Local database for tracked bugs and contributions."""
     
@@ -18,8 +111,11 @@ class BugDatabase:
             db_path = str(config_dir / 'bugnosis.db')
             
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        # Other processes (scan workers, the background writer) may hold the write lock briefly
+        self.conn = sqlite3.connect(db_path, timeout=30)
         self.conn.row_factory = sqlite3.Row
+        # Lets readers keep going while an AsyncBugWriter commits batches
+        self.conn.execute('PRAGMA journal_mode = WAL')
         self._init_db()
         
     def _init_db(self):
@@ -27,6 +123,8 @@ class BugDatabase:
         self.conn.executescript('''
             CREATE TABLE IF NOT EXISTS bugs (
                 id INTEGER PRIMARY KEY,
+                platform TEXT NOT NULL DEFAULT 'github',
+                instance TEXT NOT NULL DEFAULT '',
                 repo TEXT NOT NULL,
                 issue_number INTEGER NOT NULL,
                 title TEXT,
@@ -36,11 +134,15 @@ class BugDatabase:
                 severity TEXT,
                 labels TEXT,
                 comments INTEGER,
+                reactions INTEGER,
                 created_at TEXT,
                 updated_at TEXT,
+                description TEXT,
                 discovered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 status TEXT DEFAULT 'discovered',
-                UNIQUE(repo, issue_number)
+                diagnosis TEXT,
+                diagnosed_at TEXT,
+                UNIQUE(platform, instance, repo, issue_number)
             );
             
             CREATE TABLE IF NOT EXISTS contributions (
@@ -63,14 +165,96 @@ class BugDatabase:
                 bugs_found INTEGER
             );
             
-            CREATE INDEX IF NOT EXISTS idx_bugs_impact ON bugs(impact_score DESC);
-            CREATE INDEX IF NOT EXISTS idx_bugs_status ON bugs(status);
             CREATE INDEX IF NOT EXISTS idx_contributions_status ON contributions(status);
             
-            -- Migration to add columns if missing (safe if exists)
-            -- SQLite doesn't support ADD COLUMN IF NOT EXISTS easily, so we rely on CREATE TABLE IF NOT EXISTS being sufficient
-            -- for new dbs, and for old dbs we'd need a schema migration system.
-            -- For now, we just ensure core columns.
+            -- Checkpoints for long multi-repo scans. key identifies the
+            -- target list (e.g. 'watch') so --resume finds the right job;
+            -- each target is marked done in the same transaction that saves
+            -- its bugs, and cursor holds where a paginated fetch stopped.
+            CREATE TABLE IF NOT EXISTS scan_jobs (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                params TEXT,
+                status TEXT NOT NULL DEFAULT 'running',
+                created_at INTEGER NOT NULL,
+                updated_at INTEGER NOT NULL
+            );
+            
+            CREATE INDEX IF NOT EXISTS idx_scan_jobs_key ON scan_jobs(kind, key, status);
+            
+            CREATE TABLE IF NOT EXISTS scan_job_targets (
+                job_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                target TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                cursor TEXT,
+                bugs_found INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                finished_at INTEGER,
+                PRIMARY KEY (job_id, target)
+            ) WITHOUT ROWID;
+            
+            -- Aggregates maintained by the triggers in _init_rollups().
+            -- bucket is impact_score / 10, so any min_impact that is a
+            -- multiple of 10 can be answered from these tables alone.
+            CREATE TABLE IF NOT EXISTS repo_rollup (
+                platform TEXT NOT NULL,
+                instance TEXT NOT NULL,
+                repo TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                bug_count INTEGER NOT NULL DEFAULT 0,
+                total_users INTEGER NOT NULL DEFAULT 0,
+                total_impact INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (platform, instance, repo, bucket)
+            ) WITHOUT ROWID;
+            
+            CREATE TABLE IF NOT EXISTS severity_rollup (
+                severity TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                bug_count INTEGER NOT NULL DEFAULT 0,
+                total_users INTEGER NOT NULL DEFAULT 0,
+                total_impact INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (severity, bucket)
+            ) WITHOUT ROWID;
+            
+            -- Append-only score history, one row per observed change.
+            -- ts is unix seconds; everything is an INTEGER so rows stay small.
+            CREATE TABLE IF NOT EXISTS bug_snapshots (
+                bug_id INTEGER NOT NULL,
+                ts INTEGER NOT NULL,
+                score INTEGER NOT NULL,
+                comments INTEGER NOT NULL,
+                reactions INTEGER NOT NULL,
+                PRIMARY KEY (bug_id, ts)
+            ) WITHOUT ROWID;
+            
+            -- Per-bug rollups of bug_snapshots for each of TREND_PERIODS.
+            -- bucket is ts / period; open_* hold the values in effect when
+            -- the bucket started, close_* the latest values inside it.
+            CREATE TABLE IF NOT EXISTS bug_trends (
+                period INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                bug_id INTEGER NOT NULL,
+                open_score INTEGER NOT NULL,
+                close_score INTEGER NOT NULL,
+                max_score INTEGER NOT NULL,
+                open_comments INTEGER NOT NULL,
+                close_comments INTEGER NOT NULL,
+                open_reactions INTEGER NOT NULL,
+                close_reactions INTEGER NOT NULL,
+                changes INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (period, bucket, bug_id)
+            ) WITHOUT ROWID;
+            
+            CREATE TABLE IF NOT EXISTS contribution_totals (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total_contributions INTEGER NOT NULL DEFAULT 0,
+                total_users_helped INTEGER NOT NULL DEFAULT 0,
+                total_impact INTEGER NOT NULL DEFAULT 0,
+                scored_count INTEGER NOT NULL DEFAULT 0,
+                merged_count INTEGER NOT NULL DEFAULT 0
+            );
         ''')
         
         # Quick hack to ensure new columns exist for existing DBs
@@ -90,9 +274,156 @@ class BugDatabase:
             self.conn.execute("ALTER TABLE bugs ADD COLUMN updated_at TEXT")
         except sqlite3.OperationalError:
             pass
+        try:
+            self.conn.execute("ALTER TABLE bugs ADD COLUMN description TEXT")
+        except sqlite3.OperationalError:
+            pass
+        try:
+            self.conn.execute("ALTER TABLE bugs ADD COLUMN reactions INTEGER")
+        except sqlite3.OperationalError:
+            pass
+        try:
+            self.conn.execute("ALTER TABLE bugs ADD COLUMN diagnosis TEXT")
+        except sqlite3.OperationalError:
+            pass
+        try:
+            self.conn.execute("ALTER TABLE bugs ADD COLUMN diagnosed_at TEXT")
+        except sqlite3.OperationalError:
+            pass
             
+        self._migrate()
+        
+        # Created after _migrate() because they reference migrated columns
+        self.conn.executescript('''
+            CREATE INDEX IF NOT EXISTS idx_bugs_impact ON bugs(impact_score DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS idx_bugs_platform_repo ON bugs(platform, repo, impact_score DESC);
+            CREATE INDEX IF NOT EXISTS idx_bugs_status_impact ON bugs(status, impact_score DESC);
+            CREATE INDEX IF NOT EXISTS idx_bugs_severity_impact ON bugs(severity COLLATE NOCASE, impact_score DESC);
+        ''')
+        
+        self._init_fts()
+        self._init_rollups()
+        self._init_history()
         self.conn.commit()
         
+    def _migrate(self):
+        """Bring an existing database up to SCHEMA_VERSION."""
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        
+        if version < 1:
+            columns = [row['name'] for row in self.conn.execute('PRAGMA table_info(bugs)')]
+            if 'platform' not in columns:
+                self._migrate_platform_columns()
+                
+        if version < 2:
+            # Recreated with id as a tie-breaker for keyset pagination
+            self.conn.execute('DROP INDEX IF EXISTS idx_bugs_impact')
+            
+        if version < 4:
+            # Rollups now skip unscored bugs, as the SQL push-down does;
+            # _init_rollups() recreates the triggers
+            self.conn.executescript('''
+                DROP TRIGGER IF EXISTS bugs_rollup_insert;
+                DROP TRIGGER IF EXISTS bugs_rollup_delete;
+                DROP TRIGGER IF EXISTS bugs_rollup_update;
+            ''')
+            self.rebuild_rollups()
+                
+        self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        
+    def _migrate_platform_columns(self):
+        """
+        Split legacy 'platform:repo' keys into platform, instance and repo columns.
+        
+        The UNIQUE constraint changes too, so SQLite needs the table rebuilt.
+        The FTS index is dropped and rebuilt by _init_fts() afterwards.
+        """
+        old_columns = [c for c in BUG_COLUMNS if c not in ('platform', 'instance')]
+        rows = self.conn.execute(f"SELECT {', '.join(old_columns)} FROM bugs").fetchall()
+        
+        migrated = []
+        for row in rows:
+            data = dict(row)
+            data['platform'], data['instance'], data['repo'] = parse_repo_key(data['repo'])
+            migrated.append(tuple(data[c] for c in BUG_COLUMNS))
+            
+        self.conn.executescript('''
+            DROP TRIGGER IF EXISTS bugs_fts_insert;
+            DROP TRIGGER IF EXISTS bugs_fts_delete;
+            DROP TRIGGER IF EXISTS bugs_fts_update;
+            DROP TABLE IF EXISTS bugs_fts;
+            DROP INDEX IF EXISTS idx_bugs_status;
+            DROP TABLE IF EXISTS bugs_new;
+            
+            CREATE TABLE bugs_new (
+                id INTEGER PRIMARY KEY,
+                platform TEXT NOT NULL DEFAULT 'github',
+                instance TEXT NOT NULL DEFAULT '',
+                repo TEXT NOT NULL,
+                issue_number INTEGER NOT NULL,
+                title TEXT,
+                url TEXT,
+                impact_score INTEGER,
+                affected_users INTEGER,
+                severity TEXT,
+                labels TEXT,
+                comments INTEGER,
+                reactions INTEGER,
+                created_at TEXT,
+                updated_at TEXT,
+                description TEXT,
+                discovered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                status TEXT DEFAULT 'discovered',
+                diagnosis TEXT,
+                diagnosed_at TEXT,
+                UNIQUE(platform, instance, repo, issue_number)
+            );
+        ''')
+        
+        placeholders = ', '.join('?' for _ in BUG_COLUMNS)
+        self.conn.executemany(
+            f"INSERT INTO bugs_new ({', '.join(BUG_COLUMNS)}) VALUES ({placeholders})",
+            migrated
+        )
+        self.conn.executescript('''
+            DROP TABLE bugs;
+            ALTER TABLE bugs_new RENAME TO bugs;
+        ''')
+        
+    def _init_fts(self):
+        """Create the full-text index over bugs and the triggers that keep it in sync."""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bugs_fts'"
+        ).fetchone()
+        
+        self.conn.executescript('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS bugs_fts USING fts5(
+                title, description, labels,
+                content='bugs', content_rowid='id'
+            );
+            
+            CREATE TRIGGER IF NOT EXISTS bugs_fts_insert AFTER INSERT ON bugs BEGIN
+                INSERT INTO bugs_fts(rowid, title, description, labels)
+                VALUES (new.id, new.title, new.description, new.labels);
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS bugs_fts_delete AFTER DELETE ON bugs BEGIN
+                INSERT INTO bugs_fts(bugs_fts, rowid, title, description, labels)
+                VALUES ('delete', old.id, old.title, old.description, old.labels);
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS bugs_fts_update AFTER UPDATE ON bugs BEGIN
+                INSERT INTO bugs_fts(bugs_fts, rowid, title, description, labels)
+                VALUES ('delete', old.id, old.title, old.description, old.labels);
+                INSERT INTO bugs_fts(rowid, title, description, labels)
+                VALUES (new.id, new.title, new.description, new.labels);
+            END;
+        ''')
+        
+        # Index rows saved before the FTS table existed
+        if not exists:
+            self.conn.execute("INSERT INTO bugs_fts(bugs_fts) VALUES ('rebuild')")
+        
     def save_bug(self, 
                 repo: str, 
                 issue_number: int, 
@@ -104,8 +435,51 @@ class BugDatabase:
                 labels: Any = None,
                 comments: int = 0,
                 created_at: str = None,
-                updated_at: str = None):
-        """Save or update a bug with detailed fields."""
+                updated_at: str = None,
+                description: str = None,
+                platform: str = None,
+                instance: str = None,
+                reactions: int = 0):
+        """
+        Save or update a bug with detailed fields.
+        
+        `platform` takes a platform name as reported by BugPlatform.name
+        (e.g. 'gitlab' or 'bugzilla-mozilla'). When omitted, a legacy
+        'platform:repo' key in `repo` is split instead.
+        
+        Existing rows are updated in place, so a bug keeps its id, status
+        and score history across rescans.
+        """
+        self.conn.execute(SAVE_BUG_SQL, self._bug_params(
+            repo, issue_number, title, url, impact_score, affected_users, severity,
+            labels, comments, created_at, updated_at, description, platform, instance, reactions
+        ))
+        self.conn.commit()
+        
+    def save_bugs(self, bugs: Iterable[Bug]) -> int:
+        """
+        Save multiple bugs from Bug objects (scanner or platform bugs).
+        
+        All rows go through one executemany() in a single transaction.
+        
+        Returns:
+            Number of bugs saved
+        """
+        rows = [self._bug_params(**self._bug_fields(bug)) for bug in bugs]
+        self.conn.executemany(SAVE_BUG_SQL, rows)
+        self.conn.commit()
+        return len(rows)
+        
+    @staticmethod
+    def _bug_params(repo, issue_number, title, url, impact_score, affected_users, severity,
+                    labels=None, comments=0, created_at=None, updated_at=None,
+                    description=None, platform=None, instance=None, reactions=0) -> tuple:
+        """Parameters for SAVE_BUG_SQL, normalizing the platform and labels like save_bug()."""
+        if platform is None:
+            platform, parsed_instance, repo = parse_repo_key(repo)
+        else:
+            platform, parsed_instance = parse_platform(platform)
+        instance = instance or parsed_instance
         
         # Convert list to JSON string if needed
         if isinstance(labels, list):
@@ -113,47 +487,179 @@ class BugDatabase:
         else:
             labels_json = labels if labels else "[]"
             
-        self.conn.execute('''
-            INSERT OR REPLACE INTO bugs 
-            (repo, issue_number, title, url, impact_score, affected_users, severity, labels, comments, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (repo, issue_number, title, url, impact_score, affected_users, severity, labels_json, comments, created_at, updated_at))
-        self.conn.commit()
+        return (platform, instance, repo, issue_number, title, url, impact_score, affected_users,
+                severity, labels_json, comments, reactions, created_at, updated_at, description)
+                
+    @classmethod
+    def _bug_fields(cls, bug: Bug) -> Dict[str, Any]:
+        """save_bug() keyword arguments for a scanner or platform Bug object."""
+        created_at = getattr(bug, 'created_at', None)
+        updated_at = getattr(bug, 'updated_at', None)
         
-    def save_bugs(self, bugs: List[Bug]):
-        """Save multiple bugs from Bug objects."""
-        for bug in bugs:
-            # Construct repo string (handle platform prefix if present)
-            repo_str = f"{bug.platform}:{bug.repo}" if hasattr(bug, 'platform') and bug.platform != 'github' else bug.repo
-            
-            self.save_bug(
-                repo=repo_str,
-                issue_number=bug.issue_number,
-                title=bug.title,
-                url=bug.url,
-                impact_score=bug.impact_score,
-                affected_users=bug.affected_users,
-                severity=bug.severity,
-                labels=bug.labels,
-                comments=bug.comments_count,
-                created_at=bug.created_at.isoformat() if bug.created_at else None,
-                updated_at=bug.updated_at.isoformat() if bug.updated_at else None
-            )
+        return {
+            'repo': bug.repo,
+            'platform': getattr(bug, 'platform', 'github'),
+            'issue_number': bug.issue_number,
+            'title': bug.title,
+            'url': bug.url,
+            'impact_score': bug.impact_score,
+            'affected_users': bug.affected_users,
+            'severity': bug.severity,
+            'labels': getattr(bug, 'labels', None),
+            'comments': getattr(bug, 'comments_count', getattr(bug, 'comments', 0)),
+            'created_at': created_at.isoformat() if created_at else None,
+            'updated_at': updated_at.isoformat() if updated_at else None,
+            'description': getattr(bug, 'description', None),
+            'reactions': cls._bug_reactions(bug),
+        }
+            
+    @staticmethod
+    def _bug_reactions(bug: Bug) -> int:
+        """Reaction count for a scanner Bug, or from a platform Bug's raw API data."""
+        if hasattr(bug, 'reactions'):
+            return bug.reactions or 0
+        raw = getattr(bug, 'raw_data', None) or {}
+        reactions = raw.get('reactions')
+        if isinstance(reactions, dict):
+            return reactions.get('total_count', 0)
+        # GitLab reports upvotes instead of reactions
+        return raw.get('upvotes', 0)
             
-    def get_bugs(self, min_impact: int = 0, status: str = None) -> List[Dict]:
-        """Retrieve bugs from database."""
-        query = 'SELECT * FROM bugs WHERE impact_score >= ?'
+    def _bug_filters(self,
+                     min_impact: int = 0,
+                     status: str = None,
+                     platform: str = None,
+                     repo: str = None,
+                     severity: str = None,
+                     label: str = None,
+                     diagnosed: Optional[bool] = None) -> tuple:
+        """
+        Build the WHERE clause shared by the bug queries.
+        
+        Each filter lines up with one of the composite indexes created in
+        _init_db(), so filtered listings don't fall back to a table scan.
+        
+        Returns:
+            (sql, params) where sql starts with 'WHERE'
+        """
+        clauses = ['impact_score >= ?']
         params = [min_impact]
         
         if status:
-            query += ' AND status = ?'
+            clauses.append('status = ?')
             params.append(status)
             
-        query += ' ORDER BY impact_score DESC'
+        if platform:
+            platform_name, instance = parse_platform(platform)
+            clauses.append('platform = ?')
+            params.append(platform_name)
+            if instance:
+                clauses.append('instance = ?')
+                params.append(instance)
+                
+        if repo:
+            clauses.append('repo = ?')
+            params.append(repo)
+            
+        if severity:
+            clauses.append('severity = ? COLLATE NOCASE')
+            params.append(severity)
+            
+        label = label.strip() if label else label
+        if label:
+            # The FTS index narrows candidates; json_each() makes the match exact
+            fts_query = self._fts_query(label)
+            if fts_query:
+                clauses.append('id IN (SELECT rowid FROM bugs_fts WHERE bugs_fts MATCH ?)')
+                params.append(f"labels : {fts_query}")
+            clauses.append('''EXISTS (
+                    SELECT 1 FROM json_each(CASE WHEN json_valid(labels) THEN labels ELSE '[]' END)
+                    WHERE value = ? COLLATE NOCASE
+                )''')
+            params.append(label)
+            
+        if diagnosed is not None:
+            clauses.append('diagnosis IS NOT NULL' if diagnosed else 'diagnosis IS NULL')
+            
+        return 'WHERE ' + ' AND '.join(clauses), params
         
-        cursor = self.conn.execute(query, params)
+    def get_bugs(self,
+                 min_impact: int = 0,
+                 status: str = None,
+                 platform: str = None,
+                 repo: str = None,
+                 severity: str = None,
+                 label: str = None) -> List[Dict]:
+        """Retrieve bugs from database, optionally filtered."""
+        return list(self.iter_bugs(min_impact=min_impact, status=status, platform=platform,
+                                   repo=repo, severity=severity, label=label))
+        
+    def iter_bugs(self, batch_size: int = 500, **filters) -> Iterator[Dict]:
+        """
+        Stream bugs in impact order without loading the whole table.
+        
+        Args:
+            batch_size: Rows fetched from the cursor at a time
+            **filters: Same filters as get_bugs()
+            
+        Yields:
+            Bug dictionaries, highest impact first
+        """
+        where, params = self._bug_filters(**filters)
+        yield from self._iter_query(
+            f'SELECT * FROM bugs {where} ORDER BY impact_score DESC, id DESC', params, batch_size
+        )
+        
+    def _iter_query(self, sql: str, params, batch_size: int = 500) -> Iterator[Dict]:
+        """Yield the rows of a query as dicts, fetching `batch_size` at a time."""
+        cursor = self.conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(row)
+                
+    def get_bugs_page(self,
+                      after: Optional[Tuple[int, int]] = None,
+                      limit: int = 50,
+                      **filters) -> List[Dict]:
+        """
+        Fetch one page of bugs using keyset pagination.
+        
+        Pages are ordered by (impact_score, id) descending. Pass the
+        (impact_score, id) of the last bug on a page as `after` to get the
+        next one; unlike OFFSET this costs the same on every page.
+        
+        Args:
+            after: (impact_score, id) of the last bug already seen
+            limit: Page size
+            **filters: Same filters as get_bugs()
+            
+        Returns:
+            List of up to `limit` bug dictionaries
+        """
+        where, params = self._bug_filters(**filters)
+        if after is not None:
+            where += ' AND (impact_score, id) < (?, ?)'
+            params.extend(after)
+            
+        cursor = self.conn.execute(
+            f'SELECT * FROM bugs {where} ORDER BY impact_score DESC, id DESC LIMIT ?',
+            params + [limit]
+        )
         return [dict(row) for row in cursor.fetchall()]
         
+    def count_bugs(self, **filters) -> int:
+        """Count bugs matching the get_bugs() filters without fetching them."""
+        min_impact = filters.pop('min_impact', 0)
+        if self.rollups_cover(min_impact, **filters):
+            return self.get_rollup_summary(min_impact)['total_bugs']
+            
+        filters['min_impact'] = min_impact
+        where, params = self._bug_filters(**filters)
+        return self.conn.execute(f'SELECT COUNT(*) FROM bugs {where}', params).fetchone()[0]
+        
     def search_bugs(self, repo_query: str, min_impact: int = 0) -> List[Dict]:
         """
         Search bugs in local database by repository name (partial match).
@@ -170,6 +676,529 @@ class BugDatabase:
         cursor = self.conn.execute(query, params)
         return [dict(row) for row in cursor.fetchall()]
         
+    def _init_rollups(self):
+        """Create the triggers that keep the rollup tables in step with bugs and contributions."""
+        bucket = 'CAST({row}.impact_score AS INTEGER) / 10'
+        severity = "LOWER(COALESCE({row}.severity, 'unknown'))"
+        
+        def add(row: str, sign: str) -> str:
+            """
+            Statements that add (sign '+') or remove (sign '-') one bug from the rollups.
+            
+            Bugs without an impact score are left out, since no
+            `impact_score >= ?` filter in _bug_filters() matches them either.
+            """
+            b = bucket.format(row=row)
+            sev = severity.format(row=row)
+            scored = f"{row}.impact_score IS NOT NULL"
+            repo_where = (f"platform = {row}.platform AND instance = {row}.instance "
+                          f"AND repo = {row}.repo AND bucket = {b}")
+            sev_where = f"severity = {sev} AND bucket = {b}"
+            counters = (f"bug_count = bug_count {sign} 1, "
+                        f"total_users = total_users {sign} COALESCE({row}.affected_users, 0), "
+                        f"total_impact = total_impact {sign} {row}.impact_score")
+            
+            sql = ''
+            if sign == '+':
+                # NOT EXISTS rather than INSERT OR IGNORE: an outer INSERT OR REPLACE
+                # overrides the conflict clause of statements inside a trigger.
+                sql += (f"INSERT INTO repo_rollup (platform, instance, repo, bucket) "
+                        f"SELECT {row}.platform, {row}.instance, {row}.repo, {b} "
+                        f"WHERE {scored} AND NOT EXISTS (SELECT 1 FROM repo_rollup WHERE {repo_where});\n"
+                        f"INSERT INTO severity_rollup (severity, bucket) SELECT {sev}, {b} "
+                        f"WHERE {scored} AND NOT EXISTS (SELECT 1 FROM severity_rollup WHERE {sev_where});\n")
+            sql += (f"UPDATE repo_rollup SET {counters} WHERE {scored} AND {repo_where};\n"
+                    f"UPDATE severity_rollup SET {counters} WHERE {scored} AND {sev_where};\n")
+            if sign == '-':
+                sql += (f"DELETE FROM repo_rollup WHERE {repo_where} AND bug_count <= 0;\n"
+                        f"DELETE FROM severity_rollup WHERE {sev_where} AND bug_count <= 0;\n")
+            return sql
+            
+        def contribute(row: str, sign: str) -> str:
+            """Statement that adds or removes one contribution from contribution_totals."""
+            return (f"UPDATE contribution_totals SET "
+                    f"total_contributions = total_contributions {sign} 1, "
+                    f"total_users_helped = total_users_helped {sign} COALESCE({row}.affected_users, 0), "
+                    f"total_impact = total_impact {sign} COALESCE({row}.impact_score, 0), "
+                    f"scored_count = scored_count {sign} ({row}.impact_score IS NOT NULL), "
+                    f"merged_count = merged_count {sign} ({row}.status IS 'merged') "
+                    f"WHERE id = 1;\n")
+            
+        self.conn.executescript(f'''
+            INSERT OR IGNORE INTO contribution_totals (id) VALUES (1);
+            
+            CREATE TRIGGER IF NOT EXISTS bugs_rollup_insert AFTER INSERT ON bugs BEGIN
+                {add('new', '+')}
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS bugs_rollup_delete AFTER DELETE ON bugs BEGIN
+                {add('old', '-')}
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS bugs_rollup_update
+            AFTER UPDATE OF platform, instance, repo, impact_score, affected_users, severity ON bugs BEGIN
+                {add('old', '-')}
+                {add('new', '+')}
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS contributions_rollup_insert AFTER INSERT ON contributions BEGIN
+                {contribute('new', '+')}
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS contributions_rollup_delete AFTER DELETE ON contributions BEGIN
+                {contribute('old', '-')}
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS contributions_rollup_update
+            AFTER UPDATE OF affected_users, impact_score, status ON contributions BEGIN
+                {contribute('old', '-')}
+                {contribute('new', '+')}
+            END;
+        ''')
+        
+    def rebuild_rollups(self):
+        """Recompute every rollup table from scratch (migration and repair)."""
+        self.conn.executescript('''
+            DELETE FROM repo_rollup;
+            INSERT INTO repo_rollup (platform, instance, repo, bucket, bug_count, total_users, total_impact)
+            SELECT platform, instance, repo, CAST(impact_score AS INTEGER) / 10,
+                   COUNT(*), SUM(COALESCE(affected_users, 0)), SUM(impact_score)
+            FROM bugs WHERE impact_score IS NOT NULL GROUP BY 1, 2, 3, 4;
+            
+            DELETE FROM severity_rollup;
+            INSERT INTO severity_rollup (severity, bucket, bug_count, total_users, total_impact)
+            SELECT LOWER(COALESCE(severity, 'unknown')), CAST(impact_score AS INTEGER) / 10,
+                   COUNT(*), SUM(COALESCE(affected_users, 0)), SUM(impact_score)
+            FROM bugs WHERE impact_score IS NOT NULL GROUP BY 1, 2;
+            
+            DELETE FROM contribution_totals;
+            INSERT INTO contribution_totals
+                (id, total_contributions, total_users_helped, total_impact, scored_count, merged_count)
+            SELECT 1, COUNT(*), COALESCE(SUM(affected_users), 0), COALESCE(SUM(impact_score), 0),
+                   COUNT(impact_score), COUNT(CASE WHEN status = 'merged' THEN 1 END)
+            FROM contributions;
+        ''')
+        
+    def rollups_cover(self, min_impact: int = 0, **filters) -> bool:
+        """True if the rollup tables can answer a query with these filters exactly."""
+        return min_impact % 10 == 0 and all(value in (None, '') for value in filters.values())
+        
+    def get_rollup_summary(self, min_impact: int = 0) -> Dict:
+        """
+        Bug totals, impact distribution and severity counts from the rollup tables.
+        
+        Reads at most a few dozen pre-aggregated rows regardless of how many
+        bugs are stored. `min_impact` is rounded down to a multiple of 10.
+        
+        Returns:
+            Dict with 'total_bugs', 'total_users', 'total_impact',
+            'buckets' ({bucket: count}) and 'by_severity' ({severity: count})
+        """
+        rows = self.conn.execute('''
+            SELECT severity, bucket, bug_count, total_users, total_impact
+            FROM severity_rollup WHERE bucket >= ?
+        ''', (min_impact // 10,)).fetchall()
+        
+        summary = {'total_bugs': 0, 'total_users': 0, 'total_impact': 0,
+                   'buckets': {}, 'by_severity': {}}
+        for row in rows:
+            summary['total_bugs'] += row['bug_count']
+            summary['total_users'] += row['total_users']
+            summary['total_impact'] += row['total_impact']
+            summary['buckets'][row['bucket']] = summary['buckets'].get(row['bucket'], 0) + row['bug_count']
+            summary['by_severity'][row['severity']] = summary['by_severity'].get(row['severity'], 0) + row['bug_count']
+        return summary
+        
+    def get_rollup_top_repos(self, n: int = 10, min_impact: int = 0) -> List[Dict]:
+        """Top repositories by affected users, read from repo_rollup."""
+        cursor = self.conn.execute('''
+            SELECT platform, instance, repo,
+                   SUM(total_users) AS total_users, SUM(bug_count) AS bug_count
+            FROM repo_rollup
+            WHERE bucket >= ?
+            GROUP BY platform, instance, repo
+            ORDER BY total_users DESC
+            LIMIT ?
+        ''', (min_impact // 10, n))
+        return [dict(row) for row in cursor.fetchall()]
+        
+    def _init_history(self):
+        """Create the triggers that record score snapshots and roll them up into bug_trends."""
+        seed = not self.conn.execute('SELECT 1 FROM bug_snapshots LIMIT 1').fetchone()
+        
+        values = ('COALESCE(new.impact_score, 0)', 'COALESCE(new.comments, 0)',
+                  'COALESCE(new.reactions, 0)')
+        # Write-time dedup: skip the snapshot if nothing differs from the latest one
+        changed = f'''NOT EXISTS (
+                SELECT 1 FROM (
+                    SELECT score, comments, reactions FROM bug_snapshots
+                    WHERE bug_id = new.id ORDER BY ts DESC LIMIT 1
+                ) WHERE score = {values[0]} AND comments = {values[1]} AND reactions = {values[2]}
+            )'''
+        # Two saves within one second update that second's snapshot in place.
+        # Not INSERT OR REPLACE: the outer statement's conflict handling
+        # would override it inside the trigger (see _init_rollups()).
+        now = "CAST(strftime('%s', 'now') AS INTEGER)"
+        snapshot = (f"INSERT INTO bug_snapshots (bug_id, ts, score, comments, reactions) "
+                    f"SELECT new.id, {now}, {', '.join(values)} WHERE NOT EXISTS ("
+                    f"SELECT 1 FROM bug_snapshots WHERE bug_id = new.id AND ts = {now});\n"
+                    f"UPDATE bug_snapshots SET score = {values[0]}, comments = {values[1]}, "
+                    f"reactions = {values[2]} WHERE bug_id = new.id AND ts = {now};")
+        
+        def rollup(period: int, created: bool = True) -> str:
+            """Statements that fold a new or updated snapshot into the bug_trends row for `period`."""
+            where = f"period = {period} AND bucket = new.ts / {period} AND bug_id = new.bug_id"
+            update = (f"UPDATE bug_trends SET close_score = new.score, "
+                      f"max_score = MAX(max_score, new.score), close_comments = new.comments, "
+                      f"close_reactions = new.reactions, changes = changes + 1 WHERE {where};\n")
+            if not created:
+                return update
+            return (f"INSERT INTO bug_trends (period, bucket, bug_id, open_score, close_score, max_score, "
+                    f"open_comments, close_comments, open_reactions, close_reactions) "
+                    f"SELECT {period}, new.ts / {period}, new.bug_id, "
+                    f"COALESCE(prev.score, new.score), new.score, new.score, "
+                    f"COALESCE(prev.comments, new.comments), new.comments, "
+                    f"COALESCE(prev.reactions, new.reactions), new.reactions "
+                    f"FROM (SELECT 1) LEFT JOIN ("
+                    f"SELECT score, comments, reactions FROM bug_snapshots "
+                    f"WHERE bug_id = new.bug_id AND ts < new.ts ORDER BY ts DESC LIMIT 1) prev "
+                    f"WHERE NOT EXISTS (SELECT 1 FROM bug_trends WHERE {where});\n" + update)
+            
+        self.conn.executescript(f'''
+            CREATE TRIGGER IF NOT EXISTS bugs_history_insert AFTER INSERT ON bugs
+            WHEN {changed} BEGIN
+                {snapshot}
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS bugs_history_update
+            AFTER UPDATE OF impact_score, comments, reactions ON bugs
+            WHEN {changed} BEGIN
+                {snapshot}
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS bug_snapshots_rollup_insert AFTER INSERT ON bug_snapshots BEGIN
+                {''.join(rollup(period) for period in TREND_PERIODS)}
+            END;
+            
+            CREATE TRIGGER IF NOT EXISTS bug_snapshots_rollup_update AFTER UPDATE ON bug_snapshots BEGIN
+                {''.join(rollup(period, created=False) for period in TREND_PERIODS)}
+            END;
+        ''')
+        
+        # Give bugs saved before history existed a starting point
+        if seed:
+            self.conn.execute('''
+                INSERT INTO bug_snapshots (bug_id, ts, score, comments, reactions)
+                SELECT id, CAST(strftime('%s', 'now') AS INTEGER), COALESCE(impact_score, 0),
+                       COALESCE(comments, 0), COALESCE(reactions, 0)
+                FROM bugs
+            ''')
+            
+    def compact_history(self, now: Optional[int] = None) -> Dict[str, int]:
+        """
+        Apply the score history retention policy.
+        
+        Raw snapshots older than RAW_HISTORY_DAYS are dropped (each bug keeps
+        its latest one so the next change has a baseline), then hourly and
+        daily rollups older than their TREND_PERIODS retention. Weekly
+        rollups are never removed.
+        
+        Args:
+            now: Unix time to measure ages from (defaults to the current time)
+            
+        Returns:
+            Number of rows removed, keyed by 'snapshots' and rollup period
+        """
+        now = int(time.time()) if now is None else now
+        removed = {}
+        
+        cursor = self.conn.execute('''
+            DELETE FROM bug_snapshots
+            WHERE ts < ? AND ts < (
+                SELECT MAX(ts) FROM bug_snapshots AS latest
+                WHERE latest.bug_id = bug_snapshots.bug_id
+            )
+        ''', (now - RAW_HISTORY_DAYS * 86400,))
+        removed['snapshots'] = cursor.rowcount
+        
+        for period, days in TREND_PERIODS.items():
+            if days is None:
+                continue
+            cursor = self.conn.execute(
+                'DELETE FROM bug_trends WHERE period = ? AND bucket < ?',
+                (period, (now - days * 86400) // period)
+            )
+            removed[period] = cursor.rowcount
+            
+        self.conn.commit()
+        return removed
+        
+    def get_trends(self, days: int = 7, limit: int = 10, now: Optional[int] = None,
+                   **filters) -> List[Dict]:
+        """
+        Fastest rising bugs over the last `days`, read from bug_trends.
+        
+        Uses daily rollups (weekly once the window outlives their retention),
+        so the cost depends on the window, not on how much raw history is kept.
+        
+        Args:
+            days: Size of the window in days
+            limit: Maximum number of bugs to return
+            now: Unix time the window ends at (defaults to the current time)
+            **filters: Same filters as get_bugs()
+            
+        Returns:
+            Bug dicts with 'open_score', 'close_score', 'score_delta',
+            'comments_delta' and 'reactions_delta', biggest score rise first
+        """
+        now = int(time.time()) if now is None else now
+        period = 86400 if days <= TREND_PERIODS[86400] else 604800
+        where, params = self._bug_filters(**filters)
+        
+        cursor = self.conn.execute(f'''
+            WITH span AS (
+                SELECT bug_id, MIN(bucket) AS first, MAX(bucket) AS last
+                FROM bug_trends
+                WHERE period = ? AND bucket >= ?
+                GROUP BY bug_id
+            )
+            SELECT bugs.*, o.open_score, c.close_score,
+                   c.close_score - o.open_score AS score_delta,
+                   c.close_comments - o.open_comments AS comments_delta,
+                   c.close_reactions - o.open_reactions AS reactions_delta
+            FROM span
+            JOIN bug_trends AS o ON o.period = ? AND o.bucket = span.first AND o.bug_id = span.bug_id
+            JOIN bug_trends AS c ON c.period = ? AND c.bucket = span.last AND c.bug_id = span.bug_id
+            JOIN bugs ON bugs.id = span.bug_id
+            {where}
+            AND (score_delta > 0 OR comments_delta > 0 OR reactions_delta > 0)
+            ORDER BY score_delta DESC, comments_delta DESC, reactions_delta DESC
+            LIMIT ?
+        ''', [period, (now - days * 86400) // period, period, period, *params, limit])
+        return [dict(row) for row in cursor.fetchall()]
+        
+    def summarize_bugs(self, level_floors: List[int] = (90, 80, 70, 60, 0), **filters) -> Dict:
+        """
+        Totals and impact-level counts for matching bugs in one aggregate query.
+        
+        Args:
+            level_floors: Lowest score of each impact level, highest level first
+            **filters: Same filters as get_bugs()
+            
+        Returns:
+            Dict with 'total_bugs', 'total_users', 'total_impact' and
+            'levels' (bug count per entry of level_floors)
+        """
+        where, params = self._bug_filters(**filters)
+        
+        cases = []
+        ceiling = None
+        for floor in level_floors:
+            condition = f'impact_score >= {int(floor)}'
+            if ceiling is not None:
+                condition += f' AND impact_score < {int(ceiling)}'
+            cases.append(f'SUM(CASE WHEN {condition} THEN 1 ELSE 0 END)')
+            ceiling = floor
+            
+        row = self.conn.execute(f'''
+            SELECT COUNT(*), COALESCE(SUM(affected_users), 0), COALESCE(SUM(impact_score), 0),
+                   {', '.join(cases)}
+            FROM bugs {where}
+        ''', params).fetchone()
+        
+        return {
+            'total_bugs': row[0],
+            'total_users': row[1],
+            'total_impact': row[2],
+            'levels': [count or 0 for count in row[3:]],
+        }
+        
+    def top_repos(self, n: int = 10, **filters) -> List[Dict]:
+        """Top repositories by affected users among matching bugs, grouped in SQL."""
+        where, params = self._bug_filters(**filters)
+        cursor = self.conn.execute(f'''
+            SELECT platform, instance, repo,
+                   COALESCE(SUM(affected_users), 0) AS total_users, COUNT(*) AS bug_count
+            FROM bugs {where}
+            GROUP BY platform, instance, repo
+            ORDER BY total_users DESC
+            LIMIT ?
+        ''', params + [n])
+        return [dict(row) for row in cursor.fetchall()]
+        
+    def find_bugs(self, text: str, min_impact: int = 0, limit: int = 20) -> List[Dict]:
+        """
+        Full-text search over bug titles, descriptions and labels.
+        
+        Results are ranked by BM25 relevance weighted by impact score, so a
+        strong match on a high-impact bug comes first.
+        
+        Args:
+            text: Free text to search for (all words must match)
+            min_impact: Minimum impact score
+            limit: Maximum number of results
+            
+        Returns:
+            List of bug dictionaries with an extra 'relevance' key
+        """
+        match = self._fts_query(text)
+        if not match:
+            return []
+            
+        # bm25() is negative (more negative = better), so scaling it up by
+        # impact pushes high-impact matches towards the top.
+        query = '''
+            SELECT bugs.*, -bm25(bugs_fts, 10.0, 1.0, 5.0) AS relevance
+            FROM bugs_fts
+            JOIN bugs ON bugs.id = bugs_fts.rowid
+            WHERE bugs_fts MATCH ?
+            AND bugs.impact_score >= ?
+            ORDER BY bm25(bugs_fts, 10.0, 1.0, 5.0) * (1 + bugs.impact_score / 100.0)
+            LIMIT ?
+        '''
+        cursor = self.conn.execute(query, (match, min_impact, limit))
+        return [dict(row) for row in cursor.fetchall()]
+        
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        """Turn free text into an FTS5 query, quoting each term so user input can't break the syntax."""
+        terms = [t.replace('"', '""') for t in text.split()]
+        return ' '.join(f'"{t}"' for t in terms if t)
+        
+    def save_diagnoses(self, diagnoses: Iterable[Tuple[int, str]]) -> int:
+        """
+        Store AI diagnoses next to their bugs, in one transaction.
+        
+        Rescans keep the diagnosis; SAVE_BUG_SQL never touches it.
+        
+        Args:
+            diagnoses: (bug id, diagnosis text) pairs
+            
+        Returns:
+            Number of bugs updated
+        """
+        now = datetime.now().isoformat(timespec='seconds')
+        rows = [(text, now, bug_id) for bug_id, text in diagnoses]
+        self.conn.executemany('UPDATE bugs SET diagnosis = ?, diagnosed_at = ? WHERE id = ?', rows)
+        self.conn.commit()
+        return len(rows)
+        
+    def start_scan_job(self, kind: str, key: str, targets: List[str],
+                       params: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Record a new checkpointed scan with every target pending.
+        
+        Args:
+            kind: What is scanning ('watch', 'multi', ...)
+            key: Identifies the target list, so a later run can resume it
+            targets: Targets in scan order (duplicates are dropped)
+            params: Scan settings to keep with the job (e.g. min_impact)
+            
+        Returns:
+            The job id
+        """
+        now = int(time.time())
+        try:
+            job_id = self.conn.execute(
+                'INSERT INTO scan_jobs (kind, key, params, created_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+                (kind, key, json.dumps(params or {}), now, now)
+            ).lastrowid
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO scan_job_targets (job_id, position, target) VALUES (?, ?, ?)',
+                [(job_id, position, target) for position, target in enumerate(targets)]
+            )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return job_id
+        
+    def find_unfinished_scan_job(self, kind: str, key: str) -> Optional[Dict]:
+        """The most recent scan job for kind/key that has targets left, or None."""
+        row = self.conn.execute(
+            "SELECT * FROM scan_jobs WHERE kind = ? AND key = ? AND status = 'running' "
+            "ORDER BY id DESC LIMIT 1",
+            (kind, key)
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job['params'] = json.loads(job['params'] or '{}')
+        job.update(self.get_scan_job_progress(job['id']))
+        return job
+        
+    def get_scan_job_progress(self, job_id: int) -> Dict[str, int]:
+        """Target counts for a job: total, done, failed and pending."""
+        counts = dict(self.conn.execute(
+            'SELECT status, COUNT(*) FROM scan_job_targets WHERE job_id = ? GROUP BY status',
+            (job_id,)
+        ).fetchall())
+        return {
+            'total': sum(counts.values()),
+            'done': counts.get('done', 0),
+            'failed': counts.get('error', 0),
+            'pending': counts.get('pending', 0),
+        }
+        
+    def pending_scan_targets(self, job_id: int) -> List[Dict]:
+        """Targets not yet done (pending or failed), in scan order, with their cursors."""
+        rows = self.conn.execute(
+            "SELECT target, cursor, status FROM scan_job_targets "
+            "WHERE job_id = ? AND status != 'done' ORDER BY position",
+            (job_id,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+        
+    def finish_scan_target(self, job_id: int, target: str, bugs: Iterable[Bug] = (),
+                           error: Optional[str] = None, cursor: Optional[str] = None) -> int:
+        """
+        Save one target's bugs and checkpoint it, in a single transaction.
+        
+        A failed target keeps whatever bugs it did fetch and stays eligible
+        for the next resume; a successful one is never scanned again by
+        this job.
+        
+        Args:
+            job_id: Scan job
+            target: Target within the job
+            bugs: Bug objects found for the target
+            error: Failure message, if the target failed
+            cursor: Where pagination stopped, for targets that page
+            
+        Returns:
+            Number of bugs saved
+        """
+        rows = [self._bug_params(**self._bug_fields(bug)) for bug in bugs]
+        now = int(time.time())
+        try:
+            self.conn.executemany(SAVE_BUG_SQL, rows)
+            self.conn.execute(
+                'UPDATE scan_job_targets SET status = ?, cursor = ?, bugs_found = ?, error = ?, '
+                'finished_at = ? WHERE job_id = ? AND target = ?',
+                ('error' if error else 'done', cursor, len(rows), error, now, job_id, target)
+            )
+            self.conn.execute('UPDATE scan_jobs SET updated_at = ? WHERE id = ?', (now, job_id))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return len(rows)
+        
+    def finish_scan_job(self, job_id: int) -> bool:
+        """
+        Close a job if every target is done.
+        
+        Returns:
+            True if the job is complete, False if targets remain for a resume
+        """
+        progress = self.get_scan_job_progress(job_id)
+        if progress['done'] < progress['total']:
+            return False
+        self.conn.execute("UPDATE scan_jobs SET status = 'done', updated_at = ? WHERE id = ?",
+                          (int(time.time()), job_id))
+        self.conn.commit()
+        return True
+        
     def record_contribution(self, repo: str, issue_number: int, 
                           pr_number: int, pr_url: str, 
                           impact_score: int, affected_users: int):
@@ -182,22 +1211,17 @@ class BugDatabase:
         self.conn.commit()
         
     def get_stats(self) -> Dict:
-        """Get contribution statistics."""
-        cursor = self.conn.execute('''
-            SELECT 
-                COUNT(*) as total_contributions,
-                SUM(affected_users) as total_users_helped,
-                AVG(impact_score) as avg_impact_score,
-                COUNT(CASE WHEN status = 'merged' THEN 1 END) as merged_count
-            FROM contributions
-        ''')
-        row = cursor.fetchone()
-        
+        """Get contribution statistics (from the trigger-maintained totals row)."""
+        row = self.conn.execute('SELECT * FROM contribution_totals WHERE id = 1').fetchone()
+        if row is None:
+            return {'total_contributions': 0, 'total_users_helped': 0,
+                    'avg_impact_score': 0, 'merged_count': 0}
+            
         return {
-            'total_contributions': row['total_contributions'] or 0,
-            'total_users_helped': row['total_users_helped'] or 0,
-            'avg_impact_score': int(row['avg_impact_score'] or 0),
-            'merged_count': row['merged_count'] or 0,
+            'total_contributions': row['total_contributions'],
+            'total_users_helped': row['total_users_helped'],
+            'avg_impact_score': row['total_impact'] // row['scored_count'] if row['scored_count'] else 0,
+            'merged_count': row['merged_count'],
         }
         
     def export_profile_json(self) -> str:
@@ -220,32 +1244,124 @@ class BugDatabase:
         try:
             data = json.loads(json_str)
             
-            # Import bugs
-            for bug in data.get('bugs', []):
-                self.conn.execute('''
-                    INSERT OR IGNORE INTO bugs 
-                    (repo, issue_number, title, url, impact_score, affected_users, severity, labels, comments, created_at, updated_at, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (bug['repo'], bug['issue_number'], bug['title'], bug['url'], 
-                      bug['impact_score'], bug['affected_users'], bug['severity'], 
-                      bug.get('labels'), bug.get('comments'), bug.get('created_at'), 
-                      bug.get('updated_at'), bug.get('status')))
-            
-            # Import contributions
-            for contrib in data.get('contributions', []):
-                self.conn.execute('''
-                    INSERT OR IGNORE INTO contributions
-                    (repo, issue_number, pr_number, pr_url, impact_score, affected_users, submitted_at, merged_at, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (contrib['repo'], contrib['issue_number'], contrib['pr_number'], contrib['pr_url'],
-                      contrib['impact_score'], contrib['affected_users'], contrib['submitted_at'],
-                      contrib.get('merged_at'), contrib.get('status')))
+            self.conn.executemany(IMPORT_BUG_SQL, map(self._import_bug_row, data.get('bugs', [])))
+            self.conn.executemany(IMPORT_CONTRIBUTION_SQL,
+                                  map(self._import_contribution_row, data.get('contributions', [])))
                       
             self.conn.commit()
             return True
         except Exception as e:
+            self.conn.rollback()
             print(f"Import error: {e}")
             return False
+            
+    def export_profile_ndjson(self, out: TextIO, batch_size: int = 500) -> Dict[str, int]:
+        """
+        Stream all user data to `out` as newline-delimited JSON.
+        
+        The first line is a header, followed by one {"type": "bug", ...} or
+        {"type": "contribution", ...} object per line. Rows are read from
+        the cursors in batches, so memory use doesn't grow with the profile.
+        
+        Args:
+            out: Text file object (see open_profile() for gzip support)
+            batch_size: Rows fetched from each cursor at a time
+            
+        Returns:
+            Number of rows written, keyed by 'bugs' and 'contributions'
+        """
+        header = {'type': 'header', 'version': PROFILE_NDJSON_VERSION,
+                  'exported_at': datetime.now().isoformat()}
+        out.write(json.dumps(header) + '\n')
+        
+        counts = {'bugs': 0, 'contributions': 0}
+        for kind, table in (('bug', 'bugs'), ('contribution', 'contributions')):
+            for row in self._iter_query(f'SELECT * FROM {table} ORDER BY id', (), batch_size):
+                row['type'] = kind
+                out.write(json.dumps(row) + '\n')
+                counts[table] += 1
+        return counts
+        
+    def import_profile_ndjson(self, lines: Iterable[str], batch_size: int = 500) -> Dict[str, int]:
+        """
+        Merge a profile written by export_profile_ndjson() into this database.
+        
+        Lines are parsed one at a time and inserted with executemany() in
+        batches of `batch_size`. The whole import is one transaction, so a
+        malformed file leaves the database unchanged.
+        
+        Args:
+            lines: Iterable of NDJSON lines, e.g. an open file
+            batch_size: Rows buffered per executemany() call
+            
+        Returns:
+            Number of rows read, keyed by 'bugs' and 'contributions'
+            
+        Raises:
+            ValueError: If the input isn't a Bugnosis NDJSON profile
+        """
+        batches = {
+            'bug': (IMPORT_BUG_SQL, self._import_bug_row, []),
+            'contribution': (IMPORT_CONTRIBUTION_SQL, self._import_contribution_row, []),
+        }
+        counts = {'bugs': 0, 'contributions': 0}
+        
+        def flush(kind: str):
+            sql, _, rows = batches[kind]
+            if rows:
+                self.conn.executemany(sql, rows)
+                rows.clear()
+                
+        try:
+            lines = iter(lines)
+            header = json.loads(next(lines, '{}'))
+            if header.get('type') != 'header':
+                raise ValueError("Not a Bugnosis NDJSON profile (missing header line)")
+            if header.get('version', 0) > PROFILE_NDJSON_VERSION:
+                raise ValueError(f"Unsupported profile version {header['version']}")
+                
+            for line in lines:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                kind = record.pop('type', None)
+                if kind not in batches:
+                    continue
+                _, to_row, rows = batches[kind]
+                rows.append(to_row(record))
+                counts[kind + 's'] += 1
+                if len(rows) >= batch_size:
+                    flush(kind)
+                    
+            for kind in batches:
+                flush(kind)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return counts
+
+    @staticmethod
+    def _import_repo_key(bug: Dict) -> tuple:
+        """(platform, instance, repo) for an exported bug, including pre-migration exports."""
+        if 'platform' in bug:
+            return bug['platform'], bug.get('instance') or '', bug['repo']
+        return parse_repo_key(bug['repo'])
+        
+    @classmethod
+    def _import_bug_row(cls, bug: Dict) -> tuple:
+        """Parameters for IMPORT_BUG_SQL from an exported bug."""
+        return (*cls._import_repo_key(bug), bug['issue_number'], bug['title'], bug['url'], 
+                bug['impact_score'], bug['affected_users'], bug['severity'], 
+                bug.get('labels'), bug.get('comments'), bug.get('reactions'), bug.get('created_at'), 
+                bug.get('updated_at'), bug.get('status'), bug.get('description'))
+                
+    @staticmethod
+    def _import_contribution_row(contrib: Dict) -> tuple:
+        """Parameters for IMPORT_CONTRIBUTION_SQL from an exported contribution."""
+        return (contrib['repo'], contrib['issue_number'], contrib['pr_number'], contrib['pr_url'],
+                contrib['impact_score'], contrib['affected_users'], contrib['submitted_at'],
+                contrib.get('merged_at'), contrib.get('status'))
 
     def close(self):
         """Close database connection."""
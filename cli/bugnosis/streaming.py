@@ -0,0 +1,46 @@
+"""Async iteration over streamed AI output."""
+
+import asyncio
+from typing import Any, AsyncIterator, Callable
+
+TokenCallback = Callable[[str], None]
+
+
+async def aiter_tokens(produce: Callable[[TokenCallback], Any]) -> AsyncIterator[str]:
+    """
+    Iterate asynchronously over the tokens of a streaming call.
+    
+    The AI calls stream through an on_token callback and block until they
+    finish, so `produce` runs in the event loop's default executor and
+    hands each token back to the loop as it arrives:
+    
+        async for text in aiter_tokens(
+                lambda on_token: copilot.analyze_bug(issue, on_token=on_token)):
+            ...
+            
+    Args:
+        produce: Called with the on_token callback to pass to the AI call
+        
+    Yields:
+        Pieces of the completion, in order
+        
+    Raises:
+        Whatever `produce` raised, once the tokens before it are consumed
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    finished = object()
+    
+    def run():
+        try:
+            return produce(lambda text: loop.call_soon_threadsafe(queue.put_nowait, text))
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, finished)
+            
+    future = loop.run_in_executor(None, run)
+    while True:
+        item = await queue.get()
+        if item is finished:
+            break
+        yield item
+    await future
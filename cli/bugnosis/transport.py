@@ -0,0 +1,633 @@
+"""
+Shared HTTP transport for the GitHub client, scanner, platform adapters
+and AI engine.
+
+Every host gets one pooled requests.Session, so calls to the same tracker
+reuse warm keep-alive connections instead of paying TCP and TLS setup
+each time. Credentials are passed per request, which lets clients with
+different tokens share the pool.
+
+Transient failures (connection errors, timeouts, 502/503/504 and rate
+limits) are retried with jittered exponential backoff, and a per-host
+circuit breaker fails fast while a tracker keeps failing. Inside
+time_budget() every attempt, retry and backoff is also capped by the
+time the caller has left.
+
+How many requests may be in flight to a host at once is found by an
+AIMD controller: it creeps up while latency holds steady and is cut back
+when the host throttles or its p95 latency rises.
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = 30
+# Matches the federated search worker count; see configure_pools()
+DEFAULT_POOL_SIZE = 8
+
+# Retry policy; see configure_retries()
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 10.0
+# A Retry-After longer than this is returned to the caller instead of slept on
+MAX_RETRY_AFTER = 60
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# Consecutive failures that open a host's breaker, and how long it stays open
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+
+# Adaptive per-host concurrency: starting limit, latency samples per p95
+# check, and how far p95 may rise above the best seen before backing off
+ADAPTIVE_INITIAL = 4
+LATENCY_WINDOW = 10
+LATENCY_TOLERANCE = 1.5
+
+_UNSET = object()
+
+
+class SharedResponse:
+    """
+    A finished GET response that may be handed to several callers.
+    
+    The body is decoded once and the same parsed object is returned to
+    everyone, so callers must treat json() results as read-only.
+    """
+    
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = response.url
+        self.text = response.text
+        self._response = response
+        self._json = _UNSET
+        self._lock = threading.Lock()
+        
+    @property
+    def ok(self) -> bool:
+        return self._response.ok
+        
+    def json(self) -> Any:
+        with self._lock:
+            if self._json is _UNSET:
+                self._json = self._response.json()
+        return self._json
+        
+    def raise_for_status(self):
+        self._response.raise_for_status()
+
+
+class _Call:
+    """One upstream request and everyone waiting on it."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    In-flight request table.
+    
+    While a call for a key is running, further callers with the same key
+    wait for it and get its result (or its exception) instead of starting
+    their own. Nothing is kept once the call finishes; this coalesces
+    bursts, it is not a cache.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Any, _Call] = {}
+        self.calls = 0
+        self.shared = 0
+        
+    def do(self, key: Any, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn() unless an identical call is already in flight.
+        
+        Args:
+            key: Hashable identity of the call
+            fn: Performs the call when this caller is the first for key
+            
+        Returns:
+            The result of the single fn() call for this key
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+                
+        if not leader:
+            if not call.done.wait(_remaining()):
+                raise requests.exceptions.Timeout("time budget ran out waiting for a shared request")
+            if call.error is not None:
+                raise call.error
+            return call.result
+            
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+_inflight = SingleFlight()
+
+
+def _freeze(value: Any) -> Any:
+    """Hashable form of request params."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class _Pools:
+    """Per-host sessions and the connection pool size they are mounted with."""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessions: Dict[str, requests.Session] = {}
+        self.size = DEFAULT_POOL_SIZE
+
+
+_pools = _Pools()
+
+
+def _mount(session: requests.Session, size: int):
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+
+def configure_pools(pool_size: int = DEFAULT_POOL_SIZE):
+    """
+    Set how many keep-alive connections each host may hold open.
+    
+    Should match the number of threads that can call one host at once;
+    a smaller pool makes extra threads open and drop connections. Sessions
+    that already exist are remounted with the new size.
+    
+    Args:
+        pool_size: Connections kept per host
+    """
+    with _pools.lock:
+        _pools.size = max(1, pool_size)
+        for session in _pools.sessions.values():
+            _mount(session, _pools.size)
+
+
+def _host(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def session_for(url: str) -> requests.Session:
+    """The pooled session for a URL's scheme and host, created on first use."""
+    host = _host(url)
+    with _pools.lock:
+        session = _pools.sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            session.headers['Accept-Encoding'] = 'gzip, deflate'
+            session.headers['Connection'] = 'keep-alive'
+            _mount(session, _pools.size)
+            _pools.sessions[host] = session
+        return session
+
+
+def close_pools():
+    """Close every pooled session (connections reopen on the next call)."""
+    with _pools.lock:
+        for session in _pools.sessions.values():
+            session.close()
+        _pools.sessions.clear()
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a host whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker.
+    
+    After `threshold` consecutive failures the breaker opens and calls fail
+    immediately. Once `cooldown` seconds have passed a single trial call is
+    let through; success closes the breaker, failure opens it again.
+    """
+    
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self._lock = threading.Lock()
+        
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if self.trial or time.monotonic() - self.opened_at >= self.cooldown:
+            return 'half-open'
+        return 'open'
+        
+    def allow(self) -> bool:
+        """Whether a call may go out now."""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if not self.trial and time.monotonic() - self.opened_at >= self.cooldown:
+                self.trial = True
+                return True
+            return False
+            
+    def record(self, ok: bool):
+        """Record the outcome of a call that allow() let through."""
+        with self._lock:
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                if self.trial or self.failures >= self.threshold:
+                    self.opened_at = time.monotonic()
+            self.trial = False
+            
+    def abandon(self):
+        """Forget a call that allow() let through without an outcome."""
+        with self._lock:
+            self.trial = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(url: str) -> CircuitBreaker:
+    """The circuit breaker for a URL's host, created on first use."""
+    host = _host(url)
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN)
+        return breaker
+
+
+def breaker_states() -> Dict[str, str]:
+    """State ('closed', 'open' or 'half-open') of every host seen so far."""
+    with _breakers_lock:
+        return {host: breaker.state for host, breaker in _breakers.items()}
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one host.
+    
+    Every LATENCY_WINDOW successful requests, the window's p95 latency is
+    compared with the best p95 seen: while it stays within
+    LATENCY_TOLERANCE the limit goes up by one, otherwise it is cut by a
+    quarter. Throttling (429, or a 403 rate limit) or a request the host
+    never answered halves it at once. Requests that were already in
+    flight when the limit was cut don't cut it again, so one burst of
+    429s counts as a single signal. The limit stays between 1 and the
+    connection pool size.
+    """
+    
+    def __init__(self, initial: int = ADAPTIVE_INITIAL):
+        self.limit = initial
+        self.in_flight = 0
+        self.baseline_p95 = None
+        self.last_p95 = None
+        self._latencies = []
+        self._decreased_at = 0.0
+        self._cond = threading.Condition()
+        
+    def acquire(self, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Wait for a free slot.
+        
+        Args:
+            timeout: Most seconds to wait (None waits as long as it takes)
+            
+        Returns:
+            Start time to hand back to release(), or None if no slot
+            freed up within `timeout`
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.in_flight < self.limit, timeout):
+                return None
+            self.in_flight += 1
+        return time.monotonic()
+        
+    def release(self, started: float, throttled: bool = False):
+        """
+        Free a slot and adjust the limit from the finished request.
+        
+        Args:
+            started: Value returned by acquire()
+            throttled: True if the host rate limited or failed to answer it
+        """
+        now = time.monotonic()
+        with self._cond:
+            self.in_flight -= 1
+            if started < self._decreased_at:
+                # Sent under the old limit; its outcome is already accounted for
+                pass
+            elif throttled:
+                self._decrease(0.5, now)
+            else:
+                self._latencies.append(now - started)
+                if len(self._latencies) >= LATENCY_WINDOW:
+                    if self._latency_rising():
+                        self._decrease(0.75, now)
+                    else:
+                        self.limit = min(self.limit + 1, _pools.size)
+            self._cond.notify_all()
+            
+    def _latency_rising(self) -> bool:
+        """Check a full window of samples against the best p95 so far."""
+        ordered = sorted(self._latencies)
+        self._latencies = []
+        p95 = ordered[int(0.95 * (len(ordered) - 1))]
+        self.last_p95 = p95
+        if self.baseline_p95 is None or p95 < self.baseline_p95:
+            self.baseline_p95 = p95
+            return False
+        return p95 > self.baseline_p95 * LATENCY_TOLERANCE
+        
+    def _decrease(self, factor: float, now: float):
+        self.limit = max(1, int(self.limit * factor))
+        self._decreased_at = now
+        # Samples taken at the old limit say nothing about the new one
+        self._latencies = []
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(url: str) -> AdaptiveLimiter:
+    """The adaptive concurrency limiter for a URL's host, created on first use."""
+    host = _host(url)
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = AdaptiveLimiter()
+        return limiter
+
+
+def limiter_states() -> Dict[str, Dict[str, Any]]:
+    """Current limit, requests in flight and last p95 (ms) per host."""
+    with _limiters_lock:
+        return {
+            host: {
+                'limit': limiter.limit,
+                'in_flight': limiter.in_flight,
+                'p95_ms': None if limiter.last_p95 is None else int(limiter.last_p95 * 1000),
+            }
+            for host, limiter in _limiters.items()
+        }
+
+
+def _throttled(response: requests.Response) -> bool:
+    """Whether the host rate limited this response (including GitHub's 403 limits)."""
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and (
+        'Retry-After' in response.headers
+        or response.headers.get('X-RateLimit-Remaining') == '0'
+    )
+
+
+def configure_retries(max_retries: int = MAX_RETRIES,
+                      breaker_threshold: int = BREAKER_THRESHOLD,
+                      breaker_cooldown: float = BREAKER_COOLDOWN):
+    """
+    Change the retry policy and circuit breaker settings.
+    
+    Args:
+        max_retries: Extra attempts after the first for retryable failures
+        breaker_threshold: Consecutive failures that open a host's breaker
+        breaker_cooldown: Seconds a breaker stays open before a trial call
+    """
+    global MAX_RETRIES, BREAKER_THRESHOLD, BREAKER_COOLDOWN
+    MAX_RETRIES = max_retries
+    BREAKER_THRESHOLD = breaker_threshold
+    BREAKER_COOLDOWN = breaker_cooldown
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """Seconds asked for by a Retry-After header (delta or HTTP date)."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry number."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+_budget = threading.local()
+
+
+@contextmanager
+def time_budget(seconds: Optional[float]):
+    """
+    Cap the requests this thread makes inside the block to `seconds` in all.
+    
+    Each attempt's timeout is cut to the time left, and a retry whose
+    wait would not end before the budget does is not made: the caller
+    gets the last failure, as if retries had run out. Nested budgets keep
+    the earlier end.
+    
+    Args:
+        seconds: Time allowed for the block (None leaves any outer budget)
+    """
+    previous = getattr(_budget, 'deadline', None)
+    deadline = previous
+    if seconds is not None:
+        deadline = time.monotonic() + seconds
+        if previous is not None:
+            deadline = min(deadline, previous)
+    _budget.deadline = deadline
+    try:
+        yield
+    finally:
+        _budget.deadline = previous
+
+
+def _remaining() -> Optional[float]:
+    """Seconds left in this thread's time budget, or None without one."""
+    deadline = getattr(_budget, 'deadline', None)
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _fits(wait: float) -> bool:
+    """Whether a retry after `wait` seconds would still start within the budget."""
+    remaining = _remaining()
+    return remaining is None or wait < remaining
+
+
+def request(method: str, url: str, headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[float] = None, retries: Optional[int] = None,
+            **kwargs) -> requests.Response:
+    """
+    Send a request on the host's pooled session, retrying transient failures.
+    
+    Connection errors, timeouts and 502/503/504 are retried for GETs only,
+    since a POST may already have been acted on. Rate limits (429, or a
+    403 carrying Retry-After) are retried for any method. The wait honors
+    Retry-After when given, otherwise it is jittered exponential backoff.
+    
+    Use this for non-idempotent calls such as POST and PATCH; GETs should
+    go through get() so identical ones are shared.
+    
+    Args:
+        method: HTTP method
+        url: Request URL
+        headers: Per-request headers, typically credentials
+        timeout: Seconds per attempt (DEFAULT_TIMEOUT if None)
+        retries: Extra attempts (MAX_RETRIES if None)
+        **kwargs: Passed to requests (json, data, params, ...)
+        
+    Returns:
+        requests.Response (the last one if retries ran out)
+        
+    Raises:
+        CircuitOpenError: If the host's breaker is open
+        requests.RequestException: If the last attempt failed to connect,
+            or the thread's time_budget() ran out before the first one
+    """
+    session = session_for(url)
+    breaker = breaker_for(url)
+    limiter = limiter_for(url)
+    retries = MAX_RETRIES if retries is None else retries
+    idempotent = method.upper() in ('GET', 'HEAD', 'OPTIONS')
+    attempt = 0
+    
+    while True:
+        attempt_timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+        remaining = _remaining()
+        if remaining is not None:
+            if remaining <= 0:
+                raise requests.exceptions.Timeout(f"time budget ran out before calling {_host(url)}")
+            attempt_timeout = min(attempt_timeout, remaining)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{_host(url)} is failing; not retrying for now")
+        started = limiter.acquire(remaining)
+        if started is None:
+            breaker.abandon()
+            raise requests.exceptions.Timeout(f"time budget ran out waiting for a slot on {_host(url)}")
+        try:
+            response = session.request(
+                method, url, headers=headers, timeout=attempt_timeout, **kwargs
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            # A host that stops answering is treated like one that throttles
+            limiter.release(started, throttled=True)
+            breaker.record(False)
+            wait = _backoff(attempt)
+            if not idempotent or attempt >= retries or not _fits(wait):
+                raise
+            time.sleep(wait)
+            attempt += 1
+            continue
+        except Exception:
+            # Anything else (bad encoding, redirect loop) still ends a trial call
+            limiter.release(started)
+            breaker.record(False)
+            raise
+        except BaseException:
+            # Interrupted: hand back the slot and any trial without judging the host
+            limiter.release(started)
+            breaker.abandon()
+            raise
+        limiter.release(started, throttled=_throttled(response))
+        
+        status = response.status_code
+        # Rate limits mean the host is up; only server errors count against it
+        breaker.record(status < 500)
+        
+        wait = _retry_after(response)
+        rate_limited = status == 429 or (status == 403 and wait is not None)
+        retryable = rate_limited or (idempotent and status in RETRY_STATUSES)
+        if not retryable or attempt >= retries:
+            return response
+        if wait is None:
+            wait = _backoff(attempt)
+        if wait > MAX_RETRY_AFTER or not _fits(wait):
+            return response
+        # Hand the connection back before waiting (matters for stream=True)
+        response.close()
+        time.sleep(wait)
+        attempt += 1
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """POST on the host's pooled session; see request()."""
+    return request('POST', url, **kwargs)
+
+
+def get(url: str, params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None) -> SharedResponse:
+    """
+    GET on the host's pooled session, sharing identical concurrent requests.
+    
+    Requests are identical when the URL, params and headers (including
+    credentials) all match, so callers with different tokens never see
+    each other's responses.
+    
+    Args:
+        url: Request URL
+        params: Query parameters
+        headers: Per-request headers, typically credentials
+        timeout: Seconds (DEFAULT_TIMEOUT if None)
+        
+    Returns:
+        SharedResponse, possibly the same object other callers received
+    """
+    key = (url, _freeze(params or {}), _freeze(headers or {}))
+    return _inflight.do(
+        key, lambda: SharedResponse(request('GET', url, params=params, headers=headers,
+                                            timeout=timeout))
+    )
+
+
+def inflight_stats() -> Dict[str, int]:
+    """Upstream GETs made and GETs served from another caller's request."""
+    return {'requests': _inflight.calls, 'shared': _inflight.shared}
@@ -0,0 +1,182 @@
+"""Write-behind database writer for scans."""
+
+import concurrent.futures
+import queue
+import threading
+from typing import Any, Callable, Iterable, List, Optional
+
+from .storage import BugDatabase
+
+
+class AsyncBugWriter:
+    """
+    Save bugs on a dedicated thread so scanners don't block on SQLite.
+    
+    Bugs pushed with put()/put_many() go onto a bounded queue. The writer
+    thread owns its own BugDatabase connection and drains the queue into
+    batched save_bugs() transactions, keeping only the latest copy of a bug
+    that appears more than once in a batch. put() blocks only when the
+    queue is full, which keeps memory bounded if the disk falls behind.
+    
+    call(fn) runs fn(db) on the writer thread after everything queued
+    before it has been written, for work that must follow those bugs
+    (such as checkpointing a scan).
+    
+    Use as a context manager, or call close() to flush and stop:
+    
+        with AsyncBugWriter() as writer:
+            for bug in scan():
+                writer.put(bug)
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, db_path: Optional[str] = None, batch_size: int = 200,
+                 max_queue: int = 1000, flush_interval: float = 0.5):
+        """
+        Start the writer thread.
+        
+        Args:
+            db_path: Database path (default: BugDatabase's default)
+            batch_size: Most bugs saved per transaction
+            max_queue: Queue capacity before put() blocks
+            flush_interval: Seconds to wait for more bugs before writing a partial batch
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.saved = 0
+        self.errors = 0
+        
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._ready = threading.Event()
+        self._init_error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='bugnosis-writer', daemon=True)
+        self._thread.start()
+        
+        # Surface schema/open errors here rather than on the first put()
+        self._ready.wait()
+        if self._init_error:
+            raise self._init_error
+            
+    def put(self, bug: Any):
+        """Queue one Bug object for saving."""
+        if self._closed:
+            raise RuntimeError("AsyncBugWriter is closed")
+        self._queue.put(bug)
+        
+    def put_many(self, bugs: Iterable[Any]):
+        """Queue several Bug objects for saving."""
+        for bug in bugs:
+            self.put(bug)
+            
+    def call(self, fn: Callable[[BugDatabase], Any]) -> concurrent.futures.Future:
+        """
+        Run fn(db) on the writer thread, in queue order.
+        
+        Args:
+            fn: Called with the writer's BugDatabase
+            
+        Returns:
+            Future for fn's result; failures are also printed and counted
+        """
+        if self._closed:
+            raise RuntimeError("AsyncBugWriter is closed")
+        future = concurrent.futures.Future()
+        self._queue.put(_Task(fn, future))
+        return future
+        
+    def flush(self):
+        """Block until everything queued so far has been written."""
+        self._queue.join()
+        
+    def close(self):
+        """Flush remaining bugs and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join()
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+        
+    def _run(self):
+        """Writer thread: drain the queue into batched transactions."""
+        try:
+            db = BugDatabase(self.db_path)
+        except Exception as e:
+            self._init_error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                batch = [item]
+                # Coalesce whatever arrives in the next moment into the same transaction
+                while len(batch) < self.batch_size and item is not self._STOP:
+                    try:
+                        item = self._queue.get(timeout=self.flush_interval)
+                    except queue.Empty:
+                        break
+                    batch.append(item)
+                    
+                stopping = batch[-1] is self._STOP
+                bugs = []
+                for item in batch:
+                    if isinstance(item, _Task):
+                        # Bugs queued before the task must be on disk first
+                        self._write(db, bugs)
+                        bugs = []
+                        self._run_task(db, item)
+                    elif item is not self._STOP:
+                        bugs.append(item)
+                self._write(db, bugs)
+                for _ in batch:
+                    self._queue.task_done()
+        finally:
+            db.close()
+            
+    def _write(self, db: BugDatabase, bugs: List[Any]):
+        """Save a batch in one transaction, counting rather than raising failures."""
+        # Later copies of the same bug replace earlier ones
+        latest = {}
+        for bug in bugs:
+            latest[(getattr(bug, 'platform', 'github'), bug.repo, bug.issue_number)] = bug
+        if not latest:
+            return
+            
+        try:
+            self.saved += db.save_bugs(latest.values())
+        except Exception as e:
+            db.conn.rollback()
+            self.errors += len(latest)
+            print(f"Database write error: {e}")
+            
+    def _run_task(self, db: BugDatabase, task: '_Task'):
+        """Run a call() on this thread, reporting rather than raising failures."""
+        if not task.future.set_running_or_notify_cancel():
+            return
+        try:
+            task.future.set_result(task.fn(db))
+        except Exception as e:
+            db.conn.rollback()
+            self.errors += 1
+            print(f"Database write error: {e}")
+            task.future.set_exception(e)
+
+
+class _Task:
+    """A call() waiting in the writer queue."""
+    
+    def __init__(self, fn: Callable[[BugDatabase], Any], future: concurrent.futures.Future):
+        self.fn = fn
+        self.future = future